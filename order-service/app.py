@@ -2,10 +2,25 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from config.settings import settings
-from database.connection import init_database, close_database
+from database.connection import init_database, close_database, get_pool_stats
+from utils.http_clients import http_clients
+from utils.circuit_breaker import circuit_breakers
+from utils.hedging import hedgers
+from utils.bulkhead import bulkheads
+from utils.user_cache import user_cache
+from utils.auth import get_current_admin_user, User
+from utils import deadline
+from services.product_cache import product_cache
+from services.product_loader import product_loader
+from services.product_catalog import product_catalog
+from services.stock_reservations import stock_ledger
+from services.order_service import checkout_metrics
+from services.outbox import outbox_dispatcher
+from services.order_counters import order_counters
+from services.order_rollups import order_rollups
 from routers import orders, admin_orders
 
 # Create FastAPI application
@@ -49,12 +64,34 @@ app.add_middleware(
         "Access-Control-Request-Headers",
         "X-CSRF-Token",
         "X-Forwarded-For",
-        "X-Real-IP"
+        "X-Real-IP",
+        deadline.DEADLINE_HEADER
     ],
     expose_headers=["*"],
     max_age=86400,  # 24 hours
 )
 
+@app.middleware("http")
+async def request_deadline(request: Request, call_next):
+    """
+    Give every request a deadline: the route default, or a shorter budget
+    sent by the caller in X-Request-Timeout-Ms. Downstream calls made while
+    handling the request share it.
+    """
+    if request.method == "POST" and request.url.path.rstrip("/") == "/orders":
+        budget = settings.checkout_deadline_ms / 1000
+    else:
+        budget = settings.request_deadline_ms / 1000
+    requested = deadline.parse_budget_ms(request.headers.get(deadline.DEADLINE_HEADER))
+    if requested is not None:
+        budget = min(budget, requested)
+
+    token = deadline.set_deadline(budget)
+    try:
+        return await call_next(request)
+    finally:
+        deadline.reset_deadline(token)
+
 # Include routers
 app.include_router(orders.router, prefix="/orders", tags=["orders"])
 app.include_router(admin_orders.router, prefix="/admin/orders", tags=["admin"])
@@ -63,12 +100,29 @@ app.include_router(admin_orders.router, prefix="/admin/orders", tags=["admin"])
 async def startup_event():
     """Initialize database connection on startup"""
     await init_database()
+    await http_clients.startup()
+    if settings.product_catalog_enabled:
+        await product_catalog.start()
+    if settings.stock_reservation_enabled:
+        await stock_ledger.start()
+    await outbox_dispatcher.start()
+    if settings.order_stats_source == "counters":
+        await order_counters.start()
+    if settings.order_rollup_enabled:
+        await order_rollups.start()
     print(f"🚀 Order Service started successfully")
     print(f"📊 CORS origins: {cors_origins}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Close database connection on shutdown"""
+    """Close database connection and HTTP client pools on shutdown"""
+    await outbox_dispatcher.stop()
+    await order_counters.stop()
+    await order_rollups.stop()
+    await product_catalog.stop()
+    await stock_ledger.stop()
+    await http_clients.shutdown()
+    await product_cache.close()
     await close_database()
 
 @app.get("/health")
@@ -81,6 +135,36 @@ async def health_check():
         "cors_enabled": True
     }
 
+@app.get("/health/circuit-breakers")
+async def circuit_breaker_health():
+    """Circuit breaker state per downstream service"""
+    breakers = circuit_breakers.get_stats()
+    return {
+        "status": "degraded" if any(b["state"] not in ("closed", "disabled") for b in breakers.values()) else "healthy",
+        "circuit_breakers": breakers
+    }
+
+@app.get("/metrics")
+async def metrics(current_user: User = Depends(get_current_admin_user)):
+    """Runtime metrics for downstream dependencies and the DB pool (admin only)"""
+    return {
+        "service": "order-service",
+        "http_clients": http_clients.get_stats(),
+        "circuit_breakers": circuit_breakers.get_stats(),
+        "bulkheads": bulkheads.get_stats(),
+        "hedging": hedgers.get_stats(),
+        "user_cache": user_cache.get_stats(),
+        "product_cache": product_cache.get_stats(),
+        "product_loader": product_loader.get_stats(),
+        "product_catalog": product_catalog.get_stats(),
+        "stock_ledger": stock_ledger.get_stats(),
+        "checkout": checkout_metrics.snapshot(),
+        "outbox": outbox_dispatcher.get_stats(),
+        "order_counters": order_counters.get_stats(),
+        "order_rollups": order_rollups.get_stats(),
+        "database": get_pool_stats()
+    }
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -91,6 +175,7 @@ async def root():
             "orders": "/orders",
             "admin": "/admin/orders",
             "health": "/health",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
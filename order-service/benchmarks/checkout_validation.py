@@ -0,0 +1,67 @@
+"""
+Checkout validation benchmark: latency vs cart size
+
+Compares the old serial product validation loop with the concurrent
+OrderService.validate_cart_items using a simulated product service
+latency (no network or database needed).
+
+Usage:
+    python benchmarks/checkout_validation.py [--latency-ms 80] [--sizes 1,5,10,20,40]
+"""
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import settings
+from services.order_service import OrderService
+
+
+class SimulatedOrderService(OrderService):
+    """OrderService whose product lookups just sleep for a fixed latency"""
+
+    def __init__(self, latency: float):
+        super().__init__(db=None)
+        self.latency = latency
+
+    async def get_product_details(self, product_id: int, token: str):
+        await asyncio.sleep(self.latency)
+        return {"title": f"Product {product_id}", "sku": f"SKU-{product_id}", "image": ""}
+
+
+def build_cart(size: int):
+    return [{"productId": i + 1, "price": 9.99, "quantity": 1} for i in range(size)]
+
+
+async def serial_validation(service: OrderService, cart_items, token: str):
+    """Previous behaviour: one awaited product lookup after another"""
+    return [await service.validate_cart_item(cart_item, token) for cart_item in cart_items]
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return (time.perf_counter() - start) * 1000
+
+
+async def main(latency_ms: float, sizes):
+    service = SimulatedOrderService(latency_ms / 1000)
+    print("📊 Checkout validation latency vs cart size")
+    print(f"   product service latency: {latency_ms:.0f} ms, max in-flight: {settings.checkout_max_concurrency}")
+    print(f"{'items':>6} {'serial (ms)':>12} {'concurrent (ms)':>16} {'speedup':>8}")
+    for size in sizes:
+        cart_items = build_cart(size)
+        serial_ms = await timed(serial_validation(service, cart_items, "token"))
+        concurrent_ms = await timed(service.validate_cart_items(cart_items, "token"))
+        print(f"{size:>6} {serial_ms:>12.1f} {concurrent_ms:>16.1f} {serial_ms / concurrent_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--sizes", default="1,5,10,20,40")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency_ms, [int(size) for size in args.sizes.split(",")]))
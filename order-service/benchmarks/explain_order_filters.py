@@ -0,0 +1,141 @@
+"""
+EXPLAIN check for the filtered admin order list
+
+Seeds a synthetic orders table (500k rows by default, realistic spread:
+~3% awaiting payment, 5000 users, a year of history), makes sure the
+listing indexes declared on Order exist, then EXPLAINs the exact queries
+OrderService builds for GET /admin/orders - offset and cursor mode - for
+every supported filter combination. Fails if any plan reads orders with a
+sequential scan, and prints the index each combination uses. Seeded rows
+(order_number EXPLAIN-*) are deleted afterwards unless --keep is given;
+point DATABASE_URL at a scratch database.
+
+Usage:
+    python benchmarks/explain_order_filters.py [--rows 500000] [--keep]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+from itertools import combinations
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, desc, text
+from database.connection import engine, async_session_factory, close_database, create_tables
+from models.order import Order, OrderStatus, PaymentStatus
+from schemas.order_schemas import OrderFilters
+from services.order_service import filter_orders, keyset_page
+from utils.pagination import encode_cursor, NEXT
+
+SEED_SQL = text("""
+    INSERT INTO orders (
+        user_id, order_number, status, payment_status, subtotal, tax_amount, shipping_amount,
+        discount_amount, total_amount, shipping_address, shipping_city, shipping_state,
+        shipping_postal_code, shipping_country, customer_email, created_at, updated_at
+    )
+    SELECT
+        1 + (n % 5000),
+        'EXPLAIN-' || n,
+        (ARRAY['pending','confirmed','processing','shipped','delivered','delivered','delivered','cancelled','refunded'])[1 + (n % 9)],
+        CASE WHEN n % 100 < 3 THEN 'pending' WHEN n % 100 < 5 THEN 'failed' ELSE 'paid' END,
+        amount, amount * 0.10, 0, 0, amount * 1.10,
+        '1 Explain Street', 'Explain City', 'CA', '90210', 'USA',
+        'explain' || (n % 5000) || '@example.com',
+        ts, ts
+    FROM (
+        SELECT n,
+               round((random() * 500)::numeric, 2) AS amount,
+               now()::timestamp - random() * interval '365 days' AS ts
+        FROM generate_series(1, :rows) AS n
+    ) AS seed
+""")
+
+PAGE_SIZE = 20
+
+
+def filter_combinations():
+    """Every subset of the supported filters, with representative values"""
+    now = datetime.utcnow()
+    values = {
+        "user_id": 42,
+        "status": OrderStatus.SHIPPED,
+        "payment_status": PaymentStatus.PENDING,
+        "created_from": now - timedelta(days=7),
+        "created_to": now - timedelta(days=1)
+    }
+    for count in range(len(values) + 1):
+        for names in combinations(values, count):
+            # A date range is always given as a pair
+            if ("created_from" in names) != ("created_to" in names):
+                continue
+            yield OrderFilters(**{name: values[name] for name in names})
+
+
+def listing_queries(filters: OrderFilters):
+    """The queries OrderService.search_orders and get_orders_page run (cursor: a mid-list position)"""
+    base = filter_orders(select(Order), filters)
+    yield "offset", base.order_by(desc(Order.created_at), desc(Order.id)).offset(0).limit(PAGE_SIZE)
+    cursor = encode_cursor(datetime.utcnow() - timedelta(days=2), 2 ** 30, NEXT)
+    yield "cursor", keyset_page(base, cursor, PAGE_SIZE)[0]
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+async def explain(conn, query):
+    compiled = query.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return list(plan_nodes(plan[0]["Plan"]))
+
+
+async def main(rows: int, keep: bool):
+    await create_tables()
+    # create_all skips indexes on tables that already exist
+    async with engine.begin() as conn:
+        for index in Order.__table__.indexes:
+            await conn.run_sync(lambda sync_conn, index=index: index.create(sync_conn, checkfirst=True))
+    try:
+        print(f"🌱 Seeding {rows:,} synthetic orders...")
+        async with async_session_factory() as session:
+            async with session.begin():
+                await session.execute(SEED_SQL, {"rows": rows})
+            await session.execute(text("ANALYZE orders"))
+
+        failures = 0
+        async with engine.connect() as conn:
+            for filters in filter_combinations():
+                label = ", ".join(filters.model_dump(exclude_none=True)) or "(no filters)"
+                for mode, query in listing_queries(filters):
+                    nodes = await explain(conn, query)
+                    seq_scans = [n for n in nodes if n["Node Type"] == "Seq Scan" and n.get("Relation Name") == "orders"]
+                    indexes = sorted({n["Index Name"] for n in nodes if "Index Name" in n})
+                    mark = "❌" if seq_scans else "✅"
+                    failures += bool(seq_scans)
+                    print(f"{mark} {mode:>6}  {label:<55} {', '.join(indexes) or 'no index'}")
+
+        if failures:
+            print(f"❌ {failures} plans fell back to a sequential scan on orders")
+            raise SystemExit(1)
+        print("✅ Every filter combination is served by an index")
+    finally:
+        if not keep:
+            async with async_session_factory() as session:
+                async with session.begin():
+                    await session.execute(text("DELETE FROM orders WHERE order_number LIKE 'EXPLAIN-%'"))
+        await close_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.keep))
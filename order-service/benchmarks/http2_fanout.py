@@ -0,0 +1,205 @@
+"""
+HTTP/1.1 vs HTTP/2 checkout fan-out benchmark
+
+Starts a local HTTPS stand-in for the product service in its own process
+(hypercorn, which negotiates h2 or HTTP/1.1 via ALPN, with a throwaway
+trustme CA) so that server work does not share the client's event loop,
+then runs concurrent checkouts - each fetching its cart items' products in
+parallel - once with the order-service pool settings over HTTP/1.1 and
+once over HTTP/2. In-flight requests are capped at BULKHEAD_MAX_LIMIT in
+both modes, as the order-service bulkhead does; without that cap a single
+HTTP/2 connection fails requests beyond the peer's max concurrent streams.
+The stand-in closes a connection after --max-requests requests (GOAWAY on
+HTTP/2), like nginx's default of 1000; requests caught mid-write on a
+closing connection count as failed checkouts.
+Reports peak open connections, failed checkouts and checkout latency.
+
+Needs hypercorn and trustme (requirements-dev.txt)
+
+Usage:
+    python benchmarks/http2_fanout.py [--checkouts 200] [--items 10] [--latency-ms 20] [--max-requests 1000]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import ssl
+import sys
+import os
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from config.settings import settings
+from utils.http_clients import http_clients, http2_available
+from utils.metrics import Histogram
+
+try:
+    import trustme
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+except ImportError:
+    sys.exit("This benchmark needs hypercorn and trustme: pip install -r requirements-dev.txt")
+
+
+def product_app(latency: float):
+    """Minimal ASGI product service: GET /products/<id> after `latency` seconds"""
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        await asyncio.sleep(latency)
+        product_id = scope["path"].rsplit("/", 1)[-1]
+        body = json.dumps({"success": True, "data": {"_id": product_id, "title": f"Product {product_id}", "stock": 100}})
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": body.encode()})
+
+    return app
+
+
+def run_server(port: int, certfile: str, keyfile: str, latency: float, max_requests: int):
+    """Child process: serve the product stand-in until terminated"""
+    config = Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.certfile = certfile
+    config.keyfile = keyfile
+    config.h2_max_concurrent_streams = 1000
+    config.keep_alive_max_requests = max_requests
+    config.backlog = 1024
+    config.accesslog = None
+    asyncio.run(serve(product_app(latency), config))
+
+
+async def wait_for_server(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def run_mode(base_url: str, ssl_context: ssl.SSLContext, http2: bool, checkouts: int, items: int):
+    client = httpx.AsyncClient(
+        http2=http2,
+        verify=ssl_context,
+        limits=http_clients._build_limits(),
+        timeout=http_clients._build_timeout()
+    )
+    latencies = Histogram()
+    peak_connections = 0
+    failures = {}
+    in_flight = asyncio.Semaphore(settings.bulkhead_max_limit)
+
+    async def get(url: str) -> httpx.Response:
+        async with in_flight:
+            return await client.get(url)
+    done = asyncio.Event()
+
+    async def sample_connections():
+        nonlocal peak_connections
+        while not done.is_set():
+            peak_connections = max(peak_connections, http_clients._pool_stats(client)["connections"])
+            await asyncio.sleep(0.002)
+
+    async def checkout(index: int):
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            get(f"{base_url}/products/{index * items + item}") for item in range(items)
+        ], return_exceptions=True)
+        errors = [response for response in responses if isinstance(response, Exception)]
+        if errors:
+            # A checkout fails if any of its lookups does (e.g. PoolTimeout waiting for a connection)
+            name = type(errors[0]).__name__
+            failures[name] = failures.get(name, 0) + 1
+            return None
+        assert all(response.status_code == 200 for response in responses)
+        latencies.observe((time.perf_counter() - started) * 1000)
+        return responses[0].http_version
+
+    sampler = asyncio.create_task(sample_connections())
+    started = time.perf_counter()
+    versions = await asyncio.gather(*[checkout(index) for index in range(checkouts)])
+    elapsed = time.perf_counter() - started
+    done.set()
+    await sampler
+    await client.aclose()
+
+    snapshot = latencies.snapshot()
+    return {
+        "protocol": next((version for version in versions if version), "HTTP/2" if http2 else "HTTP/1.1"),
+        "failed": sum(failures.values()),
+        "failures": failures,
+        "peak_connections": peak_connections,
+        "p50": snapshot["p50"],
+        "p99": snapshot["p99"],
+        "max": snapshot["max"],
+        "throughput": checkouts / elapsed
+    }
+
+
+async def main(checkouts: int, items: int, latency_ms: float, max_requests: int, port: int):
+    if not http2_available():
+        sys.exit("HTTP/2 needs the h2 package: pip install 'httpx[http2]'")
+
+    ca = trustme.CA()
+    cert = ca.issue_cert("127.0.0.1", "localhost")
+    ssl_context = ssl.create_default_context()
+    ca.configure_trust(ssl_context)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        certfile, keyfile = os.path.join(tmp, "cert.pem"), os.path.join(tmp, "key.pem")
+        for blob in cert.cert_chain_pems:
+            blob.write_to_path(certfile, append=True)
+        cert.private_key_pem.write_to_path(keyfile)
+
+        server = multiprocessing.Process(
+            target=run_server, args=(port, certfile, keyfile, latency_ms / 1000, max_requests), daemon=True
+        )
+        server.start()
+        await wait_for_server(port)
+
+        base_url = f"https://127.0.0.1:{port}"
+        print(f"📊 {checkouts} concurrent checkouts x {items} product lookups, {latency_ms:.0f} ms server latency, "
+              f"{max_requests} requests per server connection")
+        limits = http_clients._build_limits()
+        print(f"   pool: max_connections={limits.max_connections}, "
+              f"max_keepalive={limits.max_keepalive_connections}, in-flight cap={settings.bulkhead_max_limit}")
+        print(f"{'mode':>9} {'peak conns':>11} {'failed':>7} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} {'checkouts/s':>12}")
+        try:
+            for http2 in (False, True):
+                result = await run_mode(base_url, ssl_context, http2, checkouts, items)
+                print(f"{result['protocol']:>9} {result['peak_connections']:>11} {result['failed']:>7} {result['p50']:>9} "
+                      f"{result['p99']:>9} {result['max']:>9.1f} {result['throughput']:>12.1f}")
+                if result["failures"]:
+                    print(f"          failed checkouts: {result['failures']}")
+        finally:
+            server.terminate()
+            server.join()
+
+    print("   (p50/p99 are histogram bucket upper bounds over successful checkouts; checkouts/s counts all)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checkouts", type=int, default=200)
+    parser.add_argument("--items", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--max-requests", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8443)
+    args = parser.parse_args()
+    asyncio.run(main(args.checkouts, args.items, args.latency_ms, args.max_requests, args.port))
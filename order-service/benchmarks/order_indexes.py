@@ -0,0 +1,156 @@
+"""
+Index migration benchmark: hot order queries before and after add_order_indexes
+
+Seeds synthetic orders (1M by default, a year of history) with three items
+and one status-history row each, drops the indexes the migration adds
+(order_items.order_id, order_status_history.order_id, orders(created_at, id)),
+times the hot read paths, rebuilds the indexes with
+migrations/add_order_indexes.py and times them again:
+
+    - items for a page of 20 orders (what selectinload(Order.order_items) runs)
+    - status history of one order
+    - orders on one day, func.date(created_at) = day (the old predicate)
+    - orders on one day, half-open created_at range (the current predicate)
+
+Seeded rows (order_number IDX-*) are deleted afterwards unless --keep is
+given; point DATABASE_URL at a scratch database.
+
+Usage:
+    python benchmarks/order_indexes.py [--rows 1000000] [--runs 20] [--keep]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, func, text
+from database.connection import engine, async_session_factory, close_database, create_tables
+from models.order import Order, OrderItem, OrderStatusHistory
+from migrations.add_order_indexes import add_order_indexes
+
+MIGRATION_INDEXES = ("ix_order_items_order_id", "ix_order_status_history_order_id", "ix_orders_created_at_id")
+
+SEED_ORDERS_SQL = text("""
+    INSERT INTO orders (
+        user_id, order_number, status, payment_status, subtotal, tax_amount, shipping_amount,
+        discount_amount, total_amount, shipping_address, shipping_city, shipping_state,
+        shipping_postal_code, shipping_country, customer_email, created_at, updated_at
+    )
+    SELECT
+        1 + (n % 5000), 'IDX-' || n, 'delivered', 'paid',
+        amount, amount * 0.10, 0, 0, amount * 1.10,
+        '1 Index Street', 'Index City', 'CA', '90210', 'USA',
+        'index' || (n % 5000) || '@example.com',
+        ts, ts
+    FROM (
+        SELECT n,
+               round((random() * 500)::numeric, 2) AS amount,
+               now()::timestamp - random() * interval '365 days' AS ts
+        FROM generate_series(1, :rows) AS n
+    ) AS seed
+""")
+
+SEED_ITEMS_SQL = text("""
+    INSERT INTO order_items (
+        order_id, product_id, product_name, unit_price, quantity, total_price, created_at, updated_at
+    )
+    SELECT o.id, 1 + (o.id * 7 + k) % 2000, 'Product ' || k, 10.00, 1, 10.00, o.created_at, o.created_at
+    FROM orders o CROSS JOIN generate_series(1, 3) AS k
+    WHERE o.order_number LIKE 'IDX-%'
+""")
+
+SEED_HISTORY_SQL = text("""
+    INSERT INTO order_status_history (order_id, old_status, new_status, changed_by, reason, created_at)
+    SELECT id, 'pending', 'delivered', 1, 'seed', created_at FROM orders WHERE order_number LIKE 'IDX-%'
+""")
+
+
+async def time_query(make_query, runs: int):
+    timings = []
+    async with async_session_factory() as session:
+        for _ in range(runs):
+            query = make_query()
+            started = time.perf_counter()
+            (await session.execute(query)).all()
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def measure(order_ids, runs: int):
+    def one_day():
+        return (datetime.utcnow() - timedelta(days=random.randint(1, 360))).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+
+    def day_range():
+        start = one_day()
+        return select(func.count()).where(Order.created_at >= start, Order.created_at < start + timedelta(days=1))
+
+    queries = {
+        "items for 20 orders": lambda: select(OrderItem).where(OrderItem.order_id.in_(random.sample(order_ids, 20))),
+        "history of one order": lambda: select(OrderStatusHistory).where(
+            OrderStatusHistory.order_id == random.choice(order_ids)
+        ),
+        "one day, func.date()": lambda: select(func.count()).where(func.date(Order.created_at) == one_day().date()),
+        "one day, half-open range": day_range
+    }
+    return {name: await time_query(make_query, runs) for name, make_query in queries.items()}
+
+
+async def main(rows: int, runs: int, keep: bool):
+    await create_tables()
+    try:
+        print(f"🌱 Seeding {rows:,} synthetic orders with items and history...")
+        async with async_session_factory() as session:
+            async with session.begin():
+                await session.execute(SEED_ORDERS_SQL, {"rows": rows})
+            # Without fresh stats the foreign-key checks below plan a seq scan on orders per row
+            await session.execute(text("ANALYZE orders"))
+            await session.commit()
+            async with session.begin():
+                await session.execute(SEED_ITEMS_SQL)
+                await session.execute(SEED_HISTORY_SQL)
+            order_ids = list((await session.execute(
+                select(Order.id).where(Order.order_number.like("IDX-%"))
+            )).scalars())
+
+        async with engine.begin() as conn:
+            for name in MIGRATION_INDEXES:
+                await conn.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+            await conn.execute(text("ANALYZE orders, order_items, order_status_history"))
+        before = await measure(order_ids, runs)
+
+        started = time.perf_counter()
+        built = await add_order_indexes()
+        build_seconds = time.perf_counter() - started
+        async with engine.begin() as conn:
+            await conn.execute(text("ANALYZE orders, order_items, order_status_history"))
+        after = await measure(order_ids, runs)
+
+        print(f"🔨 Built {', '.join(built)} concurrently in {build_seconds:.1f}s")
+        print(f"📊 Median query time over {runs} runs ({rows:,} orders, {rows * 3:,} items)")
+        print(f"{'query':>26} {'before (ms)':>12} {'after (ms)':>11} {'speedup':>8}")
+        for name in before:
+            print(f"{name:>26} {before[name]:>12.2f} {after[name]:>11.2f} {before[name] / after[name]:>7.1f}x")
+    finally:
+        if not keep:
+            async with async_session_factory() as session:
+                async with session.begin():
+                    # Items and history go with their orders (ON DELETE CASCADE)
+                    await session.execute(text("DELETE FROM orders WHERE order_number LIKE 'IDX-%'"))
+        await close_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.runs, args.keep))
@@ -0,0 +1,133 @@
+"""
+Admin order-stats benchmark: ten queries vs one conditional-aggregate scan
+
+Seeds a synthetic orders table (1M rows by default, spread over the last
+year, random statuses) and times the previous get_order_stats - ten
+COUNT/SUM round trips with func.date() predicates - against the current
+single-pass OrderService.compute_order_stats and the counter-table read
+(order_counters.read_stats), checking all return the same numbers. Seeded rows (order_number BENCH-*) are deleted afterwards unless
+--keep is given; point DATABASE_URL at a scratch database.
+
+Usage:
+    python benchmarks/order_stats.py [--rows 1000000] [--runs 10] [--keep]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import os
+import time
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, func, text
+from database.connection import async_session_factory, close_database, create_tables
+from models.order import Order, OrderStatus
+from schemas.order_schemas import OrderStats
+from services.order_service import OrderService
+from services.order_counters import order_counters
+
+SEED_SQL = text("""
+    INSERT INTO orders (
+        user_id, order_number, status, payment_status, subtotal, tax_amount, shipping_amount,
+        discount_amount, total_amount, shipping_address, shipping_city, shipping_state,
+        shipping_postal_code, shipping_country, customer_email, created_at, updated_at
+    )
+    SELECT
+        1 + (n % 5000),
+        'BENCH-' || n,
+        (ARRAY['pending','confirmed','processing','shipped','delivered','cancelled','refunded'])[1 + (n % 7)],
+        'pending',
+        amount, amount * 0.10, 0, 0, amount * 1.10,
+        '1 Bench Street', 'Bench City', 'CA', '90210', 'USA',
+        'bench' || (n % 5000) || '@example.com',
+        ts, ts
+    FROM (
+        SELECT n,
+               round((random() * 500)::numeric, 2) AS amount,
+               now()::timestamp - random() * interval '365 days' AS ts
+        FROM generate_series(1, :rows) AS n
+    ) AS seed
+""")
+
+
+async def legacy_order_stats(db) -> OrderStats:
+    """Previous implementation: ten separate round trips"""
+    counts = {}
+    counts["total_orders"] = await db.scalar(select(func.count(Order.id))) or 0
+    for status in ("pending", "confirmed", "processing", "shipped", "delivered", "cancelled"):
+        counts[f"{status}_orders"] = await db.scalar(
+            select(func.count(Order.id)).where(Order.status == OrderStatus(status))
+        ) or 0
+    total_revenue = await db.scalar(
+        select(func.sum(Order.total_amount)).where(Order.status.in_(
+            [OrderStatus.CONFIRMED, OrderStatus.PROCESSING, OrderStatus.SHIPPED, OrderStatus.DELIVERED]
+        ))
+    ) or Decimal('0.00')
+    today = datetime.now().date()
+    orders_today = await db.scalar(select(func.count(Order.id)).where(func.date(Order.created_at) == today)) or 0
+    month_start = datetime.now().replace(day=1).date()
+    orders_this_month = await db.scalar(
+        select(func.count(Order.id)).where(func.date(Order.created_at) >= month_start)
+    ) or 0
+    return OrderStats(**counts, total_revenue=total_revenue, orders_today=orders_today,
+                      orders_this_month=orders_this_month)
+
+
+async def time_runs(func, runs: int):
+    timings, result = [], None
+    for _ in range(runs):
+        async with async_session_factory() as session:
+            started = time.perf_counter()
+            result = await func(session)
+            timings.append((time.perf_counter() - started) * 1000)
+    return result, timings
+
+
+async def main(rows: int, runs: int, keep: bool):
+    await create_tables()
+    try:
+        print(f"🌱 Seeding {rows:,} synthetic orders...")
+        async with async_session_factory() as session:
+            async with session.begin():
+                await session.execute(SEED_SQL, {"rows": rows})
+            await session.execute(text("ANALYZE orders"))
+
+        # Warm-up so both variants run against a warm buffer cache
+        async with async_session_factory() as session:
+            await OrderService(session).compute_order_stats()
+
+        async with async_session_factory() as session:
+            await order_counters.reconcile(session, fix=True)
+
+        legacy, legacy_ms = await time_runs(legacy_order_stats, runs)
+        current, current_ms = await time_runs(lambda session: OrderService(session).compute_order_stats(), runs)
+        counters, counters_ms = await time_runs(order_counters.read_stats, runs)
+        assert legacy == current == counters, f"stats differ:\n{legacy}\n{current}\n{counters}"
+
+        print(f"📊 GET /admin/orders/stats query time over {runs} runs ({rows:,} seeded rows)")
+        print(f"{'variant':>22} {'median (ms)':>12} {'min (ms)':>9} {'max (ms)':>9}")
+        for name, timings in (("10 queries (before)", legacy_ms), ("single pass", current_ms),
+                              ("counter table", counters_ms)):
+            print(f"{name:>22} {statistics.median(timings):>12.1f} {min(timings):>9.1f} {max(timings):>9.1f}")
+        print(f"✅ Same results; single pass {statistics.median(legacy_ms) / statistics.median(current_ms):.1f}x, "
+              f"counters {statistics.median(legacy_ms) / statistics.median(counters_ms):.1f}x faster")
+    finally:
+        if not keep:
+            async with async_session_factory() as session:
+                async with session.begin():
+                    await session.execute(text("DELETE FROM orders WHERE order_number LIKE 'BENCH-%'"))
+            async with async_session_factory() as session:
+                await order_counters.reconcile(session, fix=True)
+        await close_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.runs, args.keep))
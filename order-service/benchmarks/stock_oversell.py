@@ -0,0 +1,64 @@
+"""
+Stock reservation oversell check
+
+Runs many parallel checkouts (reserve + confirm) against the Redis stock
+ledger for a single synthetic SKU and verifies that the number of units
+sold never exceeds the seeded stock. Needs REDIS_URL; the product service
+is not contacted (the synthetic SKU is seeded directly and never synced).
+
+Usage:
+    python benchmarks/stock_oversell.py [--stock 50] [--checkouts 500] [--quantity 1]
+"""
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.stock_reservations import (
+    stock_ledger, InsufficientStockError, AVAILABLE_PREFIX, HELD_PREFIX, PENDING_PREFIX, DIRTY_KEY
+)
+
+
+async def checkout(product_id: str, quantity: int) -> int:
+    try:
+        reservation_id = await stock_ledger.reserve(product_id, quantity)
+    except InsufficientStockError:
+        return 0
+    await asyncio.sleep(0)  # Let other checkouts interleave between reserve and confirm
+    return quantity if await stock_ledger.confirm(reservation_id) else 0
+
+
+async def main(stock: int, checkouts: int, quantity: int):
+    client = stock_ledger._get_redis()
+    product_id = f"oversell-check-{int(time.time())}"
+    keys = [f"{prefix}{product_id}" for prefix in (AVAILABLE_PREFIX, HELD_PREFIX, PENDING_PREFIX)]
+    await client.set(keys[0], stock, ex=600)
+
+    try:
+        start = time.perf_counter()
+        sold = await asyncio.gather(*[checkout(product_id, quantity) for _ in range(checkouts)])
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        units_sold = sum(sold)
+        available = int(await client.get(keys[0]) or 0)
+        print(f"📦 Seeded stock: {stock}, parallel checkouts: {checkouts} x {quantity} unit(s)")
+        print(f"   units sold: {units_sold}, remaining available: {available}, elapsed: {elapsed_ms:.0f} ms")
+        assert units_sold <= stock, "OVERSOLD"
+        assert units_sold + available == stock, "stock ledger out of balance"
+        print("✅ No oversell")
+    finally:
+        await client.delete(*keys)
+        await client.srem(DIRTY_KEY, product_id)
+        await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stock", type=int, default=50)
+    parser.add_argument("--checkouts", type=int, default=500)
+    parser.add_argument("--quantity", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.stock, args.checkouts, args.quantity))
@@ -1,23 +1,98 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
+from sqlalchemy import event, exc
 import sys
 import os
+import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.settings import settings
+from utils.metrics import Histogram
 
 # Convert PostgreSQL URL to async format for SQLAlchemy
 DATABASE_URL = settings.async_database_url
 
 print(f"🔗 Connecting to database: {DATABASE_URL}")
 
+# Track how long each connection stays checked out (exported on the admin-only GET /metrics)
+connection_hold_ms = Histogram()
+
+# Time spent waiting for a pooled connection (including opening a new one)
+pool_wait_ms = Histogram()
+pool_timeouts = 0
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        global pool_timeouts
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_timeouts += 1
+            raise
+        finally:
+            pool_wait_ms.observe((time.perf_counter() - started) * 1000)
+
+def build_engine():
+    """
+    Create the async engine for the configured pool mode
+    queue: persistent pooled connections (long-running servers)
+    null: a new connection per checkout (serverless / external pooler)
+    """
+    options = {
+        "echo": settings.is_development,  # Show SQL queries in development
+        "future": True  # Use SQLAlchemy 2.0 style
+    }
+    if settings.db_pool_mode == "null":
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping
+        )
+    return create_async_engine(DATABASE_URL, **options)
+
 # Create async engine
-engine = create_async_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # No connection pooling for simplicity
-    echo=settings.is_development,  # Show SQL queries in development
-    future=True  # Use SQLAlchemy 2.0 style
-)
+engine = build_engine()
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _record_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info["checked_out_at"] = time.perf_counter()
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _record_checkin(dbapi_connection, connection_record):
+    checked_out_at = connection_record.info.pop("checked_out_at", None)
+    if checked_out_at is not None:
+        connection_hold_ms.observe((time.perf_counter() - checked_out_at) * 1000)
+
+def get_pool_stats():
+    """Connection pool statistics (admin endpoint and GET /metrics)"""
+    pool = engine.pool
+    stats = {
+        "mode": settings.db_pool_mode,
+        "pool_class": type(pool).__name__,
+        "connection_hold_ms": connection_hold_ms.snapshot()
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update({
+            "pool_size": pool.size(),
+            "max_overflow": settings.db_max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "timeout_seconds": settings.db_pool_timeout,
+            "recycle_seconds": settings.db_pool_recycle,
+            "pre_ping": settings.db_pool_pre_ping,
+            "checkout_timeouts": pool_timeouts,
+            "wait_ms": pool_wait_ms.snapshot()
+        })
+    return stats
 
 # Create async session factory
 async_session_factory = sessionmaker(
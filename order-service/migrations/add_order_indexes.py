@@ -0,0 +1,88 @@
+import asyncio
+import re
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+from database.connection import Base, engine, create_tables, check_connection
+from models.order import (
+    Order, OrderItem, OrderStatusHistory, OrderOutboxEvent, OrderStatCounter,
+    OrderRollup, OrderRollupWatermark, ProductSalesDaily
+)
+
+# Leftover of an interrupted CONCURRENTLY build: exists but is not used by the planner
+INVALID_INDEX_SQL = text("""
+    SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE c.relname = :name AND NOT i.indisvalid
+""")
+
+# Indexes no longer declared on the models -> the index that replaced them
+SUPERSEDED_INDEXES = {
+    "ix_orders_user_id": "ix_orders_user_created_at",  # user_id leads the composite index
+}
+
+
+def concurrent_ddl(index, dialect) -> str:
+    """CREATE INDEX CONCURRENTLY IF NOT EXISTS for a model index"""
+    ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect))
+    return re.sub(r"^CREATE (UNIQUE )?INDEX", r"CREATE \1INDEX CONCURRENTLY", ddl)
+
+
+async def add_order_indexes(bind=engine) -> list:
+    """
+    Build every index declared on the models that the database is missing
+    create_all only indexes tables it creates, so indexes added to existing
+    tables are built here with CONCURRENTLY (no write lock on the table).
+    Superseded indexes are then dropped, also CONCURRENTLY, once their
+    replacement exists.
+    CONCURRENTLY cannot run inside a transaction, hence AUTOCOMMIT.
+    Returns the names of the indexes built.
+    """
+    autocommit = bind.execution_options(isolation_level="AUTOCOMMIT")
+    built = []
+    async with autocommit.connect() as conn:
+        # Large tables can take minutes; do not let a session default cut the build short
+        await conn.execute(text("SET statement_timeout = 0"))
+        for table in Base.metadata.sorted_tables:
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if await conn.scalar(INVALID_INDEX_SQL, {"name": index.name}):
+                    print(f"♻️  Rebuilding invalid index {index.name}")
+                    await conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"'))
+
+                exists = await conn.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": index.name})
+                if exists:
+                    continue
+                print(f"🔨 Building index {index.name} on {table.name}...")
+                await conn.exec_driver_sql(concurrent_ddl(index, conn.dialect))
+                built.append(index.name)
+
+        for name, replacement in SUPERSEDED_INDEXES.items():
+            if await conn.scalar(INVALID_INDEX_SQL, {"name": replacement}):
+                continue  # Keep the old index until its replacement is usable
+            exists = await conn.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+            if exists:
+                print(f"🧹 Dropping redundant index {name} (superseded by {replacement})")
+                await conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+    return built
+
+
+async def main():
+    print("🚀 Order Service Index Migration")
+    print("=" * 40)
+
+    # Check connection
+    if not await check_connection():
+        print("❌ Database connection failed")
+        return
+
+    # New tables get their indexes from create_all
+    await create_tables()
+    built = await add_order_indexes()
+    print(f"✅ Order indexes up to date ({len(built)} built)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
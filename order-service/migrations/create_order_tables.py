@@ -6,7 +6,10 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.connection import create_tables, drop_tables, check_connection
-from models.order import Order, OrderItem, OrderStatusHistory
+from models.order import (
+    Order, OrderItem, OrderStatusHistory, OrderOutboxEvent, OrderStatCounter,
+    OrderRollup, OrderRollupWatermark, ProductSalesDaily
+)
 
 async def main():
     print("🚀 Order Service Database Migration")
@@ -2,7 +2,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, DECIMAL
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, ForeignKey, Text, DECIMAL, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.connection import Base
@@ -24,11 +24,16 @@ class PaymentStatus(str, Enum):
     FAILED = "failed"
     REFUNDED = "refunded"
 
+class OutboxStatus(str, Enum):
+    PENDING = "pending"
+    DISPATCHED = "dispatched"
+    FAILED = "failed"
+
 class Order(Base):
     __tablename__ = "orders"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)  # Served by ix_orders_user_created_at
     
     # Order details
     order_number = Column(String(50), unique=True, nullable=False, index=True)
@@ -73,13 +78,27 @@ class Order(Base):
     cancelled_at = Column(DateTime)
     
     # Relationships
-    order_items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
+    order_items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan",
+                               order_by="OrderItem.id")
+
+    __table_args__ = (
+        # Rollup job picks up new and changed orders by updated_at watermark
+        Index("ix_orders_updated_at", "updated_at"),
+        # Order listings: newest first on (created_at, id), optionally narrowed
+        # by user or status (see OrderService.filter_orders)
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_user_created_at", "user_id", "created_at", "id"),
+        Index("ix_orders_status_created_at", "status", "created_at", "id"),
+        # Small, hot subset: orders still awaiting payment
+        Index("ix_orders_payment_pending_created_at", "created_at", "id",
+              postgresql_where=text("payment_status = 'pending'")),
+    )
 
 class OrderItem(Base):
     __tablename__ = "order_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Product details
     product_id = Column(Integer, nullable=False)
@@ -106,7 +125,7 @@ class OrderStatusHistory(Base):
     __tablename__ = "order_status_history"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Status change details
     old_status = Column(String(20))
@@ -115,4 +134,84 @@ class OrderStatusHistory(Base):
     reason = Column(Text)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
\ No newline at end of file
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+
+class OrderOutboxEvent(Base):
+    """Post-checkout side effect, written in the same transaction as the order"""
+    __tablename__ = "order_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=True)
+    
+    # Event details
+    event_type = Column(String(50), nullable=False)
+    dedupe_key = Column(String(255), unique=True, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    
+    # Delivery state
+    status = Column(String(20), default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=func.now(), nullable=False)
+    last_error = Column(Text)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    dispatched_at = Column(DateTime)
+    
+    __table_args__ = (
+        # Dispatcher scans only undelivered events, oldest due first
+        Index(
+            "ix_order_outbox_pending_due",
+            "next_attempt_at",
+            postgresql_where=(status == OutboxStatus.PENDING.value)
+        ),
+    )
+
+class OrderStatCounter(Base):
+    """Admin dashboard counters, updated in the same transaction as order writes"""
+    __tablename__ = "order_stat_counters"
+    
+    # "status:<status>" (orders and total amount per status) or "day:<YYYY-MM-DD>" (orders created that day)
+    key = Column(String(64), primary_key=True)
+    order_count = Column(BigInteger, default=0, nullable=False)
+    amount = Column(DECIMAL(14, 2), default=0, nullable=False)
+    
+    # Timestamps
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+class OrderRollup(Base):
+    """Pre-aggregated order volume per time bucket and status (hourly and daily)"""
+    __tablename__ = "order_rollups"
+    
+    granularity = Column(String(10), primary_key=True)  # "hour" or "day"
+    bucket_start = Column(DateTime, primary_key=True)
+    status = Column(String(20), primary_key=True)
+    order_count = Column(BigInteger, default=0, nullable=False)
+    amount = Column(DECIMAL(14, 2), default=0, nullable=False)  # Sum of total_amount
+    
+    # Timestamps
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+class ProductSalesDaily(Base):
+    """Per-product sales per day (cancelled and refunded orders excluded)"""
+    __tablename__ = "product_sales_daily"
+    
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    product_name = Column(String(255))
+    units = Column(BigInteger, default=0, nullable=False)
+    revenue = Column(DECIMAL(14, 2), default=0, nullable=False)  # Sum of item total_price
+    order_count = Column(BigInteger, default=0, nullable=False)
+    
+    # Timestamps
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+class OrderRollupWatermark(Base):
+    """How far (by orders.updated_at) a rollup job has processed"""
+    __tablename__ = "order_rollup_watermarks"
+    
+    name = Column(String(50), primary_key=True)
+    watermark = Column(DateTime, nullable=False)
+    
+    # Timestamps
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
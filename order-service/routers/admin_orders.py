@@ -2,13 +2,20 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from database.connection import get_db
+from typing import List, Optional, Union
+from datetime import date, datetime, timedelta
+from database.connection import get_db, get_pool_stats
 from utils.auth import get_current_admin_user, User
 from services.order_service import OrderService
-from schemas.order_schemas import OrderResponse, OrderSummary, OrderUpdate, OrderStats
+from services.order_json import render_order_json
+from config.settings import settings
+from services.order_counters import order_counters
+from services.order_rollups import order_rollups, naive_utc
+from utils.pagination import InvalidCursorError, build_order_page
+from schemas.order_schemas import OrderResponse, OrderSummary, OrderUpdate, OrderStats, OrderTimeSeries, TopProducts, OrderPage, OrderFilters
+from models.order import OrderStatus, PaymentStatus
 
 router = APIRouter(prefix="/admin/orders", tags=["admin-orders"])
 
@@ -22,25 +29,102 @@ async def get_order_statistics(
     stats = await order_service.get_order_stats()
     return stats
 
-@router.get("/", response_model=List[OrderSummary])
+@router.get("/timeseries", response_model=OrderTimeSeries)
+async def get_order_timeseries(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: str = "day",
+    status_filter: Optional[OrderStatus] = Query(None, alias="status"),
+    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Order count, revenue and average basket per hour or day, served from rollups (admin only)"""
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=30)
+    try:
+        return await order_rollups.timeseries(db, start, end, granularity, status_filter)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/top-products", response_model=TopProducts)
+async def get_top_products(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = Query(10, ge=1, le=100),
+    metric: str = "units",
+    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Best-selling products over a date range, served from sales rollups (admin only)"""
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
+    try:
+        return await order_rollups.top_products(db, start, end, limit, metric)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.post("/stats/reconcile")
+async def reconcile_order_statistics(
+    fix: bool = True,
+    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Recompute dashboard counters from orders and report drift (admin only)"""
+    return await order_counters.reconcile(db, fix=fix)
+
+@router.get("/db-pool")
+async def get_database_pool_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Database connection pool statistics (admin only)"""
+    return get_pool_stats()
+
+@router.get("/", response_model=Union[List[OrderSummary], OrderPage])
 async def get_all_orders(
+    request: Request,
     page: int = 1,
     size: int = 20,
+    pagination: str = "offset",
+    cursor: Optional[str] = None,
+    user_id: Optional[int] = None,
+    status_filter: Optional[OrderStatus] = Query(None, alias="status"),
+    payment_status: Optional[PaymentStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
     current_user: User = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all orders (admin only)"""
+    """
+    Get all orders (admin only), optionally filtered by user, status,
+    payment status and a [created_from, created_to) range
+    pagination=cursor returns an OrderPage
+    """
     order_service = OrderService(db)
+    filters = OrderFilters(
+        user_id=user_id,
+        status=status_filter,
+        payment_status=payment_status,
+        created_from=naive_utc(created_from) if created_from else None,
+        created_to=naive_utc(created_to) if created_to else None
+    )
     
-    # For admin, we'll get all orders across all users
-    from sqlalchemy import select, desc
-    from models.order import Order
-    
-    offset = (page - 1) * size
-    query = select(Order).order_by(desc(Order.created_at)).offset(offset).limit(size)
-    result = await db.execute(query)
-    orders = result.scalars().all()
+    if pagination == "cursor" or cursor is not None:
+        try:
+            orders, next_cursor, prev_cursor = await order_service.get_orders_page(None, size, cursor, filters)
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        return build_order_page(request, orders, size, next_cursor, prev_cursor)
     
+    orders = await order_service.search_orders(filters, page, size)
     return orders
 
 @router.get("/{order_id}", response_model=OrderResponse)
@@ -50,6 +134,15 @@ async def get_order_by_id_admin(
     db: AsyncSession = Depends(get_db)
 ):
     """Get any order by ID (admin only)"""
+    if settings.order_json_fast_path:
+        body = await render_order_json(db, order_id, current_user)
+        if body is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Order not found"
+            )
+        return Response(content=body, media_type="application/json")
+
     order_service = OrderService(db)
     order = await order_service.get_order_by_id(order_id, current_user)
     
@@ -2,13 +2,19 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import List, Optional, Union
 from database.connection import get_db
 from utils.auth import get_current_user, User
-from services.order_service import OrderService
-from schemas.order_schemas import OrderCreate, OrderResponse, OrderSummary, OrderUpdate
+from services.order_service import OrderService, ProductLookupError
+from services.order_json import render_order_json
+from config.settings import settings
+from utils.circuit_breaker import CircuitOpenError
+from utils.bulkhead import BulkheadFullError
+from utils.deadline import DeadlineExceeded
+from utils.pagination import InvalidCursorError, build_order_page
+from schemas.order_schemas import OrderCreate, OrderResponse, OrderSummary, OrderUpdate, OrderPage
 
 router = APIRouter()
 
@@ -29,6 +35,28 @@ async def create_order_simple(
     try:
         order = await order_service.create_order_simple(order_data, current_user, token)
         return order
+    except DeadlineExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e)
+        )
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, int(e.retry_after + 0.999)))}
+        )
+    except BulkheadFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    except ProductLookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -40,17 +68,34 @@ async def create_order_simple(
             detail="Failed to create order"
         )
 
-@router.get("/", response_model=List[OrderSummary])
+@router.get("/", response_model=Union[List[OrderSummary], OrderPage])
 async def get_my_orders(
+    request: Request,
     page: int = 1,
     size: int = 10,
+    pagination: str = "offset",
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get current user's orders"""
+    """
+    Get current user's orders
+    pagination=cursor (or any cursor) returns an OrderPage with next/prev
+    cursors; the default page/size offset mode returns a plain list
+    """
     order_service = OrderService(db)
-    orders = await order_service.get_user_orders(current_user.id, page, size)
-    return orders
+    if pagination != "cursor" and cursor is None:
+        orders = await order_service.get_user_orders(current_user.id, page, size)
+        return orders
+
+    try:
+        orders, next_cursor, prev_cursor = await order_service.get_orders_page(current_user.id, size, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return build_order_page(request, orders, size, next_cursor, prev_cursor)
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
@@ -59,6 +104,15 @@ async def get_order(
     db: AsyncSession = Depends(get_db)
 ):
     """Get specific order by ID"""
+    if settings.order_json_fast_path:
+        body = await render_order_json(db, order_id, current_user)
+        if body is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Order not found"
+            )
+        return Response(content=body, media_type="application/json")
+
     order_service = OrderService(db)
     order = await order_service.get_order_by_id(order_id, current_user)
     
@@ -3,8 +3,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional
+from datetime import date, datetime
 from decimal import Decimal
 from models.order import OrderStatus, PaymentStatus
 
@@ -114,6 +114,23 @@ class OrderSummary(BaseModel):
     class Config:
         from_attributes = True
 
+# Cursor-paginated order list (newest first)
+class OrderPage(BaseModel):
+    items: List[OrderSummary]
+    size: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    next: Optional[str] = None  # Link to the next (older) page
+    prev: Optional[str] = None  # Link to the previous (newer) page
+
+# Server-side filters for the admin order list (all optional, combined with AND)
+class OrderFilters(BaseModel):
+    user_id: Optional[int] = None
+    status: Optional[OrderStatus] = None
+    payment_status: Optional[PaymentStatus] = None
+    created_from: Optional[datetime] = None  # Inclusive
+    created_to: Optional[datetime] = None  # Exclusive
+
 # Order update schema
 class OrderUpdate(BaseModel):
     status: Optional[OrderStatus] = None
@@ -132,4 +149,38 @@ class OrderStats(BaseModel):
     cancelled_orders: int
     total_revenue: Decimal
     orders_today: int
-    orders_this_month: int
\ No newline at end of file
+    orders_this_month: int
+
+# Order time series for admin (served from rollups)
+class StatusVolume(BaseModel):
+    order_count: int
+    amount: Decimal
+
+class TimeSeriesPoint(BaseModel):
+    bucket_start: datetime
+    order_count: int
+    revenue: Decimal
+    average_basket: Decimal
+    by_status: Dict[str, StatusVolume]
+
+class OrderTimeSeries(BaseModel):
+    granularity: str
+    start: datetime
+    end: datetime
+    status: Optional[OrderStatus] = None
+    watermark: Optional[datetime] = None
+    points: List[TimeSeriesPoint]
+
+# Best sellers for admin (served from product sales rollups)
+class ProductSales(BaseModel):
+    product_id: int
+    product_name: Optional[str] = None
+    units: int
+    revenue: Decimal
+    order_count: int
+
+class TopProducts(BaseModel):
+    start: date
+    end: date
+    metric: str
+    products: List[ProductSales]
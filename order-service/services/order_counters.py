@@ -0,0 +1,219 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import select, func, cast, Date, literal_column, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.connection import async_session_factory
+from models.order import Order, OrderStatCounter, OrderStatus
+from schemas.order_schemas import OrderStats
+from config.settings import settings
+
+Delta = Tuple[int, Decimal]  # (order count, amount)
+
+REVENUE_STATUSES = (OrderStatus.CONFIRMED, OrderStatus.PROCESSING, OrderStatus.SHIPPED, OrderStatus.DELIVERED)
+
+RECONCILE_LOCK_ID = 7_310_001  # pg_advisory_xact_lock key serialising reconciliations
+
+
+def status_key(status: Any) -> str:
+    return f"status:{getattr(status, 'value', status)}"
+
+
+def day_key(day: date) -> str:
+    return f"day:{day.isoformat()}"
+
+
+class OrderCounterStore:
+    """
+    Incrementally maintained admin dashboard stats
+    Order writes and status transitions upsert small deltas into
+    order_stat_counters inside their own transaction, so GET
+    /admin/orders/stats reads a handful of rows instead of scanning orders.
+    reconcile() recomputes the counters from the base tables and reports
+    (and optionally repairs, with corrective deltas) any drift.
+    """
+
+    def __init__(self, reconcile_interval: float):
+        self.reconcile_interval = reconcile_interval
+        self._task: Optional[asyncio.Task] = None
+        self.reconciliations = 0
+        self.last_reconciled_at: Optional[datetime] = None
+        self.last_drift: List[Dict[str, Any]] = []
+
+    async def apply(self, db: AsyncSession, deltas: Dict[str, Delta]):
+        """Add deltas to the counters in the caller's transaction"""
+        deltas = {key: delta for key, delta in deltas.items() if delta != (0, Decimal('0'))}
+        if not deltas:
+            return
+        now = datetime.utcnow()
+        # Sorted keys give every transaction the same row-lock order (no deadlocks)
+        stmt = pg_insert(OrderStatCounter).values([
+            {"key": key, "order_count": count, "amount": amount, "updated_at": now}
+            for key, (count, amount) in sorted(deltas.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[OrderStatCounter.key],
+            set_={
+                "order_count": OrderStatCounter.order_count + stmt.excluded.order_count,
+                "amount": OrderStatCounter.amount + stmt.excluded.amount,
+                "updated_at": stmt.excluded.updated_at
+            }
+        )
+        await db.execute(stmt)
+
+    async def record_order_created(self, db: AsyncSession, order: Order):
+        amount = Decimal(order.total_amount or 0)
+        await self.apply(db, {
+            status_key(order.status): (1, amount),
+            day_key(order.created_at.date()): (1, Decimal('0'))
+        })
+
+    async def record_status_change(self, db: AsyncSession, old_status: Any, new_status: Any, amount: Decimal):
+        if status_key(old_status) == status_key(new_status):
+            return
+        amount = Decimal(amount or 0)
+        await self.apply(db, {
+            status_key(old_status): (-1, -amount),
+            status_key(new_status): (1, amount)
+        })
+
+    async def read_stats(self, db: AsyncSession) -> OrderStats:
+        """Dashboard stats from the counters: one primary-key lookup per status and day of month"""
+        today = datetime.now().date()
+        month_start = today.replace(day=1)
+        days = [day_key(month_start + timedelta(days=offset)) for offset in range((today - month_start).days + 1)]
+        statuses = [status_key(status) for status in OrderStatus]
+
+        result = await db.execute(
+            select(OrderStatCounter.key, OrderStatCounter.order_count, OrderStatCounter.amount)
+            .where(OrderStatCounter.key.in_(statuses + days))
+        )
+        counters = {row.key: (row.order_count, row.amount) for row in result}
+
+        def count(key: str) -> int:
+            return int(counters.get(key, (0, 0))[0])
+
+        return OrderStats(
+            total_orders=sum(count(key) for key in statuses),
+            pending_orders=count(status_key(OrderStatus.PENDING)),
+            confirmed_orders=count(status_key(OrderStatus.CONFIRMED)),
+            processing_orders=count(status_key(OrderStatus.PROCESSING)),
+            shipped_orders=count(status_key(OrderStatus.SHIPPED)),
+            delivered_orders=count(status_key(OrderStatus.DELIVERED)),
+            cancelled_orders=count(status_key(OrderStatus.CANCELLED)),
+            total_revenue=sum(
+                (Decimal(counters.get(status_key(status), (0, 0))[1]) for status in REVENUE_STATUSES),
+                Decimal('0.00')
+            ),
+            orders_today=count(day_key(today)),
+            orders_this_month=sum(count(key) for key in days)
+        )
+
+    def _drift_query(self):
+        """
+        Actual and stored values for every counter key in one statement
+        A single statement reads one snapshot, and order writes move their
+        counters in the same transaction, so any difference is real drift
+        rather than a write that landed between two reads.
+        """
+        zero = literal_column("0")
+        created_day = cast(Order.created_at, Date)
+        rows = union_all(
+            select(
+                func.concat(literal_column("'status:'"), Order.status).label("key"),
+                func.count().label("actual_count"),
+                func.coalesce(func.sum(Order.total_amount), 0).label("actual_amount"),
+                zero.label("stored_count"), zero.label("stored_amount")
+            ).group_by(Order.status),
+            select(
+                func.concat(literal_column("'day:'"), func.to_char(created_day, literal_column("'YYYY-MM-DD'"))),
+                func.count(), zero, zero, zero
+            ).group_by(created_day),
+            select(OrderStatCounter.key, zero, zero, OrderStatCounter.order_count, OrderStatCounter.amount)
+        ).subquery()
+        return select(
+            rows.c.key,
+            func.sum(rows.c.actual_count), func.sum(rows.c.actual_amount),
+            func.sum(rows.c.stored_count), func.sum(rows.c.stored_amount)
+        ).group_by(rows.c.key).order_by(rows.c.key)
+
+    async def reconcile(self, db: AsyncSession, fix: bool = True) -> Dict[str, Any]:
+        """
+        Recompute counters from orders and compare with the stored values
+        Nothing is table-locked: with fix=True each drifted key gets a
+        corrective delta through the same additive upsert order writes use,
+        so checkouts keep committing while the aggregates are computed.
+        """
+        async with db.begin():
+            if fix:
+                # Replicas reconciling at once would otherwise apply the same correction twice
+                await db.execute(select(func.pg_advisory_xact_lock(RECONCILE_LOCK_ID)))
+            rows = (await db.execute(self._drift_query())).all()
+
+            drift, corrections = [], {}
+            for key, actual_count, actual_amount, stored_count, stored_amount in rows:
+                expected, current = (int(actual_count), Decimal(actual_amount)), (int(stored_count), Decimal(stored_amount))
+                if expected != current:
+                    drift.append({
+                        "key": key,
+                        "stored_count": current[0],
+                        "actual_count": expected[0],
+                        "stored_amount": str(current[1]),
+                        "actual_amount": str(expected[1])
+                    })
+                    corrections[key] = (expected[0] - current[0], expected[1] - current[1])
+
+            if fix and corrections:
+                await self.apply(db, corrections)
+
+        self.reconciliations += 1
+        self.last_reconciled_at = datetime.utcnow()
+        self.last_drift = drift
+        if drift:
+            print(f"⚠️  Order stat counters drifted on {len(drift)} keys{' (repaired)' if fix else ''}")
+        return {"drift": drift, "repaired": fix and bool(drift), "checked_keys": len(rows)}
+
+    async def _run(self):
+        while True:
+            try:
+                async with async_session_factory() as session:
+                    await self.reconcile(session, fix=True)
+            except Exception as e:
+                print(f"⚠️  Order stat reconciliation failed: {e}")
+            await asyncio.sleep(self.reconcile_interval)
+
+    async def start(self):
+        """Seed/repair the counters now, then reconcile periodically (interval 0 = startup only)"""
+        if self.reconcile_interval > 0:
+            self._task = asyncio.create_task(self._run())
+        else:
+            async with async_session_factory() as session:
+                await self.reconcile(session, fix=True)
+        print("🧮 Order stat counters ready")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "source": settings.order_stats_source,
+            "reconciliations": self.reconciliations,
+            "last_reconciled_at": self.last_reconciled_at.isoformat() if self.last_reconciled_at else None,
+            "last_drift_keys": len(self.last_drift)
+        }
+
+
+# Global instance
+order_counters = OrderCounterStore(reconcile_interval=settings.order_stats_reconcile_seconds)
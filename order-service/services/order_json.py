@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import typing
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional, Type
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.order_schemas import OrderResponse, OrderItemResponse
+from utils.auth import User
+
+
+def _base_type(annotation):
+    """Optional[X] -> X"""
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    return args[0] if typing.get_origin(annotation) is typing.Union and len(args) == 1 else annotation
+
+
+def _render(column: str, annotation) -> str:
+    """
+    SQL rendering one column exactly as the response model serialises it:
+    ints as numbers, Decimals as strings, datetimes as ISO 8601 with
+    microseconds only when non-zero, everything else as a JSON string
+    """
+    kind = _base_type(annotation)
+    if kind is int:
+        sql = f"{column}::text"
+    elif kind is Decimal:
+        sql = f"to_json({column}::text)::text"
+    elif kind is datetime:
+        sql = (
+            f"""'"' || to_char({column}, 'YYYY-MM-DD"T"HH24:MI:SS') """
+            f"""|| CASE WHEN date_part('microseconds', {column})::int % 1000000 = 0 THEN '' """
+            f"""ELSE to_char({column}, '.US') END || '"'"""
+        )
+    else:
+        sql = f"to_json({column})::text"
+    return f"coalesce({sql}, 'null')"
+
+
+def _object_sql(model: Type[BaseModel], alias: str, nested: dict) -> str:
+    """Compact JSON object for one row, keys in model field order"""
+    parts = []
+    for index, (name, field) in enumerate(model.model_fields.items()):
+        value = nested[name] if name in nested else _render(f"{alias}.{name}", field.annotation)
+        parts.append(f"""'{"," if index else "{"}"{name}":' || {value}""")
+    return " || ".join(parts) + " || '}'"
+
+
+ITEMS_SQL = (
+    f"coalesce((SELECT '[' || string_agg({_object_sql(OrderItemResponse, 'i', {})}, ',' ORDER BY i.id) || ']' "
+    f"FROM order_items i WHERE i.order_id = o.id), '[]')"
+)
+
+ORDER_JSON_SQL = f"SELECT {_object_sql(OrderResponse, 'o', {'order_items': ITEMS_SQL})} FROM orders o WHERE o.id = :order_id"
+
+
+async def render_order_json(db: AsyncSession, order_id: int, user: User) -> Optional[bytes]:
+    """
+    One order as OrderResponse JSON, built entirely in Postgres
+    Same bytes the ORM + Pydantic path returns (see
+    tests/test_order_json.py), without hydrating ORM objects or validating
+    the model. None when not found or not the user's order.
+    """
+    query, params = ORDER_JSON_SQL, {"order_id": order_id}
+    if not user.is_admin:
+        query, params = query + " AND o.user_id = :user_id", {**params, "user_id": user.id}
+    body = await db.scalar(text(query), params)
+    return body.encode("utf-8") if body is not None else None
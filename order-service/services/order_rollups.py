@@ -0,0 +1,297 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import heapq
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select, func, delete, insert, literal, literal_column, cast, Date
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.connection import async_session_factory
+from models.order import Order, OrderItem, OrderRollup, OrderRollupWatermark, ProductSalesDaily, OrderStatus
+from schemas.order_schemas import OrderTimeSeries, TimeSeriesPoint, StatusVolume, TopProducts, ProductSales
+from services.order_counters import REVENUE_STATUSES
+from config.settings import settings
+
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# Rendered inline (not as bind parameters) so GROUP BY matches the select list
+HOUR = literal_column("'hour'")
+DAY = literal_column("'day'")
+
+# Orders that do not count as sales in the product rollup
+EXCLUDED_SALES_STATUSES = (OrderStatus.CANCELLED, OrderStatus.REFUNDED)
+TOP_PRODUCT_METRICS = ("units", "revenue", "order_count")
+
+CHUNK_SIZE = 1000
+EPOCH = datetime(1970, 1, 1)
+
+
+def truncate(moment: datetime, granularity: str) -> datetime:
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if granularity == "day" else moment
+
+
+def naive_utc(moment: datetime) -> datetime:
+    """Order timestamps are stored as naive UTC"""
+    return moment.astimezone(timezone.utc).replace(tzinfo=None) if moment.tzinfo else moment
+
+
+def chunks(items: List[Any], size: int = CHUNK_SIZE):
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+class OrderRollupJob:
+    """
+    Hourly and daily order rollups (count and amount per bucket and status)
+    plus per-product daily sales (units, revenue, orders)
+    Each run finds orders created or changed since the watermark (by
+    updated_at, re-reading an overlap window to catch late commits),
+    recomputes only the hour buckets those orders fall in, then rebuilds
+    the touched days from the hour rows and the touched days' product sales
+    from order_items. Recomputing whole buckets keeps
+    runs idempotent; a row lock on the watermark serialises replicas.
+    """
+
+    WATERMARK = "orders"
+
+    def __init__(self, interval: float, overlap: float, max_points: int):
+        self.interval = interval
+        self.overlap = timedelta(seconds=overlap)
+        self.max_points = max_points
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.hours_rebuilt = 0
+        self.days_rebuilt = 0
+        self.watermark: Optional[datetime] = None
+
+    async def _lock_watermark(self, session: AsyncSession) -> OrderRollupWatermark:
+        await session.execute(
+            pg_insert(OrderRollupWatermark)
+            .values(name=self.WATERMARK, watermark=EPOCH)
+            .on_conflict_do_nothing(index_elements=[OrderRollupWatermark.name])
+        )
+        result = await session.execute(
+            select(OrderRollupWatermark).where(OrderRollupWatermark.name == self.WATERMARK).with_for_update()
+        )
+        return result.scalar_one()
+
+    async def _rebuild_hours(self, session: AsyncSession, hours: List[datetime]):
+        hour = func.date_trunc(HOUR, Order.created_at)
+        for chunk in chunks(hours):
+            await session.execute(
+                delete(OrderRollup).where(OrderRollup.granularity == "hour", OrderRollup.bucket_start.in_(chunk))
+            )
+            await session.execute(insert(OrderRollup).from_select(
+                ["granularity", "bucket_start", "status", "order_count", "amount"],
+                select(literal("hour"), hour, Order.status, func.count(), func.coalesce(func.sum(Order.total_amount), 0))
+                .where(
+                    # Range first so the created_at index narrows the scan
+                    Order.created_at >= min(chunk),
+                    Order.created_at < max(chunk) + GRANULARITIES["hour"],
+                    hour.in_(chunk)
+                )
+                .group_by(hour, Order.status)
+            ))
+
+    async def _rebuild_days(self, session: AsyncSession, days: List[datetime]):
+        day = func.date_trunc(DAY, OrderRollup.bucket_start)
+        for chunk in chunks(days):
+            await session.execute(
+                delete(OrderRollup).where(OrderRollup.granularity == "day", OrderRollup.bucket_start.in_(chunk))
+            )
+            await session.execute(insert(OrderRollup).from_select(
+                ["granularity", "bucket_start", "status", "order_count", "amount"],
+                select(literal("day"), day, OrderRollup.status, func.sum(OrderRollup.order_count), func.sum(OrderRollup.amount))
+                .where(
+                    OrderRollup.granularity == "hour",
+                    OrderRollup.bucket_start >= min(chunk),
+                    OrderRollup.bucket_start < max(chunk) + GRANULARITIES["day"]
+                )
+                .group_by(day, OrderRollup.status)
+            ))
+
+    async def _rebuild_product_days(self, session: AsyncSession, days: List[datetime]):
+        day = cast(func.date_trunc(DAY, Order.created_at), Date)
+        for chunk in chunks(days):
+            await session.execute(
+                delete(ProductSalesDaily).where(ProductSalesDaily.day.in_([moment.date() for moment in chunk]))
+            )
+            await session.execute(insert(ProductSalesDaily).from_select(
+                ["day", "product_id", "product_name", "units", "revenue", "order_count"],
+                select(
+                    day, OrderItem.product_id, func.max(OrderItem.product_name), func.sum(OrderItem.quantity),
+                    func.sum(OrderItem.total_price), func.count(func.distinct(Order.id))
+                )
+                .join(Order, Order.id == OrderItem.order_id)
+                .where(
+                    Order.created_at >= min(chunk),
+                    Order.created_at < max(chunk) + GRANULARITIES["day"],
+                    Order.status.notin_(EXCLUDED_SALES_STATUSES)
+                )
+                .group_by(day, OrderItem.product_id)
+            ))
+
+    async def run_once(self) -> int:
+        """Process orders changed since the watermark; returns the number of hour buckets rebuilt"""
+        async with async_session_factory() as session:
+            async with session.begin():
+                state = await self._lock_watermark(session)
+                since = state.watermark - self.overlap if state.watermark > EPOCH else EPOCH
+                changed = Order.updated_at > since
+
+                new_watermark = await session.scalar(select(func.max(Order.updated_at)).where(changed))
+                if new_watermark is None:
+                    self.watermark = state.watermark
+                    return 0
+
+                hour = func.date_trunc(HOUR, Order.created_at)
+                hours = sorted(row[0] for row in await session.execute(select(hour).where(changed).distinct()))
+                days = sorted({truncate(moment, "day") for moment in hours})
+                await self._rebuild_hours(session, hours)
+                await self._rebuild_days(session, days)
+                await self._rebuild_product_days(session, days)
+
+                state.watermark = max(state.watermark, new_watermark)
+                self.watermark = state.watermark
+
+        self.runs += 1
+        self.hours_rebuilt += len(hours)
+        self.days_rebuilt += len(days)
+        return len(hours)
+
+    async def timeseries(self, db: AsyncSession, start: datetime, end: datetime, granularity: str,
+                         status: Optional[str] = None) -> OrderTimeSeries:
+        """Order volume per bucket in [start, end), zero-filled, served from the rollups"""
+        start, end = naive_utc(start), naive_utc(end)
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+        if end <= start:
+            raise ValueError("end must be after start")
+        step = GRANULARITIES[granularity]
+        first = truncate(start, granularity)
+        if (end - first) / step > self.max_points:
+            raise ValueError(f"Range too large: at most {self.max_points} {granularity} buckets")
+
+        query = select(OrderRollup.bucket_start, OrderRollup.status, OrderRollup.order_count, OrderRollup.amount).where(
+            OrderRollup.granularity == granularity,
+            OrderRollup.bucket_start >= first,
+            OrderRollup.bucket_start < end
+        )
+        if status:
+            query = query.where(OrderRollup.status == status)
+        buckets: Dict[datetime, Dict[str, StatusVolume]] = {}
+        for row in await db.execute(query):
+            buckets.setdefault(row.bucket_start, {})[row.status] = StatusVolume(
+                order_count=row.order_count, amount=row.amount
+            )
+
+        revenue_statuses = {getattr(s, "value", s) for s in REVENUE_STATUSES}
+        points = []
+        bucket_start = first
+        while bucket_start < end:
+            by_status = buckets.get(bucket_start, {})
+            paid = [volume for name, volume in by_status.items() if name in revenue_statuses]
+            revenue = sum((volume.amount for volume in paid), Decimal("0.00"))
+            paid_orders = sum(volume.order_count for volume in paid)
+            points.append(TimeSeriesPoint(
+                bucket_start=bucket_start,
+                order_count=sum(volume.order_count for volume in by_status.values()),
+                revenue=revenue,
+                average_basket=(revenue / paid_orders).quantize(Decimal("0.01")) if paid_orders else Decimal("0.00"),
+                by_status=by_status
+            ))
+            bucket_start += step
+
+        watermark = await db.scalar(
+            select(OrderRollupWatermark.watermark).where(OrderRollupWatermark.name == self.WATERMARK)
+        )
+        return OrderTimeSeries(
+            granularity=granularity, start=first, end=end, status=status, watermark=watermark, points=points
+        )
+
+    async def top_products(self, db: AsyncSession, start: date, end: date, limit: int,
+                           metric: str = "units") -> TopProducts:
+        """
+        Best sellers for days in [start, end], served from product_sales_daily
+        Per-product totals are streamed through a bounded heap of `limit`
+        entries, so memory stays O(limit) however many products sold
+        """
+        if metric not in TOP_PRODUCT_METRICS:
+            raise ValueError(f"metric must be one of: {', '.join(TOP_PRODUCT_METRICS)}")
+        if end < start:
+            raise ValueError("end must not be before start")
+        if (end - start).days + 1 > self.max_points:
+            raise ValueError(f"Range too large: at most {self.max_points} days")
+
+        query = (
+            select(
+                ProductSalesDaily.product_id,
+                func.max(ProductSalesDaily.product_name).label("product_name"),
+                func.sum(ProductSalesDaily.units).label("units"),
+                func.sum(ProductSalesDaily.revenue).label("revenue"),
+                func.sum(ProductSalesDaily.order_count).label("order_count")
+            )
+            .where(ProductSalesDaily.day >= start, ProductSalesDaily.day <= end)
+            .group_by(ProductSalesDaily.product_id)
+        )
+        # Min-heap of the best `limit` so far; ties broken by lower product id
+        heap = []
+        async for row in await db.stream(query):
+            entry = (getattr(row, metric), -row.product_id, row)
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        top = [entry[2] for entry in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+        return TopProducts(
+            start=start,
+            end=end,
+            metric=metric,
+            products=[
+                ProductSales(product_id=row.product_id, product_name=row.product_name, units=row.units,
+                             revenue=row.revenue, order_count=row.order_count)
+                for row in top
+            ]
+        )
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"⚠️  Order rollup run failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        print("📈 Order rollup job started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "hours_rebuilt": self.hours_rebuilt,
+            "days_rebuilt": self.days_rebuilt,
+            "watermark": self.watermark.isoformat() if self.watermark else None
+        }
+
+
+# Global instance
+order_rollups = OrderRollupJob(
+    interval=settings.order_rollup_interval_seconds,
+    overlap=settings.order_rollup_overlap_seconds,
+    max_points=settings.order_rollup_max_points
+)
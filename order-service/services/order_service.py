@@ -3,17 +3,84 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, insert, func, desc, asc, tuple_, literal_column
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from models.order import Order, OrderItem, OrderStatusHistory, OrderStatus, PaymentStatus
-from schemas.order_schemas import OrderCreate, OrderUpdate, OrderStats
+from schemas.order_schemas import OrderCreate, OrderUpdate, OrderStats, OrderFilters
 from utils.auth import User
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from decimal import Decimal
-from datetime import datetime
-import httpx
+from datetime import datetime, timedelta
 import uuid
+import httpx
 from config.settings import settings
+from utils.http_clients import http_clients
+from utils.circuit_breaker import CircuitOpenError
+from utils.bulkhead import BulkheadFullError
+from utils import deadline
+from utils.deadline import DeadlineExceeded, check as check_deadline
+from utils.concurrency import gather_bounded, settle_bounded
+from utils.pagination import encode_cursor, decode_cursor, NEXT, PREV
+from utils.metrics import StageMetrics
+from services.product_cache import product_cache
+from services.product_loader import product_loader
+from services.product_catalog import product_catalog
+from services.stock_reservations import stock_ledger, InsufficientStockError
+from services.outbox import outbox_dispatcher, cart_clear_event
+from services.order_counters import order_counters
+
+# Downstream failures that must surface to the caller rather than read as "not found"
+UNAVAILABLE_ERRORS = (CircuitOpenError, BulkheadFullError, DeadlineExceeded)
+
+
+class ProductLookupError(Exception):
+    """The product service failed a lookup in a way that says nothing about whether the product exists"""
+
+    def __init__(self, product_id, reason: str, status_code: Optional[int] = None):
+        self.product_id = product_id
+        self.status_code = status_code
+        super().__init__(f"Product {product_id} lookup failed: {reason}")
+
+
+def filter_orders(query, filters: Optional[OrderFilters]):
+    """
+    Narrow an orders query by the admin filters
+    Every combination is served by one of the listing indexes on orders:
+    user and status lead their composite indexes, pending payment has a
+    partial index, and the date range is a half-open created_at range.
+    """
+    if filters is None:
+        return query
+    if filters.user_id is not None:
+        query = query.where(Order.user_id == filters.user_id)
+    if filters.status is not None:
+        query = query.where(Order.status == filters.status.value)
+    if filters.payment_status == PaymentStatus.PENDING:
+        # Inline literal so the planner can match the partial index predicate
+        # even under a generic (parameterised) plan
+        query = query.where(Order.payment_status == literal_column("'pending'"))
+    elif filters.payment_status is not None:
+        query = query.where(Order.payment_status == filters.payment_status.value)
+    if filters.created_from is not None:
+        query = query.where(Order.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        query = query.where(Order.created_at < filters.created_to)
+    return query
+
+def keyset_page(query, cursor: Optional[str], size: int):
+    """Position an orders query after/before the cursor; fetches size+1 rows to detect more"""
+    direction = NEXT
+    if cursor:
+        created_at, order_id, direction = decode_cursor(cursor)
+        position = tuple_(Order.created_at, Order.id)
+        query = query.where(position < tuple_(created_at, order_id) if direction == NEXT
+                            else position > tuple_(created_at, order_id))
+    order = desc if direction == NEXT else asc
+    return query.order_by(order(Order.created_at), order(Order.id)).limit(size + 1), direction
+
+# Per-stage checkout latency, reported on GET /metrics
+checkout_metrics = StageMetrics()
 
 class OrderService:
     def __init__(self, db: AsyncSession):
@@ -28,85 +95,219 @@ class OrderService:
     async def get_cart_items(self, user_id: int, token: str) -> List[Dict]:
         """Fetch cart items from cart service"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{settings.cart_service_url}/cart/{user_id}",
-                    headers={"Authorization": f"Bearer {token}"},
-                    timeout=10.0
-                )
-                if response.status_code == 200:
-                    cart_data = response.json()
-                    return cart_data.get("items", [])
-                return []
+            response = await http_clients.request(
+                "cart", "GET", f"{settings.cart_service_url}/cart/{user_id}",
+                headers={"Authorization": f"Bearer {token}"},
+                hedge=True
+            )
+            if response.status_code == 200:
+                cart_data = response.json()
+                return cart_data.get("items", [])
+            return []
+        except UNAVAILABLE_ERRORS:
+            raise
         except Exception:
             return []
 
     async def get_product_details(self, product_id: int, token: str) -> Optional[Dict]:
-        """Fetch product details from product service"""
+        """Get product details, served from the product cache when possible"""
+        if not settings.product_cache_enabled:
+            return await self.load_product_details(product_id, token)
+
+        found, product = await product_cache.get(product_id)
+        if found:
+            return product
+
+        product = await self.load_product_details(product_id, token)
+        await product_cache.set(product_id, product)
+        return product
+
+    async def load_product_details(self, product_id: int, token: str) -> Optional[Dict]:
+        """Fetch product details, coalesced with concurrent lookups of the same product"""
+        if not settings.product_batch_enabled:
+            return await self.fetch_product_details(product_id, token)
+        return await product_loader.load(product_id, token, self.fetch_product_details)
+
+    async def fetch_product_details(self, product_id: int, token: Optional[str]) -> Optional[Dict]:
+        """
+        Fetch product details from product service (without credentials when token is None)
+        Returns None only for a 404; any other failure raises so that it is
+        never negatively cached as a missing product
+        """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{settings.product_service_url}/products/{product_id}",
-                    headers={"Authorization": f"Bearer {token}"},
-                    timeout=10.0
-                )
-                if response.status_code == 200:
-                    response_data = response.json()
-                    if response_data.get("success") and "data" in response_data:
-                        return response_data["data"]
-                    return response_data
-                return None
-        except Exception:
+            response = await http_clients.request(
+                "product", "GET", f"{settings.product_service_url}/products/{product_id}",
+                headers={"Authorization": f"Bearer {token}"} if token else {},
+                hedge=True
+            )
+        except UNAVAILABLE_ERRORS:
+            raise
+        except httpx.HTTPError as e:
+            raise ProductLookupError(product_id, str(e) or type(e).__name__) from e
+
+        if response.status_code == 404:
             return None
+        if response.status_code != 200:
+            raise ProductLookupError(product_id, f"HTTP {response.status_code}", response.status_code)
+        try:
+            response_data = response.json()
+        except ValueError as e:
+            raise ProductLookupError(product_id, "invalid JSON response", response.status_code) from e
+        if response_data.get("success") and "data" in response_data:
+            return response_data["data"]
+        return response_data
 
     async def clear_cart(self, user_id: int, token: str) -> bool:
         """Clear user's cart after order creation"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.delete(
-                    f"{settings.cart_service_url}/cart",
-                    headers={"Authorization": f"Bearer {token}"},
-                    timeout=10.0
-                )
-                return response.status_code in [200, 404]
+            response = await http_clients.request(
+                "cart", "DELETE", f"{settings.cart_service_url}/cart",
+                headers={"Authorization": f"Bearer {token}"}
+            )
+            return response.status_code in [200, 404]
+        except Exception:
+            return False
+
+    async def remove_cart_item(self, product_id: int, token: str) -> bool:
+        """Remove one ordered product from the user's cart"""
+        try:
+            response = await http_clients.request(
+                "cart", "DELETE", f"{settings.cart_service_url}/cart/items/{product_id}",
+                headers={"Authorization": f"Bearer {token}"}
+            )
+            # 404: the item is already gone (removed by the user, or a redelivery)
+            return response.status_code in [200, 404]
         except Exception:
             return False
 
     async def update_product_stock(self, product_id: int, quantity: int, token: str) -> bool:
-        """Decrease product stock after order"""
+        """Decrease product stock after order; fails rather than going below zero"""
+        return await self.adjust_product_stock(product_id, -quantity, token)
+
+    async def restore_product_stock(self, product_id: int, quantity: int, token: str) -> bool:
+        """Give stock back after a rejected order (compensating increment)"""
+        return await self.adjust_product_stock(product_id, quantity, token)
+
+    async def adjust_product_stock(self, product_id: int, delta: int, token: str) -> bool:
+        """Apply a stock delta through the product service"""
         try:
-            async with httpx.AsyncClient() as client:
-                # Get current stock
-                get_response = await client.get(
-                    f"{settings.product_service_url}/products/{product_id}",
-                    headers={"Authorization": f"Bearer {token}"},
-                    timeout=10.0
-                )
-                
-                if get_response.status_code != 200:
-                    return False
-                
-                product_data = get_response.json()
-                if product_data.get("success") and "data" in product_data:
-                    current_stock = product_data["data"].get("stock", 0)
-                else:
-                    current_stock = product_data.get("stock", 0)
-                
-                # Update stock
-                new_stock = max(0, current_stock - quantity)
-                response = await client.patch(
-                    f"{settings.product_service_url}/products/{product_id}/stock",
-                    headers={
-                        "Authorization": f"Bearer {token}",
-                        "Content-Type": "application/json"
-                    },
-                    json={"stock": new_stock},
-                    timeout=10.0
-                )
-                return response.status_code == 200
+            # Get current stock - always read fresh, never from the product cache
+            get_response = await http_clients.request(
+                "product", "GET", f"{settings.product_service_url}/products/{product_id}",
+                headers={"Authorization": f"Bearer {token}"}
+            )
+            
+            if get_response.status_code != 200:
+                return False
+            
+            product_data = get_response.json()
+            if product_data.get("success") and "data" in product_data:
+                current_stock = product_data["data"].get("stock", 0)
+            else:
+                current_stock = product_data.get("stock", 0)
+            
+            # Update stock
+            new_stock = current_stock + delta
+            if new_stock < 0:
+                return False
+            response = await http_clients.request(
+                "product", "PATCH", f"{settings.product_service_url}/products/{product_id}/stock",
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "Content-Type": "application/json"
+                },
+                json={"stock": new_stock}
+            )
+            await product_cache.invalidate(product_id)
+            return response.status_code == 200
+        except UNAVAILABLE_ERRORS:
+            raise
         except Exception:
             return False
 
+    async def validate_cart_item(self, cart_item: Dict, token: str) -> Dict:
+        """Validate a single cart item against the product service"""
+        product_id = cart_item.get('productId') or cart_item.get('product_id')
+        if not product_id:
+            raise ValueError("Invalid cart item: missing product ID")
+        
+        # Local catalog replica first; go remote only on a miss or stale replica
+        product = product_catalog.get(product_id) if settings.product_catalog_enabled else None
+        if product is None:
+            product = await self.get_product_details(product_id, token)
+        if not product:
+            raise ValueError(f"Product {product_id} not found or unavailable")
+
+        return {
+            'product_id': product_id,
+            'product_name': product.get('title', ''),
+            'product_sku': product.get('sku', ''),
+            'product_image': product.get('image', ''),
+            'unit_price': Decimal(str(cart_item['price'])),
+            'quantity': cart_item['quantity'],
+            'total_price': Decimal(str(cart_item['price'])) * cart_item['quantity'],
+            'product_attributes': ''
+        }
+
+    async def validate_cart_items(self, cart_items: List[Dict], token: str) -> List[Dict]:
+        """Validate all cart items concurrently; the first invalid item aborts the rest"""
+        return await gather_bounded(
+            lambda cart_item: self.validate_cart_item(cart_item, token),
+            cart_items,
+            settings.checkout_max_concurrency
+        )
+
+    async def decrement_item_stock(self, item_data: Dict, token: str) -> Optional[str]:
+        """Take stock for one item; returns the reservation id when the ledger is used"""
+        if settings.stock_reservation_enabled:
+            return await stock_ledger.reserve(item_data['product_id'], item_data['quantity'])
+        if not await self.update_product_stock(item_data['product_id'], item_data['quantity'], token):
+            raise ValueError(f"Could not update stock for product {item_data['product_id']}")
+        return None
+
+    async def compensate_item_stock(self, item_data: Dict, reservation_id: Optional[str], token: str):
+        """Undo decrement_item_stock for one item"""
+        if settings.stock_reservation_enabled:
+            await stock_ledger.release(reservation_id)
+        elif not await self.restore_product_stock(item_data['product_id'], item_data['quantity'], token):
+            raise ValueError(f"Could not restore stock for product {item_data['product_id']}")
+
+    async def commit_stock(self, items: List[Dict], token: str) -> List[Optional[str]]:
+        """
+        Stock-commit stage: decrement stock for every item concurrently
+        All or nothing - if any item fails, the items that succeeded are
+        compensated (in parallel) and the order is rejected
+        """
+        with checkout_metrics.timer("stock_commit"):
+            outcomes = await settle_bounded(
+                lambda item_data: self.decrement_item_stock(item_data, token),
+                items,
+                settings.checkout_max_concurrency
+            )
+            errors = [result for ok, result in outcomes if not ok]
+            if not errors:
+                return [result for _, result in outcomes]
+
+            applied = [(item_data, result) for item_data, (ok, result) in zip(items, outcomes) if ok]
+            await self.compensate_stock(applied, token)
+
+        # Prefer reporting a stock shortage over other failures
+        shortages = [error for error in errors if isinstance(error, InsufficientStockError)]
+        raise (shortages or errors)[0]
+
+    async def compensate_stock(self, applied: List[Tuple[Dict, Optional[str]]], token: str):
+        """Run compensating stock increments for already-applied items in parallel"""
+        # Compensation must finish even when the request's deadline has passed
+        with deadline.suspended():
+            outcomes = await settle_bounded(
+                lambda entry: self.compensate_item_stock(entry[0], entry[1], token),
+                applied,
+                settings.checkout_max_concurrency
+            )
+        for (item_data, _), (ok, error) in zip(applied, outcomes):
+            if not ok:
+                print(f"⚠️  Failed to compensate stock for product {item_data['product_id']}: {error}")
+
     def calculate_order_totals(self, items: List[Dict]) -> Dict[str, Decimal]:
         """Calculate order totals"""
         subtotal = sum(Decimal(str(item['price'])) * item['quantity'] for item in items)
@@ -124,12 +325,62 @@ class OrderService:
         }
 
     async def create_order_simple(self, order_data: OrderCreate, user: User, token: str) -> Order:
-        """Create a new order from cart - SIMPLIFIED VERSION"""
+        """
+        Create a new order from cart - SIMPLIFIED VERSION
+        Runs in phases so no database transaction is open while network I/O
+        is in flight: (1) cart, validation and stock over the network,
+        (2) one short transaction for the order write, (3) post-commit work.
+        Abandoned with DeadlineExceeded once the request's deadline passes
+        """
+        # Phase 1: downstream calls - no database connection held
         # Get cart items
+        check_deadline("cart fetch")
         cart_items = await self.get_cart_items(user.id, token)
         if not cart_items:
             raise ValueError("Cart is empty - cannot create order")
 
+        # Validate products and get details (concurrently, order preserved)
+        with checkout_metrics.timer("validation"):
+            validated_items = await self.validate_cart_items(cart_items, token)
+
+        # Stock-commit stage: take stock for every item before writing the order
+        check_deadline("stock commit")
+        stock_handles = await self.commit_stock(validated_items, token)
+
+        # Phase 2: the connection is acquired only for the final write
+        order = await self.build_order(order_data, user, cart_items)
+        try:
+            if settings.stock_reservation_enabled:
+                # Lets the sweeper confirm the holds if the order commits but phase 3 cannot
+                await stock_ledger.attach_order(stock_handles, order.order_number)
+            check_deadline("order write")
+            with checkout_metrics.timer("db_write"):
+                await self.write_order(order, validated_items, user)
+        except Exception:
+            await self.compensate_stock(list(zip(validated_items, stock_handles)), token)
+            raise
+
+        # Phase 3: order is committed - make the stock reservations permanent.
+        # Failures must not fail the request: the order exists, and the
+        # sweeper confirms holds tagged with a committed order
+        if settings.stock_reservation_enabled:
+            for reservation_id in stock_handles:
+                try:
+                    if not await stock_ledger.confirm(reservation_id):
+                        print(f"⚠️  Stock reservation {reservation_id} for order {order.order_number} "
+                              f"was confirmed after its hold expired (or was not found)")
+                except Exception as e:
+                    print(f"⚠️  Could not confirm stock reservation {reservation_id} for order "
+                          f"{order.order_number}; the sweeper will: {e}")
+
+        # Cart clearing is dispatched in the background
+        outbox_dispatcher.notify()
+
+        # write_order attached the inserted items, so no reload is needed
+        return order
+
+    async def build_order(self, order_data: OrderCreate, user: User, cart_items: List[Dict]) -> Order:
+        """Build the (unsaved) order row for a checkout"""
         # Use default shipping address if not provided
         if order_data.shipping_address is None:
             shipping_address = {
@@ -148,34 +399,10 @@ class OrderService:
                 "country": order_data.shipping_address.country
             }
 
-        # Validate products and get details
-        validated_items = []
-        for cart_item in cart_items:
-            product_id = cart_item.get('productId') or cart_item.get('product_id')
-            if not product_id:
-                raise ValueError("Invalid cart item: missing product ID")
-            
-            product = await self.get_product_details(product_id, token)
-            if not product:
-                raise ValueError(f"Product {product_id} not found or unavailable")
-
-            validated_item = {
-                'product_id': product_id,
-                'product_name': product.get('title', ''),
-                'product_sku': product.get('sku', ''),
-                'product_image': product.get('image', ''),
-                'unit_price': Decimal(str(cart_item['price'])),
-                'quantity': cart_item['quantity'],
-                'total_price': Decimal(str(cart_item['price'])) * cart_item['quantity'],
-                'product_attributes': ''
-            }
-            validated_items.append(validated_item)
-
         # Calculate totals
         totals = self.calculate_order_totals(cart_items)
 
-        # Create order
-        order = Order(
+        return Order(
             user_id=user.id,
             order_number=await self.generate_order_number(),
             status=OrderStatus.PENDING,
@@ -197,44 +424,46 @@ class OrderService:
             updated_at=datetime.utcnow()
         )
 
-        # Save order
-        self.db.add(order)
-        await self.db.flush()
-
-        # Create order items
-        for item_data in validated_items:
-            order_item = OrderItem(
-                order_id=order.id,
-                product_id=item_data['product_id'],
-                product_name=item_data['product_name'],
-                product_sku=item_data['product_sku'],
-                product_image=item_data['product_image'],
-                unit_price=item_data['unit_price'],
-                quantity=item_data['quantity'],
-                total_price=item_data['total_price'],
-                product_attributes=item_data['product_attributes']
-            )
-            self.db.add(order_item)
-
-        # Update product stock
-        for item_data in validated_items:
-            await self.update_product_stock(
-                item_data['product_id'], 
-                item_data['quantity'], 
-                token
+    async def write_order(self, order: Order, validated_items: List[Dict], user: User):
+        """
+        Write the order, its items, outbox events and stat counters in one short transaction
+        A fixed number of statements whatever the cart size: the order INSERT
+        returns its id, all items go in one multi-row INSERT ... RETURNING,
+        and the returned items are attached to the order so the response is
+        built from memory without reloading
+        """
+        async with self.db.begin():
+            # Save order (INSERT ... RETURNING id)
+            self.db.add(order)
+            await self.db.flush()
+
+            # Create order items in one statement, returned in cart order
+            result = await self.db.scalars(
+                insert(OrderItem).returning(OrderItem, sort_by_parameter_order=True),
+                [
+                    {
+                        "order_id": order.id,
+                        "product_id": item_data['product_id'],
+                        "product_name": item_data['product_name'],
+                        "product_sku": item_data['product_sku'],
+                        "product_image": item_data['product_image'],
+                        "unit_price": item_data['unit_price'],
+                        "quantity": item_data['quantity'],
+                        "total_price": item_data['total_price'],
+                        "product_attributes": item_data['product_attributes']
+                    }
+                    for item_data in validated_items
+                ]
             )
+            set_committed_value(order, "order_items", list(result.all()))
 
-        # Commit to database
-        await self.db.commit()
+            # Post-checkout side effects go through the outbox, committed with the order
+            self.db.add(cart_clear_event(
+                order.id, order.order_number, user, [item_data['product_id'] for item_data in validated_items]
+            ))
 
-        # Clear cart
-        await self.clear_cart(user.id, token)
-
-        # Reload order with items
-        result = await self.db.execute(
-            select(Order).options(selectinload(Order.order_items)).where(Order.id == order.id)
-        )
-        return result.scalar_one()
+            # Dashboard counters move with the order, in the same transaction
+            await order_counters.record_order_created(self.db, order)
 
     async def get_order_by_id(self, order_id: int, user: User) -> Optional[Order]:
         """Get order by ID with authorization check"""
@@ -247,17 +476,71 @@ class OrderService:
     async def get_user_orders(self, user_id: int, page: int = 1, size: int = 10) -> List[Order]:
         """Get orders for a specific user"""
         offset = (page - 1) * size
-        query = select(Order).where(Order.user_id == user_id).order_by(desc(Order.created_at)).offset(offset).limit(size)
+        query = (
+            select(Order).where(Order.user_id == user_id)
+            .order_by(desc(Order.created_at), desc(Order.id)).offset(offset).limit(size)
+        )
         result = await self.db.execute(query)
         return result.scalars().all()
 
+    async def search_orders(self, filters: Optional[OrderFilters] = None, page: int = 1,
+                            size: int = 20) -> List[Order]:
+        """Filtered orders across all users, newest first (offset pagination)"""
+        offset = (page - 1) * size
+        query = filter_orders(select(Order), filters).order_by(desc(Order.created_at), desc(Order.id))
+        result = await self.db.execute(query.offset(offset).limit(size))
+        return result.scalars().all()
+
+    async def get_orders_page(self, user_id: Optional[int], size: int = 10, cursor: Optional[str] = None,
+                              filters: Optional[OrderFilters] = None) -> Tuple[List[Order], Optional[str], Optional[str]]:
+        """
+        Keyset-paginated orders, newest first, for one user (or all when user_id is None)
+        Pages are positioned on (created_at, id), so they do not shift under
+        concurrent inserts and cost the same at any depth.
+        Returns (orders, next_cursor, prev_cursor)
+        """
+        query = filter_orders(select(Order), filters)
+        if user_id is not None:
+            query = query.where(Order.user_id == user_id)
+        query, direction = keyset_page(query, cursor, size)
+        result = await self.db.execute(query)
+        orders = list(result.scalars().all())
+        has_more = len(orders) > size
+        orders = orders[:size]
+        if direction == PREV:
+            orders.reverse()
+        if not orders:
+            return orders, None, None
+
+        first, last = orders[0], orders[-1]
+        more_older = has_more if direction == NEXT else True
+        more_newer = bool(cursor) if direction == NEXT else has_more
+        next_cursor = encode_cursor(last.created_at, last.id, NEXT) if more_older else None
+        prev_cursor = encode_cursor(first.created_at, first.id, PREV) if more_newer else None
+        return orders, next_cursor, prev_cursor
+
     async def update_order_status(self, order_id: int, update_data: OrderUpdate, user: User) -> Optional[Order]:
-        """Update order status"""
-        order = await self.get_order_by_id(order_id, user)
+        """
+        Update order status
+        The order row is locked (SELECT ... FOR UPDATE) until the commit, so
+        concurrent updates serialize and each counter delta starts from the
+        status the previous update committed
+        """
+        query = (
+            select(Order)
+            .where(Order.id == order_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        if not user.is_admin:
+            query = query.where(Order.user_id == user.id)
+        order = (await self.db.execute(query)).scalar_one_or_none()
         if not order:
+            await self.db.rollback()
             return None
 
         if not user.is_admin:
+            await self.db.rollback()
             raise ValueError("Only administrators can update order status")
 
         old_status = order.status
@@ -291,6 +574,7 @@ class OrderService:
                 reason=f"Status updated by {user.name}"
             )
             self.db.add(status_history)
+            await order_counters.record_status_change(self.db, old_status, update_data.status, order.total_amount)
 
         await self.db.commit()
         
@@ -301,37 +585,37 @@ class OrderService:
 
     async def get_order_stats(self) -> OrderStats:
         """Get order statistics for admin dashboard"""
-        total_orders = await self.db.scalar(select(func.count(Order.id))) or 0
-        pending_orders = await self.db.scalar(select(func.count(Order.id)).where(Order.status == OrderStatus.PENDING)) or 0
-        confirmed_orders = await self.db.scalar(select(func.count(Order.id)).where(Order.status == OrderStatus.CONFIRMED)) or 0
-        processing_orders = await self.db.scalar(select(func.count(Order.id)).where(Order.status == OrderStatus.PROCESSING)) or 0
-        shipped_orders = await self.db.scalar(select(func.count(Order.id)).where(Order.status == OrderStatus.SHIPPED)) or 0
-        delivered_orders = await self.db.scalar(select(func.count(Order.id)).where(Order.status == OrderStatus.DELIVERED)) or 0
-        cancelled_orders = await self.db.scalar(select(func.count(Order.id)).where(Order.status == OrderStatus.CANCELLED)) or 0
-
-        total_revenue = await self.db.scalar(
-            select(func.sum(Order.total_amount)).where(Order.status.in_([OrderStatus.CONFIRMED, OrderStatus.PROCESSING, OrderStatus.SHIPPED, OrderStatus.DELIVERED]))
-        ) or Decimal('0.00')
-
-        today = datetime.now().date()
-        orders_today = await self.db.scalar(
-            select(func.count(Order.id)).where(func.date(Order.created_at) == today)
-        ) or 0
-
-        month_start = datetime.now().replace(day=1).date()
-        orders_this_month = await self.db.scalar(
-            select(func.count(Order.id)).where(func.date(Order.created_at) >= month_start)
-        ) or 0
-
-        return OrderStats(
-            total_orders=total_orders,
-            pending_orders=pending_orders,
-            confirmed_orders=confirmed_orders,
-            processing_orders=processing_orders,
-            shipped_orders=shipped_orders,
-            delivered_orders=delivered_orders,
-            cancelled_orders=cancelled_orders,
-            total_revenue=total_revenue,
-            orders_today=orders_today,
-            orders_this_month=orders_this_month
-        )
\ No newline at end of file
+        if settings.order_stats_source == "counters":
+            return await order_counters.read_stats(self.db)
+        return await self.compute_order_stats()
+
+    async def compute_order_stats(self) -> OrderStats:
+        """
+        Compute order statistics from the orders table
+        One scan with conditional aggregates; date windows are half-open
+        created_at ranges so an index on created_at stays usable
+        """
+        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        tomorrow_start = today_start + timedelta(days=1)
+        month_start = today_start.replace(day=1)
+        revenue_statuses = [OrderStatus.CONFIRMED, OrderStatus.PROCESSING, OrderStatus.SHIPPED, OrderStatus.DELIVERED]
+
+        query = select(
+            func.count().label("total_orders"),
+            func.count().filter(Order.status == OrderStatus.PENDING).label("pending_orders"),
+            func.count().filter(Order.status == OrderStatus.CONFIRMED).label("confirmed_orders"),
+            func.count().filter(Order.status == OrderStatus.PROCESSING).label("processing_orders"),
+            func.count().filter(Order.status == OrderStatus.SHIPPED).label("shipped_orders"),
+            func.count().filter(Order.status == OrderStatus.DELIVERED).label("delivered_orders"),
+            func.count().filter(Order.status == OrderStatus.CANCELLED).label("cancelled_orders"),
+            func.coalesce(
+                func.sum(Order.total_amount).filter(Order.status.in_(revenue_statuses)), Decimal('0.00')
+            ).label("total_revenue"),
+            func.count().filter(
+                Order.created_at >= today_start, Order.created_at < tomorrow_start
+            ).label("orders_today"),
+            func.count().filter(Order.created_at >= month_start).label("orders_this_month")
+        ).select_from(Order)
+
+        row = (await self.db.execute(query)).one()
+        return OrderStats(**row._mapping)
\ No newline at end of file
@@ -0,0 +1,225 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import select, update
+from database.connection import async_session_factory
+from models.order import OrderOutboxEvent, OutboxStatus
+from config.settings import settings
+from utils.concurrency import settle_bounded
+from utils.auth import User, create_service_token
+
+CART_CLEAR = "cart.clear"
+
+
+def cart_clear_event(order_id: Optional[int], order_number: str, user: User,
+                     product_ids: List[int]) -> OrderOutboxEvent:
+    """Outbox event that removes the ordered products from the user's cart once the order is committed"""
+    return OrderOutboxEvent(
+        order_id=order_id,
+        event_type=CART_CLEAR,
+        dedupe_key=f"{CART_CLEAR}:{order_number}",
+        payload=json.dumps({
+            "user_id": user.id,
+            "email": user.email,
+            "name": user.name,
+            "role": user.role,
+            "product_ids": list(dict.fromkeys(product_ids))
+        }),
+        status=OutboxStatus.PENDING,
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+        created_at=datetime.utcnow()
+    )
+
+
+async def handle_cart_clear(payload: Dict[str, Any]):
+    from services.order_service import OrderService
+
+    user = User(id=payload["user_id"], email=payload["email"], name=payload["name"], role=payload["role"])
+    service = OrderService(None)
+    token = create_service_token(user)
+    if "product_ids" not in payload:
+        # Events queued before product ids were recorded clear the whole cart
+        if not await service.clear_cart(user.id, token):
+            raise RuntimeError(f"Cart service did not clear cart for user {user.id}")
+        return
+
+    # Only the ordered products go: anything added to the cart since checkout stays
+    results = await settle_bounded(
+        lambda product_id: service.remove_cart_item(product_id, token),
+        payload["product_ids"], settings.checkout_max_concurrency
+    )
+    failed = [product_id for product_id, (ok, removed) in zip(payload["product_ids"], results) if not (ok and removed)]
+    if failed:
+        raise RuntimeError(f"Cart service did not remove products {failed} for user {user.id}")
+
+
+def merge_cart_clear_payloads(payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One cart call for several orders of the same user: the union of their products"""
+    merged = dict(payloads[0])
+    if all("product_ids" in payload for payload in payloads):
+        merged["product_ids"] = list(dict.fromkeys(
+            product_id for payload in payloads for product_id in payload["product_ids"]
+        ))
+    else:
+        merged.pop("product_ids", None)
+    return merged
+
+
+class OutboxDispatcher:
+    """
+    Background worker that drains the order outbox
+    Events are claimed in a short transaction (leased by pushing
+    next_attempt_at forward), handled outside any transaction, then marked
+    dispatched - or rescheduled with exponential backoff until
+    max_attempts, after which they are parked as failed.
+    Handlers must be idempotent: a crash between handling and marking
+    means the event is delivered again once its lease runs out.
+    """
+
+    def __init__(self, poll_interval: float, batch_size: int, max_attempts: int,
+                 backoff_base: float, backoff_max: float, lease_seconds: float):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[None]]] = {
+            CART_CLEAR: handle_cart_clear
+        }
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.dispatched = 0
+        self.deduplicated = 0
+        self.retried = 0
+        self.failed = 0
+
+    def notify(self):
+        """Wake the dispatcher right away (called after a checkout commits)"""
+        self._wakeup.set()
+
+    def _backoff(self, attempts: int) -> timedelta:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** max(0, attempts - 1)))
+        return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+    async def _claim(self) -> List[OrderOutboxEvent]:
+        now = datetime.utcnow()
+        async with async_session_factory() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(OrderOutboxEvent)
+                    .where(OrderOutboxEvent.status == OutboxStatus.PENDING, OrderOutboxEvent.next_attempt_at <= now)
+                    .order_by(OrderOutboxEvent.next_attempt_at, OrderOutboxEvent.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                events = list(result.scalars().all())
+                for event in events:
+                    event.attempts += 1
+                    event.next_attempt_at = now + timedelta(seconds=self.lease_seconds)
+            return events
+
+    @staticmethod
+    def _coalesce_key(event: OrderOutboxEvent) -> str:
+        # Several pending cart clears for one user are merged into one handler call
+        if event.event_type == CART_CLEAR:
+            return f"{CART_CLEAR}:{json.loads(event.payload)['user_id']}"
+        return event.dedupe_key
+
+    async def _handle(self, events: List[OrderOutboxEvent]):
+        handler = self.handlers.get(events[0].event_type)
+        if handler is None:
+            raise RuntimeError(f"No outbox handler for {events[0].event_type}")
+        payloads = [json.loads(event.payload) for event in events]
+        if events[0].event_type == CART_CLEAR:
+            await handler(merge_cart_clear_payloads(payloads))
+        else:
+            await handler(payloads[0])
+
+    async def _record(self, events: List[OrderOutboxEvent], outcomes: Dict[str, Any]):
+        now = datetime.utcnow()
+        async with async_session_factory() as session:
+            async with session.begin():
+                for event in events:
+                    ok, error = outcomes[self._coalesce_key(event)]
+                    if ok:
+                        values = {"status": OutboxStatus.DISPATCHED, "dispatched_at": now, "last_error": None}
+                        self.dispatched += 1
+                    elif event.attempts >= self.max_attempts:
+                        values = {"status": OutboxStatus.FAILED, "last_error": str(error)}
+                        self.failed += 1
+                    else:
+                        values = {"next_attempt_at": now + self._backoff(event.attempts), "last_error": str(error)}
+                        self.retried += 1
+                    await session.execute(
+                        update(OrderOutboxEvent).where(OrderOutboxEvent.id == event.id).values(**values)
+                    )
+
+    async def dispatch_batch(self) -> int:
+        """Claim, handle and record one batch of due events; returns the batch size"""
+        events = await self._claim()
+        if not events:
+            return 0
+
+        groups: Dict[str, List[OrderOutboxEvent]] = {}
+        for event in events:
+            groups.setdefault(self._coalesce_key(event), []).append(event)
+        self.deduplicated += len(events) - len(groups)
+
+        results = await settle_bounded(self._handle, list(groups.values()), settings.checkout_max_concurrency)
+        outcomes = {key: (ok, None if ok else result) for key, (ok, result) in zip(groups.keys(), results)}
+        await self._record(events, outcomes)
+        return len(events)
+
+    async def _run(self):
+        while True:
+            try:
+                # Keep draining while batches come back full
+                while await self.dispatch_batch() >= self.batch_size:
+                    pass
+            except Exception as e:
+                print(f"⚠️  Outbox dispatch failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        print("📬 Outbox dispatcher started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "dispatched": self.dispatched,
+            "deduplicated": self.deduplicated,
+            "retried": self.retried,
+            "failed": self.failed
+        }
+
+
+# Global instance
+outbox_dispatcher = OutboxDispatcher(
+    poll_interval=settings.outbox_poll_interval_seconds,
+    batch_size=settings.outbox_batch_size,
+    max_attempts=settings.outbox_max_attempts,
+    backoff_base=settings.outbox_backoff_base_seconds,
+    backoff_max=settings.outbox_backoff_max_seconds,
+    lease_seconds=settings.outbox_lease_seconds
+)
@@ -0,0 +1,167 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import redis.asyncio as redis
+from config.settings import settings
+
+
+class ProductCache:
+    """
+    Bounded product-detail cache for OrderService
+    First tier is an in-process LRU with per-entry TTL; the optional second
+    tier is Redis so that several order-service replicas share lookups.
+    Missing products (404) are cached as None with a short TTL.
+    """
+
+    REDIS_KEY_PREFIX = "order-service:product:"
+
+    def __init__(self, max_entries: int, ttl: float, negative_ttl: float, redis_url: Optional[str] = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.redis_url = redis_url
+        self._redis = None
+        # product_id -> (expires_at monotonic, product or None)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[Dict]]]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.redis_hits = 0
+        self.redis_errors = 0
+
+    @staticmethod
+    def _key(product_id: Any) -> str:
+        return str(product_id)
+
+    def _get_redis(self):
+        if self._redis is None and self.redis_url:
+            self._redis = redis.from_url(self.redis_url)
+        return self._redis
+
+    def _store_local(self, key: str, product: Optional[Dict], ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, product)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _get_local(self, key: str) -> Tuple[bool, Optional[Dict]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, product = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, product
+
+    async def _get_remote(self, key: str) -> Tuple[bool, Optional[Dict]]:
+        client = self._get_redis()
+        if client is None:
+            return False, None
+        try:
+            raw = await client.get(self.REDIS_KEY_PREFIX + key)
+        except Exception:
+            self.redis_errors += 1
+            return False, None
+        if raw is None:
+            return False, None
+
+        payload = json.loads(raw)
+        remaining = payload["expires_at"] - time.time()
+        if remaining <= 0:
+            return False, None
+        self._store_local(key, payload["product"], remaining)
+        self.redis_hits += 1
+        return True, payload["product"]
+
+    async def _set_remote(self, key: str, product: Optional[Dict], ttl: float):
+        client = self._get_redis()
+        if client is None:
+            return
+        payload = json.dumps({"expires_at": time.time() + ttl, "product": product})
+        try:
+            await client.set(self.REDIS_KEY_PREFIX + key, payload, px=max(1, int(ttl * 1000)))
+        except Exception:
+            self.redis_errors += 1
+
+    async def get(self, product_id: Any) -> Tuple[bool, Optional[Dict]]:
+        """
+        Look up a product
+        Returns (found, product); found with product None is a cached miss
+        """
+        key = self._key(product_id)
+        found, product = self._get_local(key)
+        if not found:
+            found, product = await self._get_remote(key)
+
+        if not found:
+            self.misses += 1
+        elif product is None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return found, product
+
+    async def set(self, product_id: Any, product: Optional[Dict]):
+        """Cache product details, or None (briefly) for a missing product"""
+        key = self._key(product_id)
+        ttl = self.ttl if product is not None else self.negative_ttl
+        self._store_local(key, product, ttl)
+        await self._set_remote(key, product, ttl)
+
+    async def invalidate(self, product_id: Any):
+        """Drop a product from both tiers"""
+        key = self._key(product_id)
+        self._entries.pop(key, None)
+        client = self._get_redis()
+        if client is not None:
+            try:
+                await client.delete(self.REDIS_KEY_PREFIX + key)
+            except Exception:
+                self.redis_errors += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "enabled": settings.product_cache_enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "negative_ttl_seconds": self.negative_ttl,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "redis_enabled": self.redis_url is not None,
+            "redis_hits": self.redis_hits,
+            "redis_errors": self.redis_errors
+        }
+
+
+# Global instance
+product_cache = ProductCache(
+    max_entries=settings.product_cache_max_entries,
+    ttl=settings.product_cache_ttl_seconds,
+    negative_ttl=settings.product_cache_negative_ttl_seconds,
+    redis_url=settings.redis_url if settings.product_cache_redis_enabled else None
+)
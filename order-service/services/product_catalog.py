@@ -0,0 +1,259 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+from config.settings import settings
+from utils.http_clients import http_clients
+
+
+class CatalogEntry:
+    """Compact record of the product fields checkout needs"""
+
+    __slots__ = ("product_id", "title", "sku", "image", "price", "stock", "updated_at")
+
+    def __init__(self, product_id: int, title: str, sku: str, image: str,
+                 price: Optional[float], stock: Optional[int], updated_at: Optional[str]):
+        self.product_id = product_id
+        self.title = title
+        self.sku = sku
+        self.image = image
+        self.price = price
+        self.stock = stock  # Hint only - never used to decrement stock
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_product(cls, product: Dict) -> "CatalogEntry":
+        return cls(
+            product_id=int(product.get("_id", product.get("id"))),
+            title=product.get("title", ""),
+            sku=product.get("sku", ""),
+            image=product.get("image", ""),
+            price=product.get("price"),
+            stock=product.get("stock"),
+            updated_at=product.get("updatedAt")
+        )
+
+    def to_row(self) -> List[Any]:
+        return [getattr(self, field) for field in self.__slots__]
+
+    def to_product(self) -> Dict:
+        return {
+            "_id": self.product_id,
+            "title": self.title,
+            "sku": self.sku,
+            "image": self.image,
+            "price": self.price,
+            "stock": self.stock,
+            "updatedAt": self.updated_at
+        }
+
+
+class ProductCatalog:
+    """
+    Local replica of the product catalog
+    Loaded at startup (from the on-disk snapshot when present, then from the
+    product service) and kept current by a background task that polls the
+    product listing. The listing holds active products only and has no
+    delta support, so each complete poll also drops products that have
+    disappeared from it (deactivated or deleted).
+    """
+
+    def __init__(self, refresh_interval: float, full_sync_interval: float, stale_after: float,
+                 page_limit: int, snapshot_path: Optional[str] = None):
+        self.refresh_interval = refresh_interval
+        self.full_sync_interval = full_sync_interval
+        self.stale_after = stale_after
+        self.page_limit = page_limit
+        self.snapshot_path = snapshot_path
+        self._entries: Dict[int, CatalogEntry] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.watermark: Optional[str] = None  # Highest updatedAt seen
+        self.last_sync_at: Optional[float] = None  # Wall clock of last successful sync
+        self.last_full_sync_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+        self.stale_misses = 0
+        self.syncs = 0
+        self.sync_errors = 0
+        self.last_delta_size = 0
+        self.removed = 0
+        self.truncated_syncs = 0
+
+    # Lookups
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.last_sync_at is not None and time.time() - self.last_sync_at <= self.stale_after
+
+    def get(self, product_id: Any) -> Optional[Dict]:
+        """Product details from the replica, or None on a miss or stale replica"""
+        try:
+            entry = self._entries.get(int(product_id))
+        except (TypeError, ValueError):
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        if not self.is_fresh:
+            self.stale_misses += 1
+            return None
+        self.hits += 1
+        return entry.to_product()
+
+    # Synchronisation
+
+    async def _fetch_products(self) -> List[Dict]:
+        """Active products, newest first, at most page_limit of them"""
+        response = await http_clients.request(
+            "product", "GET", f"{settings.product_service_url}/products",
+            params={"limit": self.page_limit}
+        )
+        response.raise_for_status()
+        payload = response.json()
+        return payload.get("data", []) if isinstance(payload, dict) else payload
+
+    def _apply(self, products: List[Dict], full: bool) -> int:
+        entries = {} if full else self._entries
+        applied = 0
+        listed = set()
+        for product in products:
+            try:
+                entry = CatalogEntry.from_product(product)
+            except (TypeError, ValueError):
+                continue
+            listed.add(entry.product_id)
+            updated_at = product.get("updatedAt")
+            current = entries.get(entry.product_id)
+            if current is not None and updated_at and current.updated_at == updated_at:
+                continue
+            entries[entry.product_id] = entry
+            applied += 1
+            if updated_at and (self.watermark is None or updated_at > self.watermark):
+                self.watermark = updated_at
+        if len(products) >= self.page_limit:
+            # Products past the limit are indistinguishable from removed ones: keep them
+            self.truncated_syncs += 1
+            print(f"⚠️  Product listing hit PRODUCT_CATALOG_PAGE_LIMIT={self.page_limit}; not dropping unlisted products")
+            for product_id, entry in self._entries.items():
+                entries.setdefault(product_id, entry)
+        elif not full:
+            # Not in the complete active listing: deactivated or deleted since the last poll
+            gone = [product_id for product_id in entries if product_id not in listed]
+            for product_id in gone:
+                del entries[product_id]
+            self.removed += len(gone)
+            applied += len(gone)
+        if full:
+            self._entries = entries
+        return applied
+
+    async def sync(self, full: bool = False) -> int:
+        """Pull changes from the product service; returns the number of records applied"""
+        try:
+            products = await self._fetch_products()
+        except Exception as e:
+            self.sync_errors += 1
+            print(f"⚠️  Product catalog sync failed: {e}")
+            return 0
+
+        applied = self._apply(products, full)
+        now = time.time()
+        self.last_sync_at = now
+        if full:
+            self.last_full_sync_at = now
+        self.syncs += 1
+        self.last_delta_size = applied
+        if applied:
+            self.save_snapshot()
+        return applied
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            full = self.last_full_sync_at is None or time.time() - self.last_full_sync_at >= self.full_sync_interval
+            await self.sync(full=full)
+
+    # Snapshot
+
+    def load_snapshot(self) -> bool:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path) as snapshot_file:
+                snapshot = json.load(snapshot_file)
+            self._entries = {row[0]: CatalogEntry(*row) for row in snapshot["products"]}
+            self.watermark = snapshot.get("watermark")
+            self.last_sync_at = snapshot.get("synced_at")
+            return True
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable product catalog snapshot: {e}")
+            return False
+
+    def save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        snapshot = {
+            "watermark": self.watermark,
+            "synced_at": self.last_sync_at,
+            "products": [entry.to_row() for entry in self._entries.values()]
+        }
+        temp_path = f"{self.snapshot_path}.tmp"
+        try:
+            with open(temp_path, "w") as snapshot_file:
+                json.dump(snapshot, snapshot_file, separators=(",", ":"))
+            os.replace(temp_path, self.snapshot_path)
+        except Exception as e:
+            print(f"⚠️  Failed to write product catalog snapshot: {e}")
+
+    # Lifecycle
+
+    async def start(self):
+        """Load the replica and start background polling"""
+        if self.load_snapshot():
+            print(f"📦 Product catalog snapshot loaded: {len(self._entries)} products")
+            await self.sync(full=False)
+        else:
+            await self.sync(full=True)
+        print(f"📦 Product catalog replica ready: {len(self._entries)} products")
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.save_snapshot()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.product_catalog_enabled,
+            "products": len(self._entries),
+            "fresh": self.is_fresh,
+            "watermark": self.watermark,
+            "seconds_since_sync": round(time.time() - self.last_sync_at, 1) if self.last_sync_at else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_misses": self.stale_misses,
+            "syncs": self.syncs,
+            "sync_errors": self.sync_errors,
+            "last_delta_size": self.last_delta_size,
+            "removed": self.removed,
+            "truncated_syncs": self.truncated_syncs
+        }
+
+
+# Global instance
+product_catalog = ProductCatalog(
+    refresh_interval=settings.product_catalog_refresh_seconds,
+    full_sync_interval=settings.product_catalog_full_sync_seconds,
+    stale_after=settings.product_catalog_stale_seconds,
+    page_limit=settings.product_catalog_page_limit,
+    snapshot_path=settings.product_catalog_snapshot_path
+)
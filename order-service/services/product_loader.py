@@ -0,0 +1,169 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from config.settings import settings
+from utils.concurrency import gather_bounded
+from utils.metrics import Histogram
+from utils import deadline
+
+ProductFetcher = Callable[[Any, Optional[str]], Awaitable[Optional[Dict]]]
+Waiter = Tuple[asyncio.Future, float, str]
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+# Rejections of the shared (anonymous) call that another caller's own token might pass
+AUTH_STATUS_CODES = (401, 403)
+
+
+class _PendingLookup:
+    """One product id waiting in the current batch, with everyone waiting on it"""
+
+    __slots__ = ("product_id", "fetch", "waiters")
+
+    def __init__(self, product_id: Any, fetch: ProductFetcher):
+        self.product_id = product_id
+        self.fetch = fetch
+        self.waiters: List[Waiter] = []
+
+
+class ProductBatchLoader:
+    """
+    DataLoader-style coalescing of product lookups
+    Lookups requested within a short window (across all in-flight checkouts)
+    are collected, deduplicated by product id, resolved with one downstream
+    call per distinct product and fanned back out to every waiter.
+    The shared call carries no user credentials (token None): product
+    reads are public and one user's token must not decide the outcome for
+    everyone else. Should it be rejected with 401/403, each waiter is
+    retried with its own token. The shared call runs outside any one
+    request's deadline; each waiter stops waiting when its own deadline
+    expires.
+    """
+
+    def __init__(self, window_seconds: float, max_batch_size: int, max_concurrency: int):
+        self.window_seconds = window_seconds
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self._batch: Dict[str, _PendingLookup] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._dispatches = set()
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.wait_times_ms = Histogram()  # Time spent queued in the window before dispatch
+        self.requests = 0
+        self.coalesced = 0
+        self.downstream_calls = 0
+        self.auth_retries = 0
+
+    async def load(self, product_id: Any, token: str, fetch: ProductFetcher) -> Optional[Dict]:
+        """Queue a product lookup and wait for its batch to resolve"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = str(product_id)
+
+        lookup = self._batch.get(key)
+        if lookup is None:
+            lookup = _PendingLookup(product_id, fetch)
+            self._batch[key] = lookup
+        else:
+            self.coalesced += 1
+        lookup.waiters.append((future, time.perf_counter(), token))
+        self.requests += 1
+
+        if len(self._batch) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+
+        left = deadline.remaining()
+        if left is None:
+            return await future
+        try:
+            return await asyncio.wait_for(future, timeout=left)
+        except asyncio.TimeoutError:
+            raise deadline.DeadlineExceeded("product lookup")
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._batch:
+            return
+
+        batch, self._batch = self._batch, {}
+        with deadline.suspended():
+            task = asyncio.ensure_future(self._dispatch(list(batch.values())))
+        # Keep a reference so the dispatch is not garbage collected mid-flight
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, lookups: List[_PendingLookup]):
+        now = time.perf_counter()
+        for lookup in lookups:
+            for _, enqueued_at, _ in lookup.waiters:
+                self.wait_times_ms.observe((now - enqueued_at) * 1000)
+        self.batch_sizes.observe(len(lookups))
+        self.downstream_calls += len(lookups)
+        await gather_bounded(self._resolve, lookups, self.max_concurrency)
+
+    async def _resolve(self, lookup: _PendingLookup):
+        try:
+            product = await lookup.fetch(lookup.product_id, None)
+        except Exception as e:
+            if getattr(e, "status_code", None) in AUTH_STATUS_CODES:
+                await self._resolve_per_token(lookup)
+            else:
+                self._fan_out(lookup.waiters, error=e)
+        else:
+            self._fan_out(lookup.waiters, result=product)
+
+    async def _resolve_per_token(self, lookup: _PendingLookup):
+        """Retry a rejected shared call once per distinct caller token"""
+        by_token: Dict[str, List[Waiter]] = {}
+        for waiter in lookup.waiters:
+            by_token.setdefault(waiter[2], []).append(waiter)
+        self.auth_retries += len(by_token)
+        self.downstream_calls += len(by_token)
+
+        async def resolve(token: str):
+            try:
+                product = await lookup.fetch(lookup.product_id, token)
+            except Exception as e:
+                self._fan_out(by_token[token], error=e)
+            else:
+                self._fan_out(by_token[token], result=product)
+
+        await gather_bounded(resolve, list(by_token), self.max_concurrency)
+
+    def _fan_out(self, waiters: List[Waiter], result: Optional[Dict] = None, error: Optional[Exception] = None):
+        for future, _, _ in waiters:
+            if future.done():
+                continue  # Waiter was cancelled
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.product_batch_enabled,
+            "window_ms": self.window_seconds * 1000,
+            "max_batch_size": self.max_batch_size,
+            "requests": self.requests,
+            "downstream_calls": self.downstream_calls,
+            "coalesced": self.coalesced,
+            "auth_retries": self.auth_retries,
+            "batch_size": self.batch_sizes.snapshot(),
+            "wait_time_ms": self.wait_times_ms.snapshot()
+        }
+
+
+# Global instance
+product_loader = ProductBatchLoader(
+    window_seconds=settings.product_batch_window_ms / 1000,
+    max_batch_size=settings.product_batch_max_size,
+    max_concurrency=settings.product_batch_max_concurrency
+)
@@ -0,0 +1,477 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set
+import redis.asyncio as redis
+from sqlalchemy import select
+from config.settings import settings
+from database.connection import async_session_factory
+from models.order import Order
+from utils.http_clients import http_clients
+from utils.concurrency import gather_bounded
+
+KEY_PREFIX = "order-service:stock:"
+AVAILABLE_PREFIX = KEY_PREFIX + "available:"  # Units that can still be reserved
+HELD_PREFIX = KEY_PREFIX + "held:"  # Units held by outstanding reservations
+PENDING_PREFIX = KEY_PREFIX + "pending:"  # Confirmed units not yet pushed to the product service
+INFLIGHT_PREFIX = KEY_PREFIX + "inflight:"  # Pending units claimed by a sync in progress
+LOCK_PREFIX = KEY_PREFIX + "sync-lock:"  # One syncing replica per product
+RESERVATION_PREFIX = KEY_PREFIX + "reservation:"
+EXPIRY_KEY = KEY_PREFIX + "reservations:expiry"
+DIRTY_KEY = KEY_PREFIX + "dirty"
+
+# Settled reservations are kept this long so a late confirm can still be recorded
+SETTLED_TTL_SECONDS = 86400
+
+# Seed available = product stock - held - pending - inflight, only if not already seeded
+SEED_SCRIPT = """
+local held = math.max(0, tonumber(redis.call('GET', KEYS[2]) or '0'))
+local pending = math.max(0, tonumber(redis.call('GET', KEYS[3]) or '0'))
+local inflight = tonumber(redis.call('HGET', KEYS[4], 'quantity') or '0')
+local available = math.max(0, tonumber(ARGV[1]) - held - pending - inflight)
+redis.call('SET', KEYS[1], available, 'EX', ARGV[2], 'NX')
+return available
+"""
+
+# Decrement-if-available and record the hold; -2 = not seeded, -1 = insufficient
+RESERVE_SCRIPT = """
+local available = redis.call('GET', KEYS[1])
+if not available then return -2 end
+if tonumber(available) < tonumber(ARGV[1]) then return -1 end
+local remaining = redis.call('DECRBY', KEYS[1], ARGV[1])
+redis.call('INCRBY', KEYS[2], ARGV[1])
+redis.call('HSET', KEYS[3], 'product_id', ARGV[2], 'quantity', ARGV[1], 'state', 'held')
+redis.call('ZADD', KEYS[4], ARGV[3], ARGV[4])
+return remaining
+"""
+
+# Return held units to available; 0 = unknown or already settled
+# KEYS: reservation, expiry, available, held; ARGV: reservation id, product id, settled TTL
+RELEASE_SCRIPT = """
+local reservation = redis.call('HMGET', KEYS[1], 'product_id', 'quantity', 'state')
+if reservation[1] ~= ARGV[2] or (reservation[3] and reservation[3] ~= 'held') then return 0 end
+if redis.call('EXISTS', KEYS[3]) == 1 then
+  redis.call('INCRBY', KEYS[3], reservation[2])
+end
+redis.call('DECRBY', KEYS[4], reservation[2])
+redis.call('HSET', KEYS[1], 'state', 'released')
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('ZREM', KEYS[2], ARGV[1])
+return 1
+"""
+
+# Turn a hold into a pending decrement. The order is already committed, so
+# a late confirm is still recorded: an expired hold is confirmed as usual, a
+# hold the sweeper already released takes its units back off available.
+# 1 = confirmed, 2 = already confirmed, -1 = confirmed late, 0 = unknown
+# KEYS: reservation, expiry, dirty, held, available, pending; ARGV: reservation id, now (ms), product id, settled TTL
+CONFIRM_SCRIPT = """
+local reservation = redis.call('HMGET', KEYS[1], 'product_id', 'quantity', 'state')
+if reservation[1] ~= ARGV[3] then return 0 end
+local quantity = reservation[2]
+local state = reservation[3] or 'held'
+if state == 'confirmed' then return 2 end
+local result = 1
+if state == 'released' then
+  if redis.call('EXISTS', KEYS[5]) == 1 then
+    redis.call('DECRBY', KEYS[5], quantity)
+  end
+  result = -1
+else
+  local expires_at = redis.call('ZSCORE', KEYS[2], ARGV[1])
+  if expires_at and tonumber(expires_at) < tonumber(ARGV[2]) then result = -1 end
+  redis.call('DECRBY', KEYS[4], quantity)
+  redis.call('ZREM', KEYS[2], ARGV[1])
+end
+redis.call('INCRBY', KEYS[6], quantity)
+redis.call('SADD', KEYS[3], ARGV[3])
+redis.call('HSET', KEYS[1], 'state', 'confirmed')
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return result
+"""
+
+# Move pending units into the product's inflight record, unless an earlier
+# sync left one behind (its PATCH may or may not have been applied), in which
+# case that one is resumed. Returns {quantity, target stock or false}
+CLAIM_SCRIPT = """
+local inflight = redis.call('HMGET', KEYS[2], 'quantity', 'target')
+if inflight[1] then return {tonumber(inflight[1]), inflight[2] or false} end
+local pending = tonumber(redis.call('GET', KEYS[1]) or '0')
+if pending <= 0 then return {0, false} end
+redis.call('DECRBY', KEYS[1], pending)
+redis.call('HSET', KEYS[2], 'quantity', pending)
+return {pending, false}
+"""
+
+# Give claimed units back to pending after a sync that certainly did not apply
+RESTORE_SCRIPT = """
+local quantity = redis.call('HGET', KEYS[2], 'quantity')
+if not quantity then return 0 end
+redis.call('INCRBY', KEYS[1], quantity)
+redis.call('DEL', KEYS[2])
+redis.call('SADD', KEYS[3], ARGV[1])
+return tonumber(quantity)
+"""
+
+# Drop a completed inflight record; re-flag the product if more units were confirmed meanwhile
+FINISH_SCRIPT = """
+redis.call('DEL', KEYS[2])
+if tonumber(redis.call('GET', KEYS[1]) or '0') > 0 then redis.call('SADD', KEYS[3], ARGV[1]) end
+return 1
+"""
+
+# Delete the sync lock only if this replica still holds it
+UNLOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+return 0
+"""
+
+
+class InsufficientStockError(ValueError):
+    """Raised when a product does not have enough stock to reserve"""
+
+    def __init__(self, product_id: Any, quantity: int):
+        self.product_id = product_id
+        self.quantity = quantity
+        super().__init__(f"Insufficient stock for product {product_id} (requested {quantity})")
+
+
+class StockReservationLedger:
+    """
+    Stock reservations held in Redis
+    Checkout reserves units with an atomic decrement-if-available script,
+    then confirms the reservations once the order is committed or releases
+    them if it fails. Unconfirmed reservations expire and give their units
+    back, unless they are tagged with an order that committed, in which case
+    the sweeper confirms them; a confirm that arrives after a release is
+    still recorded, since the order exists. Confirmed decrements are pushed to the product service in
+    batches by a background task; the available count is re-seeded from the
+    product service (minus outstanding holds and unsynced decrements) once
+    its key expires, which picks up restocks made there.
+    Syncing is safe across replicas: a per-product lock admits one syncer,
+    and pending units are claimed atomically into an inflight record that is
+    cleared on success, restored on a certain failure, and kept (with the
+    stock it was setting) when the outcome is unknown.
+    """
+
+    def __init__(self, redis_url: Optional[str], reservation_ttl: float, seed_ttl: int,
+                 sync_interval: float, sync_batch_size: int, sync_lock_seconds: float):
+        self.redis_url = redis_url
+        self.reservation_ttl = reservation_ttl
+        self.seed_ttl = seed_ttl
+        self.sync_interval = sync_interval
+        self.sync_batch_size = sync_batch_size
+        self.sync_lock_ms = int(sync_lock_seconds * 1000)
+        self._redis = None
+        self._scripts: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.reserved = 0
+        self.rejected = 0
+        self.confirmed = 0
+        self.released = 0
+        self.expired = 0
+        self.confirmed_late = 0
+        self.recovered = 0
+        self.synced_products = 0
+        self.sync_errors = 0
+        self.sync_contended = 0
+
+    def _get_redis(self):
+        if self._redis is None:
+            if not self.redis_url:
+                raise RuntimeError("REDIS_URL is required for stock reservations")
+            self._redis = redis.from_url(self.redis_url)
+            self._scripts = {
+                "seed": self._redis.register_script(SEED_SCRIPT),
+                "reserve": self._redis.register_script(RESERVE_SCRIPT),
+                "release": self._redis.register_script(RELEASE_SCRIPT),
+                "confirm": self._redis.register_script(CONFIRM_SCRIPT),
+                "claim": self._redis.register_script(CLAIM_SCRIPT),
+                "restore": self._redis.register_script(RESTORE_SCRIPT),
+                "finish": self._redis.register_script(FINISH_SCRIPT),
+                "unlock": self._redis.register_script(UNLOCK_SCRIPT)
+            }
+        return self._redis
+
+    def _script(self, name: str):
+        self._get_redis()
+        return self._scripts[name]
+
+    async def _fetch_stock(self, product_id: Any) -> Optional[int]:
+        """Read current stock straight from the product service (never cached)"""
+        response = await http_clients.request("product", "GET", f"{settings.product_service_url}/products/{product_id}")
+        if response.status_code != 200:
+            return None
+        product_data = response.json()
+        if product_data.get("success") and "data" in product_data:
+            product_data = product_data["data"]
+        return int(product_data.get("stock", 0))
+
+    async def _seed(self, product_id: Any) -> bool:
+        stock = await self._fetch_stock(product_id)
+        if stock is None:
+            return False
+        await self._script("seed")(
+            keys=[
+                f"{AVAILABLE_PREFIX}{product_id}", f"{HELD_PREFIX}{product_id}",
+                f"{PENDING_PREFIX}{product_id}", f"{INFLIGHT_PREFIX}{product_id}"
+            ],
+            args=[stock, self.seed_ttl]
+        )
+        return True
+
+    async def reserve(self, product_id: Any, quantity: int) -> str:
+        """Hold `quantity` units of a product; returns the reservation id"""
+        reservation_id = uuid.uuid4().hex
+        keys = [
+            f"{AVAILABLE_PREFIX}{product_id}",
+            f"{HELD_PREFIX}{product_id}",
+            f"{RESERVATION_PREFIX}{reservation_id}",
+            EXPIRY_KEY
+        ]
+        expires_at_ms = int((time.time() + self.reservation_ttl) * 1000)
+        args = [quantity, str(product_id), expires_at_ms, reservation_id]
+
+        result = await self._script("reserve")(keys=keys, args=args)
+        if result == -2:
+            if not await self._seed(product_id):
+                raise ValueError(f"Product {product_id} not found or unavailable")
+            result = await self._script("reserve")(keys=keys, args=args)
+        if result < 0:
+            self.rejected += 1
+            raise InsufficientStockError(product_id, quantity)
+
+        self.reserved += 1
+        return reservation_id
+
+    async def _product_of(self, reservation_id: str) -> Optional[str]:
+        """Product a reservation is for, so scripts can declare every key they touch"""
+        product_id = await self._get_redis().hget(f"{RESERVATION_PREFIX}{reservation_id}", "product_id")
+        return product_id.decode() if isinstance(product_id, bytes) else product_id
+
+    async def attach_order(self, reservation_ids: List[str], order_number: str):
+        """
+        Tag holds with the order about to be written, so the sweeper can
+        confirm (rather than release) them if the order committed but its
+        confirm never ran
+        """
+        pipeline = self._get_redis().pipeline(transaction=False)
+        for reservation_id in reservation_ids:
+            pipeline.hset(f"{RESERVATION_PREFIX}{reservation_id}", "order", order_number)
+        await pipeline.execute()
+
+    async def release(self, reservation_id: str) -> bool:
+        """Give a reservation's units back to available stock"""
+        product_id = await self._product_of(reservation_id)
+        if product_id is None:
+            return False
+        result = await self._script("release")(
+            keys=[
+                f"{RESERVATION_PREFIX}{reservation_id}", EXPIRY_KEY,
+                f"{AVAILABLE_PREFIX}{product_id}", f"{HELD_PREFIX}{product_id}"
+            ],
+            args=[reservation_id, product_id, SETTLED_TTL_SECONDS]
+        )
+        if result == 1:
+            self.released += 1
+        return result == 1
+
+    async def confirm(self, reservation_id: str) -> bool:
+        """
+        Make a reservation permanent once its order is committed
+        The decrement is recorded even when the hold expired first; returns
+        False in that case (confirmed late) or when the reservation is unknown
+        """
+        product_id = await self._product_of(reservation_id)
+        if product_id is None:
+            return False
+        result = await self._script("confirm")(
+            keys=[
+                f"{RESERVATION_PREFIX}{reservation_id}", EXPIRY_KEY, DIRTY_KEY,
+                f"{HELD_PREFIX}{product_id}", f"{AVAILABLE_PREFIX}{product_id}", f"{PENDING_PREFIX}{product_id}"
+            ],
+            args=[reservation_id, int(time.time() * 1000), product_id, SETTLED_TTL_SECONDS]
+        )
+        if result == 1:
+            self.confirmed += 1
+        elif result == -1:
+            self.confirmed_late += 1
+        return result in (1, 2)
+
+    async def _committed_orders(self, order_numbers: List[str]) -> Set[str]:
+        async with async_session_factory() as session:
+            result = await session.execute(select(Order.order_number).where(Order.order_number.in_(order_numbers)))
+            return set(result.scalars())
+
+    async def release_expired(self) -> int:
+        """
+        Settle reservations whose TTL has passed
+        Holds tagged with an order that committed are confirmed (its
+        confirm failed after the commit); the rest are released
+        """
+        client = self._get_redis()
+        expired_ids = await client.zrangebyscore(
+            EXPIRY_KEY, "-inf", int(time.time() * 1000), start=0, num=self.sync_batch_size
+        )
+        expired_ids = [rid.decode() if isinstance(rid, bytes) else rid for rid in expired_ids]
+        if not expired_ids:
+            return 0
+
+        pipeline = client.pipeline(transaction=False)
+        for reservation_id in expired_ids:
+            pipeline.hget(f"{RESERVATION_PREFIX}{reservation_id}", "order")
+        tags = [tag.decode() if isinstance(tag, bytes) else tag for tag in await pipeline.execute()]
+        order_numbers = sorted({tag for tag in tags if tag})
+        try:
+            committed = await self._committed_orders(order_numbers) if order_numbers else set()
+        except Exception as e:
+            # Unknown outcome: leave tagged holds for the next pass rather than release sold units
+            print(f"⚠️  Could not check orders for expired stock holds: {e}")
+            committed = None
+
+        released = 0
+        for reservation_id, order_number in zip(expired_ids, tags):
+            if order_number and committed is None:
+                continue
+            if order_number in (committed or ()):
+                await self.confirm(reservation_id)
+                self.recovered += 1
+            elif await self.release(reservation_id):
+                released += 1
+        self.expired += released
+        return released
+
+    async def _sync_product(self, product_id: str) -> bool:
+        """Push one product's pending decrement; False when it has to be retried"""
+        client = self._get_redis()
+        lock_key = f"{LOCK_PREFIX}{product_id}"
+        token = uuid.uuid4().hex
+        if not await client.set(lock_key, token, nx=True, px=self.sync_lock_ms):
+            # Another replica is syncing this product; look again next pass
+            self.sync_contended += 1
+            await client.sadd(DIRTY_KEY, product_id)
+            return True
+        # The PATCH, its bookkeeping and the unlock finish even if this task is cancelled
+        return await asyncio.shield(self._push_locked(product_id, lock_key, token))
+
+    async def _push_locked(self, product_id: str, lock_key: str, token: str) -> bool:
+        try:
+            return await self._push_pending(product_id)
+        finally:
+            await self._script("unlock")(keys=[lock_key], args=[token])
+
+    async def _push_pending(self, product_id: str) -> bool:
+        keys = [f"{PENDING_PREFIX}{product_id}", f"{INFLIGHT_PREFIX}{product_id}", DIRTY_KEY]
+        quantity, target = await self._script("claim")(keys=keys[:2])
+        if not quantity:
+            return True
+
+        stock = await self._fetch_stock(product_id)
+        if stock is None:
+            await self._script("restore")(keys=keys, args=[product_id])
+            return False
+        if target is not None and stock == int(target):
+            # A previous attempt's PATCH was applied but never recorded
+            await self._script("finish")(keys=keys, args=[product_id])
+            return True
+
+        target = max(0, stock - int(quantity))
+        await self._get_redis().hset(keys[1], "target", target)
+        try:
+            response = await http_clients.request(
+                "product", "PATCH", f"{settings.product_service_url}/products/{product_id}/stock",
+                json={"stock": target}
+            )
+        except Exception:
+            # May or may not have been applied: keep the inflight record (and
+            # its target) so the next pass can tell
+            await self._get_redis().sadd(DIRTY_KEY, product_id)
+            raise
+        if response.status_code != 200:
+            await self._script("restore")(keys=keys, args=[product_id])
+            return False
+        await self._script("finish")(keys=keys, args=[product_id])
+        return True
+
+    async def sync_pending(self) -> int:
+        """Push a batch of confirmed decrements to the product service"""
+        client = self._get_redis()
+        product_ids = await client.spop(DIRTY_KEY, self.sync_batch_size) or []
+        product_ids = [pid.decode() if isinstance(pid, bytes) else pid for pid in product_ids]
+
+        async def sync_one(product_id: str) -> bool:
+            try:
+                synced = await self._sync_product(product_id)
+            except Exception:
+                synced = False
+            if not synced:
+                self.sync_errors += 1
+                await client.sadd(DIRTY_KEY, product_id)  # Retry on the next pass
+            return synced
+
+        results = await gather_bounded(sync_one, product_ids, settings.checkout_max_concurrency)
+        synced = sum(1 for ok in results if ok)
+        self.synced_products += synced
+        return synced
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.release_expired()
+                await self.sync_pending()
+            except Exception as e:
+                print(f"⚠️  Stock ledger sync failed: {e}")
+
+    async def start(self):
+        """Start the background expiry/sync task"""
+        self._get_redis()
+        self._task = asyncio.create_task(self._sync_loop())
+        print("📦 Stock reservation ledger ready")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._redis is not None:
+            try:
+                await self.sync_pending()  # Flush what we can before exiting
+            except Exception:
+                pass
+            await self._redis.close()
+            self._redis = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.stock_reservation_enabled,
+            "reservation_ttl_seconds": self.reservation_ttl,
+            "reserved": self.reserved,
+            "rejected": self.rejected,
+            "confirmed": self.confirmed,
+            "released": self.released,
+            "expired": self.expired,
+            "confirmed_late": self.confirmed_late,
+            "recovered": self.recovered,
+            "synced_products": self.synced_products,
+            "sync_errors": self.sync_errors,
+            "sync_contended": self.sync_contended
+        }
+
+
+# Global instance
+stock_ledger = StockReservationLedger(
+    redis_url=settings.redis_url,
+    reservation_ttl=settings.stock_reservation_ttl_seconds,
+    seed_ttl=settings.stock_ledger_seed_ttl_seconds,
+    sync_interval=settings.stock_sync_interval_seconds,
+    sync_batch_size=settings.stock_sync_batch_size,
+    sync_lock_seconds=settings.stock_sync_lock_seconds
+)
@@ -0,0 +1,178 @@
+import asyncio
+import random
+import re
+from decimal import Decimal
+
+import httpx
+import pytest
+import respx
+from sqlalchemy import delete, event
+
+from config.settings import settings
+from database.connection import async_session_factory, engine
+from models.order import Order
+from schemas.order_schemas import OrderCreate, OrderResponse
+from services.order_service import OrderService
+from utils.auth import User
+
+USER = User(id=737373, email="checkout@example.com", name="Checkout Test")
+LATENCY = 0.2  # Seconds added to every downstream call
+
+
+def cart(items: int):
+    return [{"productId": product_id, "price": 12.5, "quantity": 1} for product_id in range(1, items + 1)]
+
+
+def validated(cart_items):
+    return [{
+        "product_id": item["productId"], "product_name": f"Product {item['productId']}",
+        "product_sku": f"SKU-{item['productId']}", "product_image": "",
+        "unit_price": Decimal("12.50"), "quantity": 1, "total_price": Decimal("12.50"), "product_attributes": ""
+    } for item in cart_items]
+
+
+class Downstream:
+    """respx-stubbed cart and product services that record DB connections checked out during each call"""
+
+    def __init__(self, items: int):
+        self.items = items
+        self.checked_out = 0
+        self.seen_during_calls = []
+
+    async def respond(self, request: httpx.Request) -> httpx.Response:
+        self.seen_during_calls.append(self.checked_out)
+        await asyncio.sleep(LATENCY)
+        self.seen_during_calls.append(self.checked_out)
+        if request.url.host == "cart.test":
+            return httpx.Response(200, json={"items": cart(self.items)})
+        if request.method == "PATCH":
+            return httpx.Response(200, json={"success": True})
+        product_id = int(request.url.path.rsplit("/", 1)[-1])
+        return httpx.Response(200, json={"success": True, "data": {
+            "_id": product_id, "title": f"Product {product_id}", "sku": f"SKU-{product_id}", "image": "", "stock": 100
+        }})
+
+
+class SimulatedProductService(OrderService):
+    """OrderService whose product lookups sleep a random few milliseconds; unknown ids are missing"""
+
+    def __init__(self, missing=()):
+        super().__init__(db=None)
+        self.missing = set(missing)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def get_product_details(self, product_id: int, token: str):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(random.uniform(0, 0.01))
+        finally:
+            self.in_flight -= 1
+        if product_id in self.missing:
+            return None
+        return {"title": f"Product {product_id}", "sku": f"SKU-{product_id}", "image": f"{product_id}.png"}
+
+
+async def sequential_validation(service: OrderService, cart_items):
+    """The previous loop: one awaited lookup after another"""
+    return [await service.validate_cart_item(cart_item, "token") for cart_item in cart_items]
+
+
+@pytest.fixture
+def downstream(monkeypatch):
+    # Every product lookup and stock update goes over (stubbed) HTTP
+    monkeypatch.setattr(settings, "product_cache_enabled", False)
+    monkeypatch.setattr(settings, "stock_reservation_enabled", False)
+    stub = Downstream(items=3)
+
+    def on_checkout(*args):
+        stub.checked_out += 1
+
+    def on_checkin(*args):
+        stub.checked_out -= 1
+
+    event.listen(engine.sync_engine, "checkout", on_checkout)
+    event.listen(engine.sync_engine, "checkin", on_checkin)
+    with respx.mock:
+        respx.route(host__regex=re.compile(r"(cart|product)\.test")).mock(side_effect=stub.respond)
+        yield stub
+    event.remove(engine.sync_engine, "checkout", on_checkout)
+    event.remove(engine.sync_engine, "checkin", on_checkin)
+
+
+@pytest.fixture
+async def cleanup_orders():
+    yield
+    async with async_session_factory() as session:
+        async with session.begin():
+            await session.execute(delete(Order).where(Order.user_id == USER.id))
+
+
+@pytest.mark.parametrize("items", [0, 1, 5, 40])
+async def test_concurrent_validation_matches_the_sequential_loop(items):
+    cart_items = [{"productId": product_id, "price": 9.99 + product_id, "quantity": product_id % 3 + 1}
+                  for product_id in range(1, items + 1)]
+    service = SimulatedProductService()
+
+    concurrent = await service.validate_cart_items(cart_items, "token")
+
+    assert concurrent == await sequential_validation(service, cart_items)
+    assert service.peak_in_flight <= settings.checkout_max_concurrency
+    if items > 1:
+        assert service.peak_in_flight > 1
+
+
+async def test_concurrent_validation_rejects_an_invalid_cart_like_the_sequential_loop():
+    cart_items = [{"productId": product_id, "price": 9.99, "quantity": 1} for product_id in range(1, 21)]
+    service = SimulatedProductService(missing={13})
+
+    with pytest.raises(ValueError) as sequential_error:
+        await sequential_validation(service, cart_items)
+    with pytest.raises(ValueError) as concurrent_error:
+        await service.validate_cart_items(cart_items, "token")
+
+    assert str(concurrent_error.value) == str(sequential_error.value) == "Product 13 not found or unavailable"
+    assert service.in_flight == 0  # The remaining lookups were cancelled, not leaked
+
+
+@pytest.mark.parametrize("items", [1, 5, 50])
+async def test_order_write_runs_a_fixed_number_of_statements(database, cleanup_orders, items):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async with async_session_factory() as session:
+        service = OrderService(session)
+        cart_items = cart(items)
+        order = await service.build_order(OrderCreate(), USER, cart_items)
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            await service.write_order(order, validated(cart_items), USER)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    # Order INSERT, one multi-row item INSERT, outbox INSERT, counter upsert - no reload SELECT
+    assert all(statement.startswith("INSERT INTO ") for statement in statements)
+    assert sorted(statement.split()[2] for statement in statements) == [
+        "order_items", "order_outbox", "order_stat_counters", "orders"
+    ]
+
+    # The response serialises from memory after the session is gone: no lazy loads
+    response = OrderResponse.model_validate(order)
+    assert [item.product_id for item in response.order_items] == list(range(1, items + 1))
+
+
+async def test_no_connection_is_held_during_downstream_calls(database, downstream, cleanup_orders):
+    async def checkout() -> Order:
+        async with async_session_factory() as session:
+            return await OrderService(session).create_order_simple(OrderCreate(), USER, "token")
+
+    orders = await asyncio.gather(*[checkout() for _ in range(3)])
+
+    assert all(len(order.order_items) == 3 for order in orders)
+    # Cart fetch and stock GET/PATCH per checkout; concurrent lookups of a product are coalesced
+    assert len(downstream.seen_during_calls) >= 2 * (3 * (1 + 2 * 3) + 3)
+    assert set(downstream.seen_during_calls) == {0}
+    assert downstream.checked_out == 0
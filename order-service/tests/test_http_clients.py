@@ -0,0 +1,111 @@
+import asyncio
+import socket
+
+import pytest
+import trustme
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+
+from config.settings import settings
+from utils import http_clients as http_clients_module
+from utils.http_clients import HTTPClientManager
+
+
+async def app(scope, receive, send):
+    """Product stand-in: 200 {} for any request"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+async def start_server(tmp_path, monkeypatch):
+    """Start a local server offering the given ALPN protocols over TLS (or plain HTTP); returns its base URL"""
+    ca = trustme.CA()
+    ca.cert_pem.write_to_path(str(tmp_path / "ca.pem"))
+    monkeypatch.setenv("SSL_CERT_FILE", str(tmp_path / "ca.pem"))  # httpx trusts the throwaway CA
+    cert = ca.issue_cert("127.0.0.1")
+    for blob in cert.cert_chain_pems:
+        blob.write_to_path(str(tmp_path / "cert.pem"), append=True)
+    cert.private_key_pem.write_to_path(str(tmp_path / "key.pem"))
+    shutdown = asyncio.Event()
+    servers = []
+
+    async def start(alpn_protocols, tls: bool = True) -> str:
+        port = free_port()
+        config = Config()
+        config.bind = [f"127.0.0.1:{port}"]
+        config.accesslog = None
+        if tls:
+            config.certfile = str(tmp_path / "cert.pem")
+            config.keyfile = str(tmp_path / "key.pem")
+            config.alpn_protocols = alpn_protocols
+        servers.append(asyncio.create_task(serve(app, config, shutdown_trigger=shutdown.wait)))
+        for _ in range(50):
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.close()
+                break
+            except OSError:
+                await asyncio.sleep(0.05)
+        return f"{'https' if tls else 'http'}://127.0.0.1:{port}"
+
+    yield start
+    shutdown.set()
+    await asyncio.gather(*servers)
+
+
+@pytest.fixture
+async def manager(monkeypatch):
+    monkeypatch.setattr(settings, "http2_enabled", True)
+    manager = HTTPClientManager()
+    yield manager
+    await manager.shutdown()
+
+
+async def test_http2_mode_negotiates_h2_when_the_peer_offers_it(start_server, manager):
+    base_url = await start_server(["h2", "http/1.1"])
+
+    response = await manager.request("product", "GET", f"{base_url}/products/1")
+
+    assert manager.http2
+    assert response.http_version == "HTTP/2"
+
+
+async def test_http2_mode_falls_back_to_http11_when_the_peer_lacks_h2(start_server, manager):
+    base_url = await start_server(["http/1.1"])
+
+    responses = [await manager.request("product", "GET", f"{base_url}/products/{n}") for n in range(3)]
+
+    assert manager.http2
+    assert [response.status_code for response in responses] == [200] * 3
+    assert {response.http_version for response in responses} == {"HTTP/1.1"}
+    assert manager._protocol_counts["product"] == {"HTTP/1.1": 3}
+
+
+async def test_http2_mode_uses_http11_for_plain_http_urls(start_server, manager):
+    base_url = await start_server(None, tls=False)
+
+    response = await manager.request("product", "GET", f"{base_url}/products/1")
+
+    assert response.http_version == "HTTP/1.1"
+
+
+def test_http2_mode_is_off_without_the_h2_package(monkeypatch):
+    monkeypatch.setattr(settings, "http2_enabled", True)
+    monkeypatch.setattr(http_clients_module, "http2_available", lambda: False)
+
+    assert not HTTPClientManager().http2
@@ -0,0 +1,39 @@
+import httpx
+import pytest
+
+from app import app
+from config.settings import settings
+from utils.auth import User, create_service_token
+
+
+@pytest.fixture
+async def client(monkeypatch):
+    # Roles come from the JWT claims; no user-service lookup
+    monkeypatch.setattr(settings, "user_lookup_policy", "claims")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://order-service.test") as client:
+        yield client
+
+
+def bearer(role: str) -> dict:
+    token = create_service_token(User(id=1, email="ops@example.com", name="Ops", role=role))
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def test_metrics_require_credentials(client):
+    response = await client.get("/metrics")
+
+    assert response.status_code in (401, 403)
+    assert "database" not in response.text
+
+
+async def test_metrics_are_hidden_from_regular_users(client):
+    response = await client.get("/metrics", headers=bearer("user"))
+
+    assert response.status_code == 403
+
+
+async def test_admins_get_metrics_with_pool_stats(client):
+    response = await client.get("/metrics", headers=bearer("admin"))
+
+    assert response.status_code == 200
+    assert {"database", "circuit_breakers", "stock_ledger"} <= response.json().keys()
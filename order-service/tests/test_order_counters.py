@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import delete, select
+
+from database.connection import async_session_factory
+from models.order import Order, OrderStatus, OrderStatusHistory, PaymentStatus
+from schemas.order_schemas import OrderUpdate
+from services.order_counters import order_counters, status_key, day_key
+from services.order_service import OrderService
+from utils.auth import User
+
+
+def make_order(number: str, total: str = "10.00") -> Order:
+    return Order(
+        user_id=515151, order_number=f"COUNTERS-{number}", status=OrderStatus.PENDING,
+        payment_status=PaymentStatus.PENDING, subtotal=Decimal(total), tax_amount=Decimal("0.00"),
+        shipping_amount=Decimal("0.00"), discount_amount=Decimal("0.00"), total_amount=Decimal(total),
+        shipping_address="1 Test Street", shipping_city="Test City", shipping_state="CA",
+        shipping_postal_code="90210", shipping_country="USA", customer_email="counters@example.com",
+        created_at=datetime.utcnow()
+    )
+
+
+async def reconcile(fix: bool):
+    async with async_session_factory() as session:
+        return await order_counters.reconcile(session, fix=fix)
+
+
+async def test_reconcile_repairs_drift_with_corrective_deltas(database):
+    await reconcile(fix=True)
+    pending, today = status_key(OrderStatus.PENDING), day_key(datetime.utcnow().date())
+    try:
+        async with async_session_factory() as session:
+            async with session.begin():
+                session.add(make_order("untracked", total="7.50"))  # Written without its counters
+                await order_counters.apply(session, {status_key(OrderStatus.SHIPPED): (3, Decimal("0"))})
+
+        report = await reconcile(fix=True)
+
+        drifted = {entry["key"]: entry for entry in report["drift"]}
+        assert set(drifted) == {pending, today, status_key(OrderStatus.SHIPPED)}
+        assert drifted[pending]["actual_count"] - drifted[pending]["stored_count"] == 1
+        assert Decimal(drifted[pending]["actual_amount"]) - Decimal(drifted[pending]["stored_amount"]) == Decimal("7.50")
+        assert drifted[status_key(OrderStatus.SHIPPED)]["stored_count"] - drifted[status_key(OrderStatus.SHIPPED)]["actual_count"] == 3
+        assert report["repaired"]
+        assert (await reconcile(fix=False))["drift"] == []
+    finally:
+        async with async_session_factory() as session:
+            async with session.begin():
+                await session.execute(delete(Order).where(Order.user_id == 515151))
+        await reconcile(fix=True)
+
+
+async def test_reconcile_does_not_wait_for_open_checkouts(database):
+    await reconcile(fix=True)
+    async with async_session_factory() as checkout:
+        async with checkout.begin():
+            # An in-flight checkout holding its counter rows (previously LOCK TABLE queued behind it)
+            order = make_order("in-flight")
+            checkout.add(order)
+            await checkout.flush()
+            await order_counters.record_order_created(checkout, order)
+
+            report = await asyncio.wait_for(reconcile(fix=True), timeout=10)
+            assert report["drift"] == []
+            await checkout.rollback()
+    assert (await reconcile(fix=False))["drift"] == []
+
+
+async def test_concurrent_status_updates_keep_counters_exact(database):
+    await reconcile(fix=True)
+    admin = User(id=1, email="admin@example.com", name="Admin", role="admin")
+    targets = [OrderStatus.CONFIRMED, OrderStatus.SHIPPED, OrderStatus.CANCELLED, OrderStatus.DELIVERED] * 5
+    try:
+        async with async_session_factory() as session:
+            async with session.begin():
+                order = make_order("contended")
+                session.add(order)
+                await session.flush()
+                await order_counters.record_order_created(session, order)
+
+        async def update(new_status: OrderStatus):
+            async with async_session_factory() as session:
+                await OrderService(session).update_order_status(order.id, OrderUpdate(status=new_status), admin)
+
+        # Twenty admins move the same order at once; each delta must start from the committed status
+        await asyncio.gather(*[update(new_status) for new_status in targets])
+
+        assert (await reconcile(fix=False))["drift"] == []
+        async with async_session_factory() as session:
+            history = (await session.execute(
+                select(OrderStatusHistory).where(OrderStatusHistory.order_id == order.id).order_by(OrderStatusHistory.id)
+            )).scalars().all()
+        for previous, current in zip(history, history[1:]):
+            assert current.old_status == previous.new_status
+    finally:
+        async with async_session_factory() as session:
+            async with session.begin():
+                await session.execute(delete(Order).where(Order.user_id == 515151))
+        await reconcile(fix=True)
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, text
+
+from benchmarks.explain_order_filters import SEED_SQL, explain, filter_combinations, listing_queries
+from benchmarks.order_indexes import MIGRATION_INDEXES, SEED_ORDERS_SQL, SEED_ITEMS_SQL, SEED_HISTORY_SQL
+from database.connection import async_session_factory, engine
+from migrations.add_order_indexes import add_order_indexes
+from models.order import Order, OrderItem, OrderStatusHistory
+
+LISTING_ROWS = 200_000  # ~40 orders per user: enough for the planner to prefer the composite indexes
+INDEXED_ROWS = 50_000
+
+# Index each single filter must use for GET /admin/orders (offset and cursor mode)
+LISTING_INDEXES = {
+    (): "ix_orders_created_at_id",
+    ("user_id",): "ix_orders_user_created_at",
+    ("status",): "ix_orders_status_created_at",
+    ("payment_status",): "ix_orders_payment_pending_created_at",
+    ("created_from", "created_to"): "ix_orders_created_at_id"
+}
+
+
+async def seed(rows: int, *statements):
+    async with async_session_factory() as session:
+        for statement in statements:
+            async with session.begin():
+                await session.execute(statement, {"rows": rows})
+            # Fresh stats before child rows are seeded (foreign-key checks) and before EXPLAIN
+            await session.execute(text("ANALYZE orders, order_items, order_status_history"))
+            await session.commit()
+
+
+async def unseed(prefix: str):
+    async with async_session_factory() as session:
+        async with session.begin():
+            await session.execute(text("DELETE FROM orders WHERE order_number LIKE :prefix"), {"prefix": f"{prefix}-%"})
+
+
+def index_names(nodes):
+    return {node["Index Name"] for node in nodes if "Index Name" in node}
+
+
+def orders_seq_scans(nodes):
+    return [node for node in nodes if node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "orders"]
+
+
+@pytest.fixture
+async def listing_orders(database):
+    await unseed("EXPLAIN")  # Left over from an interrupted run
+    await seed(LISTING_ROWS, SEED_SQL)
+    yield
+    await unseed("EXPLAIN")
+
+
+@pytest.fixture
+async def indexed_orders(database):
+    await unseed("IDX")  # Left over from an interrupted run
+    await seed(INDEXED_ROWS, SEED_ORDERS_SQL, SEED_ITEMS_SQL, SEED_HISTORY_SQL)
+    yield
+    await unseed("IDX")
+    await add_order_indexes()  # Leave every model index in place for the other tests
+
+
+async def test_every_admin_filter_combination_uses_an_index(listing_orders):
+    async with engine.connect() as conn:
+        for filters in filter_combinations():
+            names = tuple(filters.model_dump(exclude_none=True))
+            for mode, query in listing_queries(filters):
+                nodes = await explain(conn, query)
+                assert not orders_seq_scans(nodes), f"{mode} {names or '(no filters)'} scans orders sequentially"
+                if names in LISTING_INDEXES:
+                    assert LISTING_INDEXES[names] in index_names(nodes), \
+                        f"{mode} {names or '(no filters)'} uses {index_names(nodes)}"
+
+
+async def test_migration_builds_valid_indexes_the_hot_queries_use(indexed_orders):
+    async with engine.begin() as conn:
+        for name in MIGRATION_INDEXES:
+            await conn.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+        # Single-column index from before ix_orders_user_created_at
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_orders_user_id ON orders (user_id)"))
+
+    built = await add_order_indexes()
+
+    assert set(MIGRATION_INDEXES) <= set(built)
+    async with engine.connect() as conn:
+        assert not await conn.scalar(text("SELECT to_regclass('ix_orders_user_id') IS NOT NULL"))
+        invalid = (await conn.execute(text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE NOT i.indisvalid AND c.relname LIKE 'ix_order%'"
+        ))).scalars().all()
+        assert invalid == []
+        await conn.execute(text("ANALYZE orders, order_items, order_status_history"))
+
+        order_ids = (await conn.execute(
+            select(Order.id).where(Order.order_number.like("IDX-%")).limit(20)
+        )).scalars().all()
+        day = (datetime.utcnow() - timedelta(days=30)).replace(hour=0, minute=0, second=0, microsecond=0)
+        queries = {
+            "ix_order_items_order_id": select(OrderItem).where(OrderItem.order_id.in_(order_ids)),
+            "ix_order_status_history_order_id": select(OrderStatusHistory).where(
+                OrderStatusHistory.order_id == order_ids[0]
+            ),
+            "ix_orders_created_at_id": select(Order.id).where(
+                Order.created_at >= day, Order.created_at < day + timedelta(days=1)
+            )
+        }
+        for index, query in queries.items():
+            assert index in index_names(await explain(conn, query)), f"{index} unused"
@@ -0,0 +1,113 @@
+from datetime import datetime
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy import delete
+
+from app import app
+from config.settings import settings
+from database.connection import async_session_factory
+from models.order import Order, OrderItem, OrderStatus, PaymentStatus
+from schemas.order_schemas import OrderResponse
+from services.order_service import OrderService
+from utils.auth import User, get_current_user
+
+OWNER = User(id=424242, email="conformance@example.com", name="Conformance")
+AWKWARD_TEXT = ('He said "hi" \\ back\\slash\nnew line\ttab\r\b\f\x01\x1f\x7f é ü 中文 🚀 '
+                'e\u0301 \u2028 \u2029 \ufeff </script>')
+
+
+def make_order(number: int, **overrides) -> Order:
+    values = dict(
+        user_id=OWNER.id, order_number=f"JSON-CONFORMANCE-{number}",
+        status=OrderStatus.PENDING, payment_status=PaymentStatus.PENDING,
+        subtotal=Decimal("100.00"), tax_amount=Decimal("10.00"), shipping_amount=Decimal("0.00"),
+        discount_amount=Decimal("0.00"), total_amount=Decimal("110.00"),
+        shipping_address="1 Test Street", shipping_city="Test City", shipping_state="CA",
+        shipping_postal_code="90210", shipping_country="USA", customer_email="json@example.com",
+        customer_phone=None, notes=None, tracking_number=None,
+        created_at=datetime(2024, 1, 2, 3, 4, 5), updated_at=datetime(2024, 1, 2, 3, 4, 5, 600000)
+    )
+    values.update(overrides)
+    return Order(**values)
+
+
+def make_item(product_id: int, **overrides) -> OrderItem:
+    values = dict(
+        product_id=product_id, product_name=f"Product {product_id}", product_sku=None, product_image=None,
+        unit_price=Decimal("12.50"), quantity=2, total_price=Decimal("25.00"), product_attributes=None
+    )
+    values.update(overrides)
+    return OrderItem(**values)
+
+
+def cases():
+    # NULL optional fields, whole-second and sub-second timestamps
+    yield make_order(1)
+    # Quotes, backslashes, control characters, unicode; extreme amounts and microseconds
+    yield make_order(
+        2, notes=AWKWARD_TEXT, customer_phone="+1-555-0100", tracking_number="TRACK\"1\"",
+        shipping_address=AWKWARD_TEXT, status=OrderStatus.SHIPPED, payment_status=PaymentStatus.PAID,
+        subtotal=Decimal("99999999.99"), total_amount=Decimal("0.01"), discount_amount=Decimal("-5.00"),
+        created_at=datetime(2024, 2, 29, 23, 59, 59, 1), updated_at=datetime(2024, 3, 1, 0, 0, 0, 999999)
+    )
+    # Items with NULL and awkward columns
+    order = make_order(3, created_at=datetime(1999, 12, 31, 0, 0, 0, 500000), shipping_city="")
+    order.order_items = [make_item(1, product_name=AWKWARD_TEXT, product_attributes='{"size": "M"}'),
+                         make_item(2, product_sku="SKU-2", product_image="https://example.com/2.png")]
+    yield order
+    # Many items, fractional prices
+    order = make_order(4)
+    order.order_items = [make_item(product_id, unit_price=Decimal(product_id) / 100) for product_id in range(1, 51)]
+    yield order
+
+
+@pytest.fixture
+async def order_ids(database):
+    async with async_session_factory() as session:
+        async with session.begin():
+            orders = list(cases())
+            session.add_all(orders)
+    yield [order.id for order in orders]
+    async with async_session_factory() as session:
+        async with session.begin():
+            await session.execute(delete(Order).where(Order.user_id == OWNER.id))
+
+
+@pytest.fixture
+async def client():
+    app.dependency_overrides[get_current_user] = lambda: OWNER
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://order.test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+async def get_order(client: httpx.AsyncClient, monkeypatch, order_id: int, fast_path: bool) -> httpx.Response:
+    monkeypatch.setattr(settings, "order_json_fast_path", fast_path)
+    return await client.get(f"/orders/{order_id}")
+
+
+def test_fast_path_is_off_by_default():
+    assert settings.order_json_fast_path is False
+
+
+async def test_fast_path_bytes_match_the_response_model(order_ids, client, monkeypatch):
+    for order_id in order_ids:
+        orm = await get_order(client, monkeypatch, order_id, fast_path=False)
+        fast = await get_order(client, monkeypatch, order_id, fast_path=True)
+        async with async_session_factory() as session:
+            order = await OrderService(session).get_order_by_id(order_id, OWNER)
+            dumped = OrderResponse.model_validate(order).model_dump_json().encode("utf-8")
+
+        assert orm.status_code == fast.status_code == 200
+        assert fast.content == orm.content
+        assert fast.content == dumped
+        assert fast.headers["content-type"] == orm.headers["content-type"]
+
+
+async def test_fast_path_hides_other_users_orders(order_ids, client, monkeypatch):
+    app.dependency_overrides[get_current_user] = lambda: User(id=-1, email="other@example.com", name="Other")
+
+    assert (await get_order(client, monkeypatch, order_ids[0], fast_path=False)).status_code == 404
+    assert (await get_order(client, monkeypatch, order_ids[0], fast_path=True)).status_code == 404
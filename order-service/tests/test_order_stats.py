@@ -0,0 +1,118 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select, func, text
+
+from database.connection import async_session_factory
+from models.order import Order, OrderStatus
+from schemas.order_schemas import OrderCreate, OrderStats, OrderUpdate
+from services.order_counters import order_counters
+from services.order_service import OrderService
+from utils.auth import User
+
+ADMIN = User(id=1, email="stats@example.com", name="Stats", role="admin")
+
+# A year of history over every status, plus a few orders created today
+SEED_SQL = text("""
+    INSERT INTO orders (
+        user_id, order_number, status, payment_status, subtotal, tax_amount, shipping_amount,
+        discount_amount, total_amount, shipping_address, shipping_city, shipping_state,
+        shipping_postal_code, shipping_country, customer_email, created_at, updated_at
+    )
+    SELECT
+        1 + (n % 5000),
+        'STATS-' || n,
+        (ARRAY['pending','confirmed','processing','shipped','delivered','cancelled','refunded'])[1 + (n % 7)],
+        'pending',
+        amount, amount * 0.10, 0, 0, amount * 1.10,
+        '1 Stats Street', 'Stats City', 'CA', '90210', 'USA',
+        'stats' || (n % 5000) || '@example.com',
+        ts, ts
+    FROM (
+        SELECT n,
+               round((random() * 500)::numeric, 2) AS amount,
+               CASE WHEN n % 100 = 0 THEN now()::timestamp
+                    ELSE now()::timestamp - random() * interval '365 days' END AS ts
+        FROM generate_series(1, 20000) AS n
+    ) AS seed
+""")
+
+
+async def legacy_order_stats(db) -> OrderStats:
+    """The original implementation: a COUNT per status, a revenue SUM and two func.date() counts"""
+    counts = {}
+    counts["total_orders"] = await db.scalar(select(func.count(Order.id))) or 0
+    for status in ("pending", "confirmed", "processing", "shipped", "delivered", "cancelled"):
+        counts[f"{status}_orders"] = await db.scalar(
+            select(func.count(Order.id)).where(Order.status == OrderStatus(status))
+        ) or 0
+    total_revenue = await db.scalar(
+        select(func.sum(Order.total_amount)).where(Order.status.in_(
+            [OrderStatus.CONFIRMED, OrderStatus.PROCESSING, OrderStatus.SHIPPED, OrderStatus.DELIVERED]
+        ))
+    ) or Decimal('0.00')
+    today = datetime.now().date()
+    orders_today = await db.scalar(select(func.count(Order.id)).where(func.date(Order.created_at) == today)) or 0
+    month_start = datetime.now().replace(day=1).date()
+    orders_this_month = await db.scalar(
+        select(func.count(Order.id)).where(func.date(Order.created_at) >= month_start)
+    ) or 0
+    return OrderStats(**counts, total_revenue=total_revenue, orders_today=orders_today,
+                      orders_this_month=orders_this_month)
+
+
+async def all_stats():
+    async with async_session_factory() as session:
+        return (
+            await legacy_order_stats(session),
+            await OrderService(session).compute_order_stats(),
+            await order_counters.read_stats(session)
+        )
+
+
+async def reconcile():
+    async with async_session_factory() as session:
+        await order_counters.reconcile(session, fix=True)
+
+
+@pytest.fixture
+async def seeded_orders(database):
+    cleanup = text("DELETE FROM orders WHERE order_number LIKE 'STATS-%' OR user_id = :user_id")
+    async with async_session_factory() as session:
+        async with session.begin():
+            await session.execute(cleanup, {"user_id": ADMIN.id})
+            await session.execute(SEED_SQL)
+    await reconcile()  # Raw inserts bypass the counters
+    yield
+    async with async_session_factory() as session:
+        async with session.begin():
+            await session.execute(cleanup, {"user_id": ADMIN.id})
+    await reconcile()
+
+
+async def test_stats_match_the_per_status_counts(seeded_orders):
+    legacy, single_pass, counters = await all_stats()
+
+    assert legacy.total_orders >= 20000 and legacy.orders_today >= 200
+    assert single_pass == legacy
+    assert counters == legacy
+
+
+async def test_counters_follow_checkouts_and_status_changes_without_reconciling(seeded_orders):
+    async with async_session_factory() as session:
+        service = OrderService(session)
+        cart_items = [{"productId": 1, "price": 40.0, "quantity": 2}]
+        order = await service.build_order(OrderCreate(), ADMIN, cart_items)
+        await service.write_order(order, [{
+            "product_id": 1, "product_name": "Product 1", "product_sku": "", "product_image": "",
+            "unit_price": Decimal("40.00"), "quantity": 2, "total_price": Decimal("80.00"), "product_attributes": ""
+        }], ADMIN)
+    for status in (OrderStatus.CONFIRMED, OrderStatus.SHIPPED, OrderStatus.CANCELLED):
+        async with async_session_factory() as session:
+            await OrderService(session).update_order_status(order.id, OrderUpdate(status=status), ADMIN)
+
+    legacy, single_pass, counters = await all_stats()
+
+    assert single_pass == legacy
+    assert counters == legacy
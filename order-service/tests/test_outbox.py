@@ -0,0 +1,252 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+import respx
+from jose import jwt
+from sqlalchemy import delete, select
+
+from config.settings import settings
+from database.connection import async_session_factory
+from models.order import OrderOutboxEvent, OutboxStatus
+from services.outbox import CART_CLEAR, OutboxDispatcher, handle_cart_clear
+from utils.auth import User, create_service_token
+
+PAYLOAD = {"user_id": 7, "email": "ada@example.com", "name": "Ada", "role": "user", "product_ids": [3, 5]}
+TEST_EVENT = "test.event"
+
+
+def test_service_token_has_claims_user_service_requires():
+    """user-service GET /auth/me answers 401 "Invalid token format" without sub and jti"""
+    user = User(id=7, email="ada@example.com", name="Ada")
+    first = jwt.decode(create_service_token(user), settings.secret_key, algorithms=[settings.algorithm])
+    second = jwt.decode(create_service_token(user), settings.secret_key, algorithms=[settings.algorithm])
+
+    assert first["sub"] == "7"
+    assert first["jti"] and second["jti"] and first["jti"] != second["jti"]
+    assert 0 < first["exp"] - first["iat"] <= 5 * 60
+
+
+@respx.mock
+async def test_cart_clear_sends_a_token_user_service_accepts():
+    route = respx.delete(f"{settings.cart_service_url}/cart/items/3").mock(return_value=httpx.Response(200))
+    respx.delete(f"{settings.cart_service_url}/cart/items/5").mock(return_value=httpx.Response(200))
+
+    await handle_cart_clear(PAYLOAD)
+
+    token = route.calls.last.request.headers["Authorization"].removeprefix("Bearer ")
+    claims = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    assert claims["sub"] == "7" and claims["jti"]
+
+
+@respx.mock
+async def test_cart_clear_removes_only_the_ordered_products():
+    # Items added after checkout must survive the (possibly delayed) clear
+    items = respx.delete(url__regex=rf"{settings.cart_service_url}/cart/items/\d+").mock(
+        return_value=httpx.Response(200)
+    )
+    whole_cart = respx.delete(f"{settings.cart_service_url}/cart").mock(return_value=httpx.Response(200))
+
+    await handle_cart_clear(PAYLOAD)
+
+    assert sorted(call.request.url.path for call in items.calls) == ["/cart/items/3", "/cart/items/5"]
+    assert not whole_cart.called
+
+
+@respx.mock
+async def test_cart_clear_treats_an_already_removed_item_as_done():
+    # cart-service answers 404 "Item not found in cart" when the item is already gone (redelivery)
+    respx.delete(f"{settings.cart_service_url}/cart/items/3").mock(return_value=httpx.Response(404))
+    respx.delete(f"{settings.cart_service_url}/cart/items/5").mock(return_value=httpx.Response(200))
+
+    await handle_cart_clear(PAYLOAD)
+
+
+@respx.mock
+async def test_cart_clear_raises_when_the_token_is_rejected():
+    respx.delete(url__regex=rf"{settings.cart_service_url}/cart/items/\d+").mock(return_value=httpx.Response(401))
+
+    with pytest.raises(RuntimeError):
+        await handle_cart_clear(PAYLOAD)
+
+
+@respx.mock
+async def test_cart_clear_events_queued_without_product_ids_clear_the_cart():
+    route = respx.delete(f"{settings.cart_service_url}/cart").mock(return_value=httpx.Response(200))
+
+    await handle_cart_clear({key: value for key, value in PAYLOAD.items() if key != "product_ids"})
+
+    assert route.called
+
+
+def make_dispatcher(**overrides) -> OutboxDispatcher:
+    options = dict(poll_interval=60, batch_size=10, max_attempts=3,
+                   backoff_base=2, backoff_max=30, lease_seconds=60)
+    options.update(overrides)
+    return OutboxDispatcher(**options)
+
+
+def test_backoff_doubles_per_attempt_up_to_the_cap():
+    dispatcher = make_dispatcher()
+    for attempts, delay in [(1, 2), (2, 4), (3, 8), (4, 16), (5, 30), (9, 30)]:
+        seconds = dispatcher._backoff(attempts).total_seconds()
+        assert delay * 0.5 <= seconds <= delay
+
+
+async def test_notify_bursts_wake_the_dispatcher_once():
+    dispatcher = make_dispatcher()
+    passes = []
+
+    async def dispatch_batch():
+        passes.append(1)
+        return 0
+
+    dispatcher.dispatch_batch = dispatch_batch
+    await dispatcher.start()
+    try:
+        await asyncio.sleep(0.05)
+        assert len(passes) == 1  # Startup drain, then waiting on the poll interval
+
+        for _ in range(20):  # Twenty checkouts commit at once
+            dispatcher.notify()
+        await asyncio.sleep(0.05)
+        assert len(passes) == 2
+
+        dispatcher.notify()
+        await asyncio.sleep(0.05)
+        assert len(passes) == 3
+    finally:
+        await dispatcher.stop()
+
+
+@pytest.fixture
+async def outbox(database):
+    """Empty order_outbox table; add(...) inserts due events and returns their ids"""
+    async def clear():
+        async with async_session_factory() as session:
+            async with session.begin():
+                await session.execute(delete(OrderOutboxEvent))
+
+    async def add(*payloads, event_type: str = TEST_EVENT):
+        now = datetime.utcnow() - timedelta(seconds=1)
+        events = [
+            OrderOutboxEvent(event_type=event_type, dedupe_key=f"{event_type}:{index}:{now.timestamp()}",
+                             payload=json.dumps(payload), status=OutboxStatus.PENDING, attempts=0,
+                             next_attempt_at=now, created_at=now)
+            for index, payload in enumerate(payloads)
+        ]
+        async with async_session_factory() as session:
+            async with session.begin():
+                session.add_all(events)
+        return [event.id for event in events]
+
+    await clear()
+    yield add
+    await clear()
+
+
+async def load(event_id: int) -> OrderOutboxEvent:
+    async with async_session_factory() as session:
+        return await session.get(OrderOutboxEvent, event_id)
+
+
+async def make_due(event_id: int):
+    async with async_session_factory() as session:
+        async with session.begin():
+            event = await session.get(OrderOutboxEvent, event_id)
+            event.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+
+
+async def test_claim_skips_events_locked_by_another_dispatcher(outbox):
+    ids = await outbox(*[{"n": n} for n in range(4)])
+    dispatcher = make_dispatcher()
+
+    async with async_session_factory() as other:
+        async with other.begin():
+            # Another replica is mid-claim on the first two events
+            await other.execute(
+                select(OrderOutboxEvent.id).where(OrderOutboxEvent.id.in_(ids[:2])).with_for_update()
+            )
+            claimed = await asyncio.wait_for(dispatcher._claim(), timeout=5)
+
+    assert sorted(event.id for event in claimed) == ids[2:]
+    for event_id in ids[2:]:
+        event = await load(event_id)
+        assert event.attempts == 1
+        assert event.next_attempt_at > datetime.utcnow() + timedelta(seconds=50)  # Leased
+    assert (await load(ids[0])).attempts == 0
+
+    # Once the other claim is gone the skipped events are picked up; leased ones are not due
+    assert sorted(event.id for event in await dispatcher._claim()) == ids[:2]
+
+
+async def test_parallel_dispatchers_claim_disjoint_events(outbox):
+    ids = await outbox(*[{"n": n} for n in range(20)])
+    dispatchers = [make_dispatcher(batch_size=5) for _ in range(4)]
+
+    batches = await asyncio.gather(*[dispatcher._claim() for dispatcher in dispatchers])
+
+    claimed = [event.id for batch in batches for event in batch]
+    assert len(claimed) == len(set(claimed))
+    assert sorted(claimed) == ids
+
+
+async def test_failed_event_is_rescheduled_with_backoff(outbox):
+    [event_id] = await outbox({"n": 1})
+    dispatcher = make_dispatcher(backoff_base=10)
+
+    async def fail(payload):
+        raise RuntimeError("cart service down")
+
+    dispatcher.handlers[TEST_EVENT] = fail
+    before = datetime.utcnow()
+    assert await dispatcher.dispatch_batch() == 1
+
+    event = await load(event_id)
+    assert event.status == OutboxStatus.PENDING
+    assert event.attempts == 1
+    assert event.last_error == "cart service down"
+    assert before + timedelta(seconds=5) <= event.next_attempt_at <= datetime.utcnow() + timedelta(seconds=10)
+    assert dispatcher.retried == 1
+    assert await dispatcher.dispatch_batch() == 0  # Not due until the backoff runs out
+
+
+async def test_event_is_parked_as_failed_at_max_attempts(outbox):
+    [event_id] = await outbox({"n": 1})
+    dispatcher = make_dispatcher(max_attempts=3)
+    calls = []
+
+    async def fail(payload):
+        calls.append(payload)
+        raise RuntimeError("still down")
+
+    dispatcher.handlers[TEST_EVENT] = fail
+    for _ in range(3):
+        assert await dispatcher.dispatch_batch() == 1
+        await make_due(event_id)
+
+    event = await load(event_id)
+    assert event.status == OutboxStatus.FAILED
+    assert event.attempts == 3
+    assert (dispatcher.retried, dispatcher.failed) == (2, 1)
+    assert await dispatcher.dispatch_batch() == 0  # Parked events are never claimed again
+    assert len(calls) == 3
+
+
+@respx.mock
+async def test_cart_clears_for_one_user_are_merged_into_one_pass(outbox):
+    items = respx.delete(url__regex=rf"{settings.cart_service_url}/cart/items/\d+").mock(
+        return_value=httpx.Response(200)
+    )
+    ids = await outbox({**PAYLOAD, "product_ids": [3, 5]}, {**PAYLOAD, "product_ids": [5, 8]},
+                       event_type=CART_CLEAR)
+    dispatcher = make_dispatcher()
+
+    assert await dispatcher.dispatch_batch() == 2
+
+    assert sorted(call.request.url.path for call in items.calls) == ["/cart/items/3", "/cart/items/5", "/cart/items/8"]
+    assert dispatcher.deduplicated == 1
+    assert dispatcher.dispatched == 2
+    assert [(await load(event_id)).status for event_id in ids] == [OutboxStatus.DISPATCHED] * 2
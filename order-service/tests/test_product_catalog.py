@@ -0,0 +1,66 @@
+import httpx
+import respx
+
+from config.settings import settings
+from services.product_catalog import ProductCatalog
+
+LISTING = f"{settings.product_service_url}/products"
+
+
+def product(product_id: int, updated_at: str = "2024-01-01T00:00:00.000Z") -> dict:
+    return {"_id": product_id, "title": f"Product {product_id}", "sku": f"SKU-{product_id}",
+            "image": "", "price": 9.99, "stock": 5, "updatedAt": updated_at}
+
+
+def listing(*products: dict) -> httpx.Response:
+    return httpx.Response(200, json={"success": True, "count": len(products), "data": list(products)})
+
+
+def make_catalog(page_limit: int = 100) -> ProductCatalog:
+    return ProductCatalog(refresh_interval=30, full_sync_interval=3600, stale_after=300, page_limit=page_limit)
+
+
+@respx.mock
+async def test_poll_drops_products_missing_from_the_active_listing():
+    route = respx.get(LISTING).mock(return_value=listing(product(1), product(2), product(3)))
+    catalog = make_catalog()
+    await catalog.sync(full=True)
+
+    # Product 2 was deactivated: the product service simply stops listing it
+    route.mock(return_value=listing(product(1), product(3)))
+    await catalog.sync(full=False)
+
+    assert catalog.get(2) is None  # Checkout falls back to the remote lookup
+    assert catalog.get(1) is not None and catalog.get(3) is not None
+    assert catalog.removed == 1
+    assert "updatedSince" not in route.calls.last.request.url.params
+
+
+@respx.mock
+async def test_reactivated_product_returns_even_with_an_old_updated_at():
+    route = respx.get(LISTING).mock(return_value=listing(product(1, "2024-05-01T00:00:00.000Z"), product(2)))
+    catalog = make_catalog()
+    await catalog.sync(full=True)
+    route.mock(return_value=listing(product(1, "2024-05-01T00:00:00.000Z")))
+    await catalog.sync(full=False)
+
+    route.mock(return_value=listing(product(1, "2024-05-01T00:00:00.000Z"), product(2)))
+    await catalog.sync(full=False)
+
+    assert catalog.get(2) is not None
+
+
+@respx.mock
+async def test_truncated_listing_keeps_unlisted_products():
+    route = respx.get(LISTING).mock(return_value=listing(product(1), product(2)))
+    catalog = make_catalog(page_limit=2)
+    await catalog.sync(full=True)
+
+    # Two newer products fill the page; 1 and 2 may still be active past the limit
+    route.mock(return_value=listing(product(3), product(4)))
+    await catalog.sync(full=False)
+    await catalog.sync(full=True)
+
+    assert all(catalog.get(product_id) is not None for product_id in (1, 2, 3, 4))
+    assert catalog.removed == 0
+    assert catalog.truncated_syncs == 3
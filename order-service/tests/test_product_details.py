@@ -0,0 +1,107 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from config.settings import settings
+from services import order_service
+from services.order_service import OrderService, ProductLookupError
+from services.product_cache import ProductCache
+from services.product_loader import ProductBatchLoader
+
+PRODUCT = {"_id": 9, "title": "Product 9", "sku": "SKU-9", "image": "", "price": 9.99, "stock": 5}
+PRODUCT_URL = f"{settings.product_service_url}/products/9"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Fresh in-process product cache; lookups go straight to the (mocked) product service"""
+    cache = ProductCache(max_entries=100, ttl=60, negative_ttl=60)
+    monkeypatch.setattr(order_service, "product_cache", cache)
+    monkeypatch.setattr(settings, "product_cache_enabled", True)
+    monkeypatch.setattr(settings, "product_batch_enabled", False)
+    return cache
+
+
+@respx.mock
+async def test_missing_product_is_negatively_cached(cache):
+    route = respx.get(PRODUCT_URL).mock(return_value=httpx.Response(404))
+    service = OrderService(None)
+
+    assert await service.get_product_details(9, "token") is None
+    assert await service.get_product_details(9, "token") is None
+
+    assert route.call_count == 1
+    assert await cache.get(9) == (True, None)
+
+
+@pytest.mark.parametrize("response", [
+    httpx.Response(500),
+    httpx.Response(401),
+    httpx.Response(429),
+    httpx.ConnectError("connection refused"),
+    httpx.Response(200, text="<html>gateway error</html>"),
+])
+@respx.mock
+async def test_other_failures_raise_and_are_not_cached(cache, response):
+    route = respx.get(PRODUCT_URL).mock(side_effect=[response, httpx.Response(200, json={"success": True, "data": PRODUCT})])
+    service = OrderService(None)
+
+    with pytest.raises(ProductLookupError):
+        await service.get_product_details(9, "token")
+    assert await cache.get(9) == (False, None)
+
+    # The product is still there: the next checkout sees it
+    assert await service.get_product_details(9, "token") == PRODUCT
+    assert route.call_count == 2
+
+
+@respx.mock
+async def test_checkout_validation_does_not_report_a_failed_lookup_as_missing(cache):
+    respx.get(PRODUCT_URL).mock(return_value=httpx.Response(503))
+
+    with pytest.raises(ProductLookupError):
+        await OrderService(None).validate_cart_item({"productId": 9, "price": 9.99, "quantity": 1}, "token")
+
+
+def make_loader() -> ProductBatchLoader:
+    return ProductBatchLoader(window_seconds=0.01, max_batch_size=50, max_concurrency=8)
+
+
+@respx.mock
+async def test_batched_lookup_is_sent_without_user_credentials():
+    route = respx.get(PRODUCT_URL).mock(return_value=httpx.Response(200, json={"success": True, "data": PRODUCT}))
+    loader, service = make_loader(), OrderService(None)
+
+    results = await asyncio.gather(*[
+        loader.load(9, token, service.fetch_product_details) for token in ("alice", "bob", "carol")
+    ])
+
+    assert results == [PRODUCT] * 3
+    assert route.call_count == 1
+    assert "Authorization" not in route.calls.last.request.headers
+
+
+@respx.mock
+async def test_rejected_shared_lookup_is_retried_with_each_callers_token():
+    # Should the product service ever require auth: one user's rejected token must not fail the others
+    async def respond(request: httpx.Request) -> httpx.Response:
+        authorization = request.headers.get("Authorization")
+        if authorization is None:
+            return httpx.Response(401)
+        if authorization == "Bearer expired":
+            return httpx.Response(403)
+        return httpx.Response(200, json={"success": True, "data": PRODUCT})
+
+    route = respx.get(PRODUCT_URL).mock(side_effect=respond)
+    loader, service = make_loader(), OrderService(None)
+
+    results = await asyncio.gather(*[
+        loader.load(9, token, service.fetch_product_details) for token in ("expired", "alice", "alice", "bob")
+    ], return_exceptions=True)
+
+    assert isinstance(results[0], ProductLookupError) and results[0].status_code == 403
+    assert results[1:] == [PRODUCT] * 3
+    assert route.call_count == 4  # Anonymous, then once per distinct token
+    assert loader.auth_retries == 3
@@ -0,0 +1,269 @@
+import asyncio
+import random
+
+import fakeredis
+import httpx
+import pytest
+import redis
+from sqlalchemy import delete
+
+from config.settings import settings
+from database.connection import async_session_factory
+from models.order import Order
+from schemas.order_schemas import OrderCreate
+from services import order_service, stock_reservations
+from services.order_service import OrderService
+from services.stock_reservations import (
+    StockReservationLedger, InsufficientStockError,
+    AVAILABLE_PREFIX, HELD_PREFIX, PENDING_PREFIX, INFLIGHT_PREFIX, DIRTY_KEY, EXPIRY_KEY
+)
+from utils.auth import User
+
+PRODUCT_ID = "42"
+
+
+class FakeProductService:
+    """Product service stand-in: GET /products/{id} and PATCH /products/{id}/stock (absolute)"""
+
+    def __init__(self, stock: int, latency: float = 0.01):
+        self.stock = stock
+        self.latency = latency
+        self.patches = []
+        self.patch_status = 200
+        self.patch_error = None  # Raised after the PATCH was applied (outcome unknown to the caller)
+
+    async def request(self, service, method, url, **kwargs):
+        await asyncio.sleep(self.latency)
+        if method == "GET":
+            return httpx.Response(200, json={"success": True, "data": {"stock": self.stock}})
+        if self.patch_status != 200:
+            return httpx.Response(self.patch_status)
+        self.stock = kwargs["json"]["stock"]
+        self.patches.append(self.stock)
+        if self.patch_error is not None:
+            error, self.patch_error = self.patch_error, None
+            raise error
+        return httpx.Response(200)
+
+
+@pytest.fixture
+def product_service(monkeypatch):
+    service = FakeProductService(stock=100)
+    monkeypatch.setattr(stock_reservations.http_clients, "request", service.request)
+    return service
+
+
+@pytest.fixture
+def make_ledger(monkeypatch):
+    """Ledgers ("replicas") sharing one fake Redis server"""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(stock_reservations.redis, "from_url",
+                        lambda url: fakeredis.aioredis.FakeRedis(server=server))
+
+    def make(reservation_ttl: float = 600) -> StockReservationLedger:
+        return StockReservationLedger("redis://fake", reservation_ttl=reservation_ttl, seed_ttl=300,
+                                      sync_interval=60, sync_batch_size=50, sync_lock_seconds=60)
+    return make
+
+
+async def sell(ledger: StockReservationLedger, quantity: int):
+    assert await ledger.confirm(await ledger.reserve(PRODUCT_ID, quantity))
+
+
+async def counter(ledger: StockReservationLedger, prefix: str) -> int:
+    return int(await ledger._get_redis().get(f"{prefix}{PRODUCT_ID}") or 0)
+
+
+async def test_concurrent_replica_syncs_apply_each_sold_unit_once(make_ledger, product_service):
+    replica_a, replica_b = make_ledger(), make_ledger()
+    await sell(replica_a, 10)
+
+    # Both replicas sync the same product while more units are confirmed
+    await asyncio.gather(
+        replica_a._sync_product(PRODUCT_ID),
+        replica_b._sync_product(PRODUCT_ID),
+        sell(replica_b, 5)
+    )
+    while await replica_a.sync_pending():
+        pass
+
+    assert product_service.stock == 85
+    assert await counter(replica_a, PENDING_PREFIX) == 0
+    assert not await replica_a._get_redis().exists(f"{INFLIGHT_PREFIX}{PRODUCT_ID}")
+    assert replica_a.sync_contended + replica_b.sync_contended >= 1
+
+
+async def test_patch_with_unknown_outcome_is_not_applied_twice(make_ledger, product_service):
+    ledger = make_ledger()
+    await sell(ledger, 10)
+    product_service.patch_error = httpx.ReadTimeout("response lost")
+
+    with pytest.raises(httpx.ReadTimeout):
+        await ledger._sync_product(PRODUCT_ID)
+    assert product_service.stock == 90
+    assert await ledger._get_redis().sismember(DIRTY_KEY, PRODUCT_ID)
+
+    assert await ledger._sync_product(PRODUCT_ID)
+    assert product_service.stock == 90
+    assert product_service.patches == [90]
+    assert await counter(ledger, PENDING_PREFIX) == 0
+
+
+async def test_rejected_patch_restores_pending(make_ledger, product_service):
+    ledger = make_ledger()
+    await sell(ledger, 10)
+    product_service.patch_status = 500
+
+    assert not await ledger._sync_product(PRODUCT_ID)
+    assert await counter(ledger, PENDING_PREFIX) == 10
+    assert not await ledger._get_redis().exists(f"{INFLIGHT_PREFIX}{PRODUCT_ID}")
+
+    product_service.patch_status = 200
+    assert await ledger._sync_product(PRODUCT_ID)
+    assert product_service.stock == 90
+
+
+async def test_cancelled_sync_finishes_its_patch(make_ledger, product_service):
+    ledger = make_ledger()
+    await sell(ledger, 10)
+
+    task = asyncio.create_task(ledger._sync_product(PRODUCT_ID))
+    await asyncio.sleep(product_service.latency * 1.5)  # Mid-flight
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(product_service.latency * 4)
+
+    assert await ledger._sync_product(PRODUCT_ID)
+    assert product_service.patches == [90]
+    assert await counter(ledger, PENDING_PREFIX) == 0
+
+
+async def test_confirm_after_hold_expired_still_records_the_sale(make_ledger, product_service):
+    ledger = make_ledger(reservation_ttl=-1)
+    reservation_id = await ledger.reserve(PRODUCT_ID, 3)
+
+    assert not await ledger.confirm(reservation_id)
+    assert ledger.confirmed_late == 1
+    assert await counter(ledger, PENDING_PREFIX) == 3
+    assert await counter(ledger, HELD_PREFIX) == 0
+    assert await ledger._get_redis().sismember(DIRTY_KEY, PRODUCT_ID)
+
+
+async def test_confirm_after_sweeper_released_takes_units_back(make_ledger, product_service):
+    ledger = make_ledger(reservation_ttl=-1)
+    reservation_id = await ledger.reserve(PRODUCT_ID, 3)
+    assert await ledger.release_expired() == 1
+    assert await counter(ledger, AVAILABLE_PREFIX) == 100
+
+    assert not await ledger.confirm(reservation_id)
+    assert await counter(ledger, AVAILABLE_PREFIX) == 97
+    assert await counter(ledger, PENDING_PREFIX) == 3
+
+    # Confirming again (or releasing) must not move the counters a second time
+    assert await ledger.confirm(reservation_id)
+    assert not await ledger.release(reservation_id)
+    assert await counter(ledger, PENDING_PREFIX) == 3
+    assert await counter(ledger, AVAILABLE_PREFIX) == 97
+
+
+async def test_parallel_checkouts_never_oversell(make_ledger, product_service):
+    replicas = [make_ledger(), make_ledger()]
+    sold = []
+
+    async def checkout(number: int):
+        ledger = replicas[number % 2]
+        quantity = 1 + number % 3
+        try:
+            reservation_id = await ledger.reserve(PRODUCT_ID, quantity)
+        except InsufficientStockError:
+            return
+        await asyncio.sleep(random.uniform(0, 0.005))
+        if number % 5 == 0:
+            await ledger.release(reservation_id)  # The order write failed
+        else:
+            await ledger.confirm(reservation_id)
+            sold.append(quantity)
+
+    async def sync(ledger: StockReservationLedger):
+        for _ in range(5):
+            await ledger.sync_pending()
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*[checkout(number) for number in range(300)], *[sync(ledger) for ledger in replicas])
+
+    parts = [await counter(replicas[0], prefix) for prefix in (AVAILABLE_PREFIX, HELD_PREFIX, PENDING_PREFIX)]
+    inflight = int(await replicas[0]._get_redis().hget(f"{INFLIGHT_PREFIX}{PRODUCT_ID}", "quantity") or 0)
+    assert 0 < sum(sold) <= 100
+    assert parts[1] == 0
+    assert sum(parts) + inflight == product_service.stock
+    while await replicas[0].sync_pending():
+        pass
+    assert product_service.stock == 100 - sum(sold) == await counter(replicas[0], AVAILABLE_PREFIX)
+
+
+@pytest.fixture
+async def checkout_with_ledger(database, make_ledger, product_service, monkeypatch):
+    """OrderService.create_order_simple wired to a fakeredis ledger; one 3-unit item in the cart"""
+    ledger = make_ledger()
+    user = User(id=646464, email="ledger@example.com", name="Ledger Test")
+    monkeypatch.setattr(settings, "stock_reservation_enabled", True)
+    monkeypatch.setattr(order_service, "stock_ledger", ledger)
+
+    async def get_cart_items(self, user_id, token):
+        return [{"productId": int(PRODUCT_ID), "price": 10.0, "quantity": 3}]
+
+    async def get_product_details(self, product_id, token):
+        return {"title": "Product", "sku": "SKU", "image": ""}
+
+    monkeypatch.setattr(OrderService, "get_cart_items", get_cart_items)
+    monkeypatch.setattr(OrderService, "get_product_details", get_product_details)
+
+    async def checkout() -> Order:
+        async with async_session_factory() as session:
+            return await OrderService(session).create_order_simple(OrderCreate(), user, "token")
+
+    yield ledger, checkout
+    async with async_session_factory() as session:
+        async with session.begin():
+            await session.execute(delete(Order).where(Order.user_id == user.id))
+
+
+async def expire_all_holds(ledger: StockReservationLedger):
+    client = ledger._get_redis()
+    for reservation_id in await client.zrange(EXPIRY_KEY, 0, -1):
+        await client.zadd(EXPIRY_KEY, {reservation_id: 0})
+
+
+async def test_failed_confirm_after_commit_keeps_the_order_and_the_sale(checkout_with_ledger):
+    ledger, checkout = checkout_with_ledger
+
+    async def redis_down(reservation_id):
+        raise redis.ConnectionError("Redis went away")
+
+    ledger.confirm = redis_down
+    order = await checkout()
+    del ledger.confirm
+
+    assert order.id is not None
+    assert await counter(ledger, HELD_PREFIX) == 3
+
+    # The hold expires: the sweeper sees the committed order and confirms instead of releasing
+    await expire_all_holds(ledger)
+    assert await ledger.release_expired() == 0
+    assert ledger.recovered == 1
+    assert await counter(ledger, HELD_PREFIX) == 0
+    assert await counter(ledger, PENDING_PREFIX) == 3
+    assert await counter(ledger, AVAILABLE_PREFIX) == 97
+
+
+async def test_sweeper_releases_holds_of_orders_that_never_committed(checkout_with_ledger):
+    ledger, _ = checkout_with_ledger
+    reservation_id = await ledger.reserve(PRODUCT_ID, 3)
+    await ledger.attach_order([reservation_id], "ORD-NEVER-WRITTEN")
+
+    await expire_all_holds(ledger)
+
+    assert await ledger.release_expired() == 1
+    assert await counter(ledger, AVAILABLE_PREFIX) == 100
+    assert await counter(ledger, PENDING_PREFIX) == 0
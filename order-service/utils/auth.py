@@ -6,8 +6,12 @@ from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from typing import Optional
+from datetime import datetime, timedelta
+import uuid
 from config.settings import settings
-import httpx
+from utils.http_clients import http_clients
+from utils.user_cache import user_cache
+from utils.deadline import DeadlineExceeded
 
 security = HTTPBearer()
 
@@ -31,20 +35,19 @@ async def verify_token(token: str) -> Optional[dict]:
 async def get_user_from_service(user_id: int) -> Optional[User]:
     """Get user details from user service"""
     try:
-        url = f"https://34.95.5.30.nip.io/user/users/{user_id}"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=10.0)
-            
-            if response.status_code == 200:
-                user_data = response.json()
-                return User(
-                    id=user_data.get("id"),
-                    email=user_data.get("email"),
-                    name=user_data.get("name"),
-                    role=user_data.get("role", "user"),
-                    status=user_data.get("status", "active")
-                )
-            return None
+        url = f"{settings.user_service_url}/users/{user_id}"
+        response = await http_clients.request("user", "GET", url)
+        
+        if response.status_code == 200:
+            user_data = response.json()
+            return User(
+                id=user_data.get("id"),
+                email=user_data.get("email"),
+                name=user_data.get("name"),
+                role=user_data.get("role", "user"),
+                status=user_data.get("status", "active")
+            )
+        return None
     except Exception:
         return None
 
@@ -58,6 +61,24 @@ async def create_user_from_token(token_payload: dict) -> User:
         status="active"
     )
 
+def create_service_token(user: User, expires_minutes: int = 5) -> str:
+    """
+    Mint a short-lived token so background work can call services on a user's behalf
+    Downstream services validate it through user-service GET /auth/me,
+    which rejects tokens without both sub and jti ("Invalid token format")
+    """
+    now = datetime.utcnow()
+    payload = {
+        "sub": str(user.id),
+        "email": user.email,
+        "name": user.name,
+        "role": user.role,
+        "iat": now,
+        "exp": now + timedelta(minutes=expires_minutes),
+        "jti": uuid.uuid4().hex
+    }
+    return jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
     """Get current user from JWT token"""
     token = credentials.credentials
@@ -71,13 +92,46 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    user_id = int(payload.get("sub"))
-    
-    # Try to get user from service
-    user = await get_user_from_service(user_id)
-    
+    return await resolve_user(payload)
+
+def should_lookup_user(payload: dict, require_admin: bool = False) -> bool:
+    """Whether USER_LOOKUP_POLICY asks for the user service rather than JWT claims alone"""
+    policy = settings.user_lookup_policy
+    if policy == "claims":
+        return False
+    if policy == "admin":
+        return require_admin or payload.get("role") == "admin"
+    return True
+
+async def resolve_user(payload: dict, require_admin: bool = False) -> User:
+    """Resolve the user for a verified token through the user cache"""
+    user = None
+    if should_lookup_user(payload, require_admin):
+        try:
+            user = await user_cache.get(int(payload.get("sub")), get_user_from_service)
+        except DeadlineExceeded:
+            user = None
+
     # Fallback to token data if service unavailable
     if not user:
         user = await create_user_from_token(payload)
     
+    return user
+
+async def get_current_admin_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+    """Get current user from JWT token, requiring the admin role"""
+    payload = await verify_token(credentials.credentials)
+    if not payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    user = await resolve_user(payload, require_admin=True)
+    if not user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
     return user
\ No newline at end of file
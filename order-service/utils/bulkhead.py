@@ -0,0 +1,160 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+from config.settings import settings
+
+R = TypeVar("R")
+
+
+class BulkheadFullError(Exception):
+    """Raised when a dependency's concurrency pool and its queue are both full"""
+
+    def __init__(self, name: str):
+        self.name = name
+        super().__init__(f"{name} service is at its concurrency limit, try again shortly")
+
+
+class Bulkhead:
+    """
+    Concurrency pool for one downstream dependency with an AIMD limit
+    Calls beyond the current limit wait in a short FIFO queue and are
+    rejected when the queue is full or the wait times out. The limit grows
+    by about one per `limit` fast calls while the pool is busy and shrinks
+    multiplicatively on a failed call or one slower than `latency_target`.
+    """
+
+    def __init__(self, name: str, initial_limit: int, min_limit: int, max_limit: int, max_queue: int,
+                 queue_timeout: float, latency_target: float, backoff_ratio: float, enabled: bool = True):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+        self.enabled = enabled
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            future = self._waiters.popleft()
+            if not future.done():
+                # Hand the slot straight to the next waiter
+                self.in_flight += 1
+                future.set_result(None)
+
+    def _release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    async def _acquire(self):
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise BulkheadFullError(self.name)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(future, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise BulkheadFullError(self.name)
+        except BaseException:
+            if future.done() and not future.cancelled():
+                self._release()  # Slot was handed over just as we were cancelled
+            raise
+        finally:
+            if future in self._waiters:
+                self._waiters.remove(future)
+
+    def _adjust(self, elapsed: float, dropped: bool, in_flight: int):
+        if dropped or elapsed > self.latency_target:
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+        elif in_flight * 2 >= self.limit:
+            # Only grow while the pool is actually being used
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    async def run(self, func: Callable[[], Awaitable[R]], is_failure: Optional[Callable[[R], bool]] = None,
+                  is_drop: Optional[Callable[[Exception], bool]] = None) -> R:
+        """
+        Run func inside the pool
+        is_failure marks bad results and is_drop says which exceptions count
+        against the limit (default: all); cancellation never does
+        """
+        if not self.enabled:
+            return await func()
+
+        await self._acquire()
+        self.admitted += 1
+        in_flight = self.in_flight
+        started = time.monotonic()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if is_drop is None or is_drop(e):
+                self._adjust(time.monotonic() - started, True, in_flight)
+            raise
+        else:
+            self._adjust(time.monotonic() - started, bool(is_failure and is_failure(result)), in_flight)
+            return result
+        finally:
+            self._release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected
+        }
+
+
+class BulkheadRegistry:
+    """One bulkhead per downstream service, configured from settings"""
+
+    def __init__(self):
+        self._bulkheads: Dict[str, Bulkhead] = {}
+
+    def get(self, name: str) -> Bulkhead:
+        bulkhead = self._bulkheads.get(name)
+        if bulkhead is None:
+            bulkhead = Bulkhead(
+                name=name,
+                initial_limit=settings.bulkhead_initial_limit,
+                min_limit=settings.bulkhead_min_limit,
+                max_limit=settings.bulkhead_max_limit,
+                max_queue=settings.bulkhead_max_queue,
+                queue_timeout=settings.bulkhead_queue_timeout_ms / 1000,
+                latency_target=settings.bulkhead_latency_target_ms / 1000,
+                backoff_ratio=settings.bulkhead_backoff_ratio,
+                enabled=settings.bulkhead_enabled
+            )
+            self._bulkheads[name] = bulkhead
+        return bulkhead
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: bulkhead.get_stats() for name, bulkhead in self._bulkheads.items()}
+
+
+# Global instance
+bulkheads = BulkheadRegistry()
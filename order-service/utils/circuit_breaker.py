@@ -0,0 +1,179 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+from config.settings import settings
+
+R = TypeVar("R")
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"{name} service is unavailable (circuit open, retry in {retry_after:.0f}s)")
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one downstream dependency
+    CLOSED: calls flow; the last `window_size` outcomes are tracked and the
+    circuit opens when the failure rate or slow-call rate crosses its
+    threshold (after at least `minimum_calls`).
+    OPEN: calls fail immediately with CircuitOpenError for `open_seconds`.
+    HALF_OPEN: up to `half_open_calls` trial calls; all succeeding closes
+    the circuit, any failure or slow call opens it again.
+    """
+
+    def __init__(self, name: str, window_size: int, minimum_calls: int, failure_rate_threshold: float,
+                 slow_call_rate_threshold: float, slow_call_seconds: float, open_seconds: float,
+                 half_open_calls: int, enabled: bool = True):
+        self.name = name
+        self.window_size = window_size
+        self.minimum_calls = minimum_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.enabled = enabled
+        self.state = CircuitState.CLOSED
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)  # (failed, slow)
+        self._opened_at = 0.0
+        self._trial_in_flight = 0
+        self._trial_successes = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def _open(self):
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.times_opened += 1
+        print(f"⚠️  Circuit for {self.name} service OPEN")
+
+    def _close(self):
+        self.state = CircuitState.CLOSED
+        self._outcomes.clear()
+        print(f"✅ Circuit for {self.name} service closed")
+
+    def _retry_after(self) -> float:
+        return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError"""
+        if self.state == CircuitState.OPEN:
+            if self._retry_after() > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, self._retry_after())
+            self.state = CircuitState.HALF_OPEN
+            self._trial_in_flight = 0
+            self._trial_successes = 0
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self._trial_in_flight + self._trial_successes >= self.half_open_calls:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, self.open_seconds)
+            self._trial_in_flight += 1
+
+    def record(self, elapsed: float, failed: bool):
+        """Record the outcome of an admitted call"""
+        slow = elapsed >= self.slow_call_seconds
+
+        if self.state == CircuitState.HALF_OPEN:
+            self._trial_in_flight = max(0, self._trial_in_flight - 1)
+            if failed or slow:
+                self._open()
+            else:
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_calls:
+                    self._close()
+            return
+
+        if self.state == CircuitState.OPEN:
+            return  # Late result from before the circuit opened
+
+        self._outcomes.append((failed, slow))
+        if len(self._outcomes) < self.minimum_calls:
+            return
+        calls = len(self._outcomes)
+        failure_rate = sum(1 for f, _ in self._outcomes if f) / calls
+        slow_rate = sum(1 for _, s in self._outcomes if s) / calls
+        if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+            self._open()
+
+    async def call(self, func: Callable[[], Awaitable[R]], is_failure: Optional[Callable[[R], bool]] = None) -> R:
+        """Run func through the breaker; exceptions (and is_failure results) count as failures"""
+        if not self.enabled:
+            return await func()
+
+        self.before_call()
+        started = time.monotonic()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            # Abandoned by the caller - says nothing about the dependency
+            if self.state == CircuitState.HALF_OPEN:
+                self._trial_in_flight = max(0, self._trial_in_flight - 1)
+            raise
+        except Exception:
+            self.record(time.monotonic() - started, failed=True)
+            raise
+        self.record(time.monotonic() - started, failed=bool(is_failure and is_failure(result)))
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        calls = len(self._outcomes)
+        return {
+            "state": self.state.value if self.enabled else "disabled",
+            "calls_in_window": calls,
+            "failure_rate": round(sum(1 for f, _ in self._outcomes if f) / calls, 3) if calls else 0.0,
+            "slow_call_rate": round(sum(1 for _, s in self._outcomes if s) / calls, 3) if calls else 0.0,
+            "retry_after_seconds": round(self._retry_after(), 1) if self.state == CircuitState.OPEN else 0.0,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected
+        }
+
+
+class CircuitBreakerRegistry:
+    """One circuit breaker per downstream service, configured from settings"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name=name,
+                window_size=settings.circuit_breaker_window_size,
+                minimum_calls=settings.circuit_breaker_minimum_calls,
+                failure_rate_threshold=settings.circuit_breaker_failure_rate,
+                slow_call_rate_threshold=settings.circuit_breaker_slow_call_rate,
+                slow_call_seconds=settings.circuit_breaker_slow_call_seconds,
+                open_seconds=settings.circuit_breaker_open_seconds,
+                half_open_calls=settings.circuit_breaker_half_open_calls,
+                enabled=settings.circuit_breaker_enabled
+            )
+            self._breakers[name] = breaker
+        return breaker
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: breaker.get_stats() for name, breaker in self._breakers.items()}
+
+
+# Global instance
+circuit_breakers = CircuitBreakerRegistry()
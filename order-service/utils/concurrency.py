@@ -0,0 +1,49 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, List, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def gather_bounded(func: Callable[[T], Awaitable[R]], items: Iterable[T], limit: int) -> List[R]:
+    """
+    Run func over items concurrently with at most `limit` calls in flight
+    Results keep the order of `items`; the first failure cancels the
+    remaining calls and is re-raised to the caller
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+    if not tasks:
+        return []
+
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in tasks:
+            if task in done and not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+        return [task.result() for task in tasks]
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        # Reap cancelled/failed tasks so no exception goes unretrieved
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def settle_bounded(func: Callable[[T], Awaitable[R]], items: Iterable[T], limit: int) -> List[Tuple[bool, Any]]:
+    """
+    Like gather_bounded, but every call runs to completion
+    Returns (True, result) or (False, exception) per item, in item order
+    """
+    async def settle(item: T) -> Tuple[bool, Any]:
+        try:
+            return True, await func(item)
+        except Exception as e:
+            return False, e
+
+    return await gather_bounded(settle, items, limit)
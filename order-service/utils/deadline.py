@@ -0,0 +1,69 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Optional
+
+# Remaining budget in milliseconds; read from callers and forwarded downstream.
+# A relative budget rather than a timestamp, so it does not depend on clock sync.
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+# Absolute deadline (time.monotonic()) of the request being handled
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the request's time budget runs out before the work is done"""
+
+    def __init__(self, operation: str = "request"):
+        self.operation = operation
+        super().__init__(f"Deadline exceeded before {operation} completed")
+
+
+def set_deadline(budget_seconds: float) -> Token:
+    """Start a deadline `budget_seconds` from now for the current context"""
+    return _deadline.set(time.monotonic() + budget_seconds)
+
+
+def reset_deadline(token: Token):
+    _deadline.reset(token)
+
+
+@contextmanager
+def suspended():
+    """Run work that must not be cut short by the deadline (compensation, shared batches)"""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the deadline, or None when no deadline is set"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def check(operation: str = "request"):
+    """Abandon work once the budget is spent"""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(operation)
+
+
+def parse_budget_ms(value: Optional[str]) -> Optional[float]:
+    """Parse an incoming deadline header into seconds; ignores malformed values"""
+    if not value:
+        return None
+    try:
+        budget_ms = float(value)
+    except ValueError:
+        return None
+    return budget_ms / 1000 if budget_ms > 0 else None
+
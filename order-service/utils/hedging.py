@@ -0,0 +1,164 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+from config.settings import settings
+
+R = TypeVar("R")
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies (seconds) used to pick the hedge delay"""
+
+    def __init__(self, window_size: int, percentile: float, min_samples: int):
+        self.samples: Deque[float] = deque(maxlen=window_size)
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._cached: Optional[float] = None
+        self._since_cached = 0
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+        self._since_cached += 1
+
+    def value(self) -> Optional[float]:
+        """Current percentile, or None until enough samples are known"""
+        if len(self.samples) < self.min_samples:
+            return None
+        # Re-sorting the window on every request is wasteful; refresh every 10%
+        if self._cached is None or self._since_cached >= max(1, len(self.samples) // 10):
+            ordered = sorted(self.samples)
+            index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+            self._cached = ordered[index]
+            self._since_cached = 0
+        return self._cached
+
+
+class HedgeBudget:
+    """
+    Token bucket capping hedges to a share of traffic
+    Every request deposits `ratio` tokens (up to `burst`); a hedge spends one
+    """
+
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+
+    def deposit(self):
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class Hedger:
+    """
+    Hedged execution of an idempotent call
+    The call is started; if it has not completed after the tracked latency
+    percentile and the budget allows, a second identical call is started and
+    whichever succeeds first wins. The other is cancelled.
+    """
+
+    def __init__(self, name: str, tracker: LatencyTracker, budget: HedgeBudget, min_delay: float):
+        self.name = name
+        self.tracker = tracker
+        self.budget = budget
+        self.min_delay = min_delay
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0
+
+    def delay(self) -> Optional[float]:
+        value = self.tracker.value()
+        return None if value is None else max(self.min_delay, value)
+
+    async def _attempt(self, func: Callable[[], Awaitable[R]]) -> R:
+        started = time.monotonic()
+        result = await func()
+        self.tracker.observe(time.monotonic() - started)
+        return result
+
+    async def run(self, func: Callable[[], Awaitable[R]]) -> R:
+        self.requests += 1
+        self.budget.deposit()
+
+        tasks: List[asyncio.Future] = [asyncio.ensure_future(self._attempt(func))]
+        hedge: Optional[asyncio.Future] = None
+        try:
+            delay = self.delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    if self.budget.withdraw():
+                        self.hedged += 1
+                        hedge = asyncio.ensure_future(self._attempt(func))
+                        tasks.append(hedge)
+                    else:
+                        self.budget_exhausted += 1
+
+            # First successful reply wins; fail only when every attempt failed
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        delay = self.delay()
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "budget_exhausted": self.budget_exhausted,
+            "hedge_rate": round(self.hedged / self.requests, 4) if self.requests else 0.0,
+            "delay_ms": round(delay * 1000, 1) if delay is not None else None,
+            "budget_tokens": round(self.budget.tokens, 2)
+        }
+
+
+class HedgerRegistry:
+    """One hedger (latency window and budget) per downstream operation"""
+
+    def __init__(self):
+        self._hedgers: Dict[str, Hedger] = {}
+
+    def get(self, name: str) -> Hedger:
+        hedger = self._hedgers.get(name)
+        if hedger is None:
+            hedger = Hedger(
+                name=name,
+                tracker=LatencyTracker(settings.hedge_window_size, settings.hedge_percentile, settings.hedge_min_samples),
+                budget=HedgeBudget(settings.hedge_budget_ratio, settings.hedge_budget_burst),
+                min_delay=settings.hedge_min_delay_ms / 1000
+            )
+            self._hedgers[name] = hedger
+        return hedger
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.hedging_enabled,
+            "operations": {name: hedger.get_stats() for name, hedger in self._hedgers.items()}
+        }
+
+
+# Global instance
+hedgers = HedgerRegistry()
@@ -0,0 +1,188 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import httpx
+from typing import Dict, Any, Optional
+from config.settings import settings
+from utils.circuit_breaker import circuit_breakers, CircuitOpenError
+from utils.bulkhead import bulkheads
+from utils.hedging import hedgers
+from utils import deadline
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HTTPClientManager:
+    """
+    Application-lifetime HTTP clients for downstream services
+    Keeps one keep-alive connection pool per service (cart, product, user)
+    so checkout reuses TCP/TLS connections instead of handshaking per call
+    """
+
+    SERVICES = ("cart", "product", "user")
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._request_counts: Dict[str, int] = {name: 0 for name in self.SERVICES}
+        self._error_counts: Dict[str, int] = {name: 0 for name in self.SERVICES}
+        self._protocol_counts: Dict[str, Dict[str, int]] = {name: {} for name in self.SERVICES}
+        # HTTP/2 is negotiated per connection via TLS ALPN; peers without h2
+        # (or plain http:// URLs) are served over HTTP/1.1 automatically
+        self.http2 = settings.http2_enabled and http2_available()
+
+    def _build_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry
+        )
+
+    def _build_timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=settings.http_connect_timeout,
+            read=settings.http_read_timeout,
+            write=settings.http_write_timeout,
+            pool=settings.http_pool_timeout
+        )
+
+    def _create_client(self, service: str) -> httpx.AsyncClient:
+        async def count_request(request: httpx.Request):
+            self._request_counts[service] += 1
+
+        async def count_response(response: httpx.Response):
+            if response.status_code >= 500:
+                self._error_counts[service] += 1
+            protocols = self._protocol_counts[service]
+            protocols[response.http_version] = protocols.get(response.http_version, 0) + 1
+
+        return httpx.AsyncClient(
+            http2=self.http2,
+            limits=self._build_limits(),
+            timeout=self._build_timeout(),
+            event_hooks={"request": [count_request], "response": [count_response]}
+        )
+
+    async def startup(self):
+        """Open one pooled client per downstream service"""
+        for service in self.SERVICES:
+            if service not in self._clients:
+                self._clients[service] = self._create_client(service)
+            circuit_breakers.get(service)
+            bulkheads.get(service)
+        if settings.http2_enabled and not self.http2:
+            print("⚠️  HTTP2_ENABLED is set but the h2 package is missing - using HTTP/1.1")
+        protocol = "HTTP/2 (HTTP/1.1 fallback)" if self.http2 else "HTTP/1.1"
+        print(f"🔗 HTTP client pools ready ({protocol}): {', '.join(self.SERVICES)}")
+
+    async def shutdown(self):
+        """Close all pooled clients and their connections"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+        print("✅ HTTP client pools closed!")
+
+    def get(self, service: str) -> httpx.AsyncClient:
+        """Get the pooled client for a downstream service"""
+        if service not in self.SERVICES:
+            raise ValueError(f"Unknown downstream service: {service}")
+        client = self._clients.get(service)
+        if client is None or client.is_closed:
+            # Created lazily when used outside the app lifecycle (scripts, workers)
+            client = self._create_client(service)
+            self._clients[service] = client
+        return client
+
+    async def request(self, service: str, method: str, url: str, hedge: bool = False, **kwargs) -> httpx.Response:
+        """
+        Send a request to a downstream service through its circuit breaker
+        Transport errors and 5xx responses count as failures; raises
+        CircuitOpenError without touching the network while the circuit is open,
+        and BulkheadFullError when the service's concurrency pool is saturated.
+        hedge=True allows a hedged second attempt (GET only, when hedging is enabled).
+        Inside a request deadline the call is bounded by the remaining budget,
+        which is also forwarded downstream; DeadlineExceeded once it runs out
+        """
+        client = self.get(service)
+        breaker = circuit_breakers.get(service)
+        bulkhead = bulkheads.get(service)
+
+        def is_server_error(response: httpx.Response) -> bool:
+            return response.status_code >= 500
+
+        def send(options: Dict[str, Any]):
+            # Each service has its own bulkhead, so a slow dependency cannot
+            # take all in-flight capacity; a fast-failed call says nothing
+            # about load and does not move the limit
+            return bulkhead.run(
+                lambda: breaker.call(lambda: client.request(method, url, **options), is_failure=is_server_error),
+                is_failure=is_server_error,
+                is_drop=lambda error: not isinstance(error, CircuitOpenError)
+            )
+
+        async def attempt() -> httpx.Response:
+            left = deadline.remaining()
+            if left is None:
+                return await send(kwargs)
+            if left <= 0:
+                raise deadline.DeadlineExceeded(f"{service} {method}")
+            options = dict(kwargs)
+            options["headers"] = {**(kwargs.get("headers") or {}), deadline.DEADLINE_HEADER: str(int(left * 1000))}
+            try:
+                # Cancelled (not failed) when the budget runs out, so the breaker does not count it
+                return await asyncio.wait_for(send(options), timeout=left)
+            except asyncio.TimeoutError:
+                raise deadline.DeadlineExceeded(f"{service} {method}")
+
+        if hedge and method == "GET" and settings.hedging_enabled:
+            return await hedgers.get(f"{service}.{method}").run(attempt)
+        return await attempt()
+
+    def _pool_stats(self, client: Optional[httpx.AsyncClient]) -> Dict[str, Any]:
+        if client is None:
+            return {"open": False}
+
+        stats: Dict[str, Any] = {"open": not client.is_closed}
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        stats["connections"] = len(connections)
+        stats["idle_connections"] = sum(1 for conn in connections if conn.is_idle())
+        stats["active_connections"] = stats["connections"] - stats["idle_connections"]
+        stats["http2_connections"] = sum(
+            1 for conn in connections if "HTTP2" in type(getattr(conn, "_connection", None)).__name__
+        )
+        stats["queued_requests"] = len(getattr(pool, "_requests", []) or [])
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool statistics per downstream service"""
+        limits = self._build_limits()
+        return {
+            "http2": self.http2,
+            "limits": {
+                "max_connections": limits.max_connections,
+                "max_keepalive_connections": limits.max_keepalive_connections,
+                "keepalive_expiry": limits.keepalive_expiry
+            },
+            "services": {
+                service: {
+                    **self._pool_stats(self._clients.get(service)),
+                    "requests": self._request_counts[service],
+                    "server_errors": self._error_counts[service],
+                    "responses_by_protocol": dict(self._protocol_counts[service])
+                }
+                for service in self.SERVICES
+            }
+        }
+
+
+# Global instance
+http_clients = HTTPClientManager()
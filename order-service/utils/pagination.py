@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import Request
+from schemas.order_schemas import OrderPage, OrderSummary
+
+NEXT = "next"
+PREV = "prev"
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a cursor token that was not issued by this service"""
+
+    def __init__(self):
+        super().__init__("Invalid pagination cursor")
+
+
+def encode_cursor(created_at: datetime, order_id: int, direction: str) -> str:
+    """Opaque keyset cursor: position (created_at, id) plus paging direction"""
+    payload = json.dumps({"c": created_at.isoformat(), "i": order_id, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int, str]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload["d"]
+        if direction not in (NEXT, PREV):
+            raise ValueError(direction)
+        return datetime.fromisoformat(payload["c"]), int(payload["i"]), direction
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursorError()
+
+
+def page_link(request: Request, cursor: Optional[str]) -> Optional[str]:
+    """Same URL and filters as the current request, positioned at cursor"""
+    if cursor is None:
+        return None
+    return str(request.url.remove_query_params("page").include_query_params(pagination="cursor", cursor=cursor))
+
+
+def build_order_page(request: Request, orders: List, size: int,
+                     next_cursor: Optional[str], prev_cursor: Optional[str]) -> OrderPage:
+    return OrderPage(
+        items=[OrderSummary.model_validate(order) for order in orders],
+        size=size,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+        next=page_link(request, next_cursor),
+        prev=page_link(request, prev_cursor)
+    )
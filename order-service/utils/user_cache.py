@@ -0,0 +1,128 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from config.settings import settings
+from utils.metrics import Histogram
+from utils import deadline
+
+UserLoader = Callable[[int], Awaitable[Optional[Any]]]
+
+
+class UserCache:
+    """
+    Resolved-user cache for request authentication
+    Entries are fresh for `ttl` seconds and may then be served stale for
+    another `stale_ttl` seconds while one background refresh runs
+    (stale-while-revalidate). Concurrent misses for the same user share a
+    single lookup (single-flight). Failed lookups (None) are not cached.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, stale_ttl: float):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # user_id -> (fresh_until, stale_until, user)
+        self._entries: "OrderedDict[int, Tuple[float, float, Any]]" = OrderedDict()
+        self._inflight: Dict[int, asyncio.Task] = {}
+        self.lookup_ms = Histogram()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.evictions = 0
+
+    def _store(self, user_id: int, user: Any):
+        now = time.monotonic()
+        self._entries[user_id] = (now + self.ttl, now + self.ttl + self.stale_ttl, user)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _load(self, user_id: int, load: UserLoader) -> Optional[Any]:
+        started = time.perf_counter()
+        try:
+            user = await load(user_id)
+        finally:
+            self.lookup_ms.observe((time.perf_counter() - started) * 1000)
+            self._inflight.pop(user_id, None)
+        if user is not None:
+            self._store(user_id, user)
+        return user
+
+    def _single_flight(self, user_id: int, load: UserLoader) -> Tuple[asyncio.Task, bool]:
+        task = self._inflight.get(user_id)
+        if task is not None:
+            return task, True
+        # Shared by every waiter, so it runs outside any one request's deadline
+        with deadline.suspended():
+            task = asyncio.ensure_future(self._load(user_id, load))
+        self._inflight[user_id] = task
+        return task, False
+
+    async def get(self, user_id: int, load: UserLoader) -> Optional[Any]:
+        """Return the cached user, loading it (once across concurrent callers) when missing"""
+        entry = self._entries.get(user_id)
+        now = time.monotonic()
+        if entry is not None:
+            fresh_until, stale_until, user = entry
+            if now < fresh_until:
+                self.hits += 1
+                self._entries.move_to_end(user_id)
+                return user
+            if now < stale_until:
+                self.stale_hits += 1
+                _, joined = self._single_flight(user_id, load)
+                if not joined:
+                    self.refreshes += 1
+                return user
+            del self._entries[user_id]
+
+        self.misses += 1
+        task, joined = self._single_flight(user_id, load)
+        if joined:
+            self.coalesced += 1
+
+        # Shielded so one caller giving up does not cancel the shared lookup
+        left = deadline.remaining()
+        if left is None:
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout=left)
+        except asyncio.TimeoutError:
+            raise deadline.DeadlineExceeded("user lookup")
+
+    def invalidate(self, user_id: int):
+        self._entries.pop(user_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "policy": settings.user_lookup_policy,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "lookup_ms": self.lookup_ms.snapshot()
+        }
+
+
+# Global instance
+user_cache = UserCache(
+    max_entries=settings.user_cache_max_entries,
+    ttl=settings.user_cache_ttl_seconds,
+    stale_ttl=settings.user_cache_stale_seconds
+)